@@ -1,8 +1,13 @@
-import json
+import asyncio
+import time
+import uuid
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import (
+    SystemMessage, HumanMessage, AIMessage, ToolMessage,
+    messages_to_dict, messages_from_dict
+)
 from llm import get_llm, SYSTEM_PROMPT
 from tools_gcal import (
     calendar_list_upcoming,
@@ -14,6 +19,13 @@ from tools_gcal import (
     calendar_update_event_attendees,
     set_user_context
 )
+from tool_executor import tool_executor
+from tool_encoding import encode_tool_result
+from session_store import SessionStore
+from context_window import ContextWindow
+from fast_path import fast_path_router
+from session_persistence import session_persister
+from audio_cache import AudioCache, AudioEntry, LiveAudio
 from utils.logger import setup_logger
 from utils.time_parser import TimeParser
 from config import config
@@ -31,6 +43,12 @@ class ConversationState:
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     last_updated: str = field(default_factory=lambda: datetime.now().isoformat())
     turn_count: int = 0
+    window: ContextWindow = field(default_factory=lambda: ContextWindow(
+        token_budget=config.CONTEXT_TOKEN_BUDGET,
+        max_messages=config.MAX_CONVERSATION_HISTORY,
+        tool_result_max_chars=config.CONTEXT_TOOL_RESULT_MAX_CHARS,
+        summary_max_chars=config.CONTEXT_SUMMARY_MAX_CHARS
+    ), repr=False)
 
     def update(self):
         """Update timestamp and turn count"""
@@ -40,12 +58,12 @@ class ConversationState:
     def add_message(self, message):
         """Add message to history"""
         self.messages.append(message)
+        self.window.append(self.messages)
         self.update()
 
-    def get_recent_messages(self, n: int = None) -> List:
-        """Get recent messages, respecting max history"""
-        limit = n or config.MAX_CONVERSATION_HISTORY
-        return self.messages[-limit:]
+    def get_recent_messages(self) -> List:
+        """Messages for the LLM: pinned system prompt + token-budgeted window of whole turns"""
+        return self.window.messages_for_llm(self.messages)
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization"""
@@ -55,9 +73,44 @@ class ConversationState:
             "metadata": self.metadata,
             "created_at": self.created_at,
             "last_updated": self.last_updated,
-            "message_count": len(self.messages)
+            "message_count": len(self.messages),
+            "context_window": self.window.stats()
+        }
+
+    def to_record(self) -> Dict:
+        """Compact serialized form (messages + metadata) for persistence"""
+        messages = []
+        for message in messages_to_dict(self.messages):
+            data = {
+                k: v for k, v in message["data"].items()
+                if k == "content" or v not in (None, "", [], {})
+            }
+            messages.append({"type": message["type"], "data": data})
+        return {
+            "session_id": self.session_id,
+            "metadata": self.metadata,
+            "created_at": self.created_at,
+            "last_updated": self.last_updated,
+            "turn_count": self.turn_count,
+            "messages": messages,
+            "window": {"start": self.window.start, "summary": self.window.summary}
         }
 
+    @classmethod
+    def from_record(cls, record: Dict) -> "ConversationState":
+        """Rebuild state from to_record() output"""
+        state = cls(
+            session_id=record["session_id"],
+            messages=messages_from_dict(record.get("messages", [])),
+            metadata=record.get("metadata", {}),
+            created_at=record.get("created_at", datetime.now().isoformat()),
+            last_updated=record.get("last_updated", datetime.now().isoformat()),
+            turn_count=record.get("turn_count", 0)
+        )
+        window = record.get("window") or {}
+        state.window.rebuild(state.messages, window.get("start"), window.get("summary"))
+        return state
+
 
 class SmartSchedulerAgent:
     """
@@ -67,11 +120,23 @@ class SmartSchedulerAgent:
     User Query -> LLM decides tools -> Execute tools -> Feed context back -> LLM generates response
     """
     
+    # Tools that change the calendar - never run concurrently with anything else
+    MUTATING_TOOLS = {"calendar_create_event", "calendar_update_event_attendees"}
+    
     def __init__(self):
         """Initialize the agent with tools and configuration"""
-        self.sessions: Dict[str, ConversationState] = {}
+        self.sessions = SessionStore(
+            max_sessions=config.SESSION_MAX_COUNT,
+            ttl_seconds=config.SESSION_IDLE_TTL_SECONDS,
+            max_bytes=config.SESSION_MAX_BYTES
+        )
         self.time_parser = TimeParser()
-        self.audio_cache: Dict[str, bytes] = {}
+        self.audio_cache = AudioCache(
+            max_memory_bytes=config.AUDIO_CACHE_MEMORY_BYTES,
+            max_disk_bytes=config.AUDIO_CACHE_DISK_BYTES,
+            ttl_seconds=config.AUDIO_CACHE_TTL_SECONDS,
+            directory=config.AUDIO_CACHE_DIR
+        )
         
         # Initialize LLM ONCE (not per request)
         self.llm = get_llm()
@@ -87,32 +152,56 @@ class SmartSchedulerAgent:
             calendar_update_event_attendees,
         ]
         
-        self.tool_map = {tool.name: tool for tool in self.tools}
+        # Bind tools ONCE - regenerating the tool schemas every turn is wasted work
+        self.bind_tools()
+        
+        self.usage_totals = {"turns": 0, "llm_calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
         
         logger.info(f"SmartSchedulerAgent initialized with {len(self.tools)} tools")
+    
+    def bind_tools(self):
+        """(Re)build tool_map and the tool-bound LLM; call after changing self.tools or self.llm"""
+        self.tool_map = {tool.name: tool for tool in self.tools}
+        self.llm_with_tools = self.llm.bind_tools(self.tools)
+        logger.info(f"Bound {len(self.tools)} tools to LLM")
         
         
     def get_or_create_session(self, session_id: str) -> ConversationState:
         """Get existing session or create new one"""
-        if session_id not in self.sessions:
+        state = self.sessions.get(session_id)
+        if state is None:
             logger.info(f"Creating new session: {session_id}")
             state = ConversationState(session_id=session_id)
             
-            # Create complete system message with context upfront
-            context = self.get_current_context()
-            full_prompt = f"{SYSTEM_PROMPT}\n\n{context}"
-            state.add_message(SystemMessage(content=full_prompt))
+            # Static prompt only: identical for every session and day, so
+            # providers can cache the prompt + tool schema prefix. The date
+            # context travels with each user message instead.
+            state.add_message(SystemMessage(content=SYSTEM_PROMPT))
             
-            self.sessions[session_id] = state
+            self.sessions.put(session_id, state)
         else:
             logger.debug(f"Retrieved existing session: {session_id}")
         
-        return self.sessions[session_id]
+        return state
 
     
 
+    async def get_or_load_session(self, session_id: str) -> ConversationState:
+        """Like get_or_create_session, but first rehydrates a persisted session"""
+        if self.sessions.get(session_id) is None:
+            try:
+                record = await session_persister.load_async(session_id)
+            except Exception as e:
+                logger.error(f"Failed to load persisted session {session_id}: {e}")
+                record = None
+            if record and self.sessions.get(session_id) is None:
+                logger.info(f"Rehydrated session: {session_id}")
+                self.sessions.put(session_id, ConversationState.from_record(record))
+        
+        return self.get_or_create_session(session_id)
+
     def get_current_context(self) -> str:
-        """Get current date/time context for LLM"""
+        """Get current date/time context for LLM (prepended to each user message)"""
         tz = pytz.timezone(config.DEFAULT_TIMEZONE)
         now = datetime.now(tz)
         
@@ -126,17 +215,11 @@ class SmartSchedulerAgent:
             days_until_monday = 7
         next_monday = now + timedelta(days=days_until_monday)
         
-        return f"""
-    CURRENT CONTEXT (User's Timezone: {config.DEFAULT_TIMEZONE}):
-    - Current Date & Time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}
-    - Today: {now.strftime('%A, %Y-%m-%d')}
-    - Tomorrow: {tomorrow.strftime('%A, %Y-%m-%d')}
-    - Day After Tomorrow: {day_after.strftime('%A, %Y-%m-%d')}
-    - Next Monday: {next_monday.strftime('%Y-%m-%d')}
-    - Current Week: Week of {now.strftime('%B %d, %Y')}
-
-    Use these dates to convert relative time expressions into YYYY-MM-DD format for tools.
-    """
+        return (
+            f"[Context] Now: {now.strftime('%A, %B %d, %Y at %I:%M %p')} ({config.DEFAULT_TIMEZONE}). "
+            f"Today: {now.strftime('%A, %Y-%m-%d')}. Tomorrow: {tomorrow.strftime('%A, %Y-%m-%d')}. "
+            f"Day after tomorrow: {day_after.strftime('%A, %Y-%m-%d')}. Next Monday: {next_monday.strftime('%Y-%m-%d')}."
+        )
 
 
     def _enrich_user_message(self, user_message: str, state: ConversationState) -> str:
@@ -172,23 +255,44 @@ class SmartSchedulerAgent:
         Yields:
             Dict with 'type' and content:
             - {'type': 'content_chunk', 'content': str}
-            - {'type': 'complete', 'session_id': str, 'turn_count': int}
+            - {'type': 'tool_start', 'tools': List[str]} as soon as a tool call is detected
+            - {'type': 'tool_end', 'tools': List[str], 'duration_ms': float}
+            - {'type': 'complete', 'session_id': str, 'turn_count': int, 'usage': dict}
+              (plus 'fast_path': intent name when answered without the LLM)
             - {'type': 'error', 'error': str}
         """
         logger.info(f"[Session: {session_id}] Processing message (STREAMING MODE)")
         
         set_user_context(user)
-        state = self.get_or_create_session(session_id)
+        state = await self.get_or_load_session(session_id)
         
         state.metadata['user_email'] = user.email
         state.metadata['user_name'] = user.name
         state.metadata['is_main_account'] = user.is_main_account
         
         enriched_message = self._enrich_user_message(user_message, state)
-        state.add_message(HumanMessage(content=enriched_message))
+        turn_usage = self._new_turn_usage()
         
-        # Use cached LLM with tools
-        llm_with_tools = self.llm.bind_tools(self.tools)
+        state.add_message(HumanMessage(content=f"{self.get_current_context()}\n\n{enriched_message}"))
+        
+        if config.FAST_PATH_ENABLED:
+            intent = fast_path_router.classify(user_message)
+            reply = await self._try_fast_path(session_id, state, intent) if intent else None
+            if reply:
+                self._record_turn_usage(session_id, state, turn_usage)
+                session_persister.mark_dirty(state, user.id)
+                yield {
+                    'type': 'content_chunk',
+                    'content': reply
+                }
+                yield {
+                    'type': 'complete',
+                    'session_id': session_id,
+                    'turn_count': state.turn_count,
+                    'usage': turn_usage,
+                    'fast_path': intent.name
+                }
+                return
         
         try:
             recent_messages = state.get_recent_messages()
@@ -196,10 +300,11 @@ class SmartSchedulerAgent:
             # Phase 1: Stream initial LLM response
             full_content = ""
             tool_calls_accumulated = []
+            tools_announced = False
             
             logger.info(f"[Session: {session_id}] Starting LLM streaming...")
             
-            async for chunk in llm_with_tools.astream(recent_messages):
+            async for chunk in self._astream_llm(recent_messages, turn_usage):
                 # Stream content tokens immediately
                 if hasattr(chunk, 'content') and chunk.content:
                     full_content += chunk.content
@@ -211,6 +316,17 @@ class SmartSchedulerAgent:
                 # Accumulate tool calls
                 if hasattr(chunk, 'tool_calls') and chunk.tool_calls:
                     tool_calls_accumulated.extend(chunk.tool_calls)
+                
+                # Announce tools on the first call fragment so voice clients
+                # can cover the tool phase before the arguments finish streaming
+                if not tools_announced:
+                    fragments = getattr(chunk, 'tool_call_chunks', None) or getattr(chunk, 'tool_calls', None) or []
+                    if fragments:
+                        tools_announced = True
+                        yield {
+                            'type': 'tool_start',
+                            'tools': [f.get('name') for f in fragments if f.get('name')]
+                        }
             
             logger.info(f"[Session: {session_id}] LLM streaming complete. Tools: {len(tool_calls_accumulated)}")
             
@@ -218,63 +334,181 @@ class SmartSchedulerAgent:
             if tool_calls_accumulated:
                 logger.info(f"[Session: {session_id}] Executing {len(tool_calls_accumulated)} tools")
                 
-                # Add AI message with tool calls to history
-                state.add_message(AIMessage(
-                    content=full_content,
-                    tool_calls=tool_calls_accumulated
-                ))
+                # Execute tools - read-only calls concurrently, mutations in order
+                tools_start = time.perf_counter()
+                try:
+                    results = await self._execute_tool_calls(session_id, tool_calls_accumulated)
+                except asyncio.CancelledError:
+                    # Writes may still land on their worker thread - say so rather than drop the call
+                    unknown = {"error": "Interrupted before the result came back; check the calendar before retrying"}
+                    self._add_tool_turn(state, full_content, tool_calls_accumulated, [unknown] * len(tool_calls_accumulated))
+                    raise
                 
-                # Execute all tools
-                for tool_call in tool_calls_accumulated:
-                    tool_name = tool_call.get("name")
-                    tool_args = tool_call.get("args", {})
-                    tool_id = tool_call.get("id")
-                    
-                    try:
-                        logger.info(f"[Session: {session_id}] Executing: {tool_name}")
-                        result = await self._execute_tool(tool_name, tool_args)
-                        
-                        tool_message = ToolMessage(
-                            content=json.dumps(result, default=str),
-                            tool_call_id=tool_id
-                        )
-                        state.add_message(tool_message)
-                        
-                    except Exception as e:
-                        logger.error(f"[Session: {session_id}] Tool {tool_name} failed: {e}")
-                        error_message = ToolMessage(
-                            content=json.dumps({"error": str(e)}),
-                            tool_call_id=tool_id
-                        )
-                        state.add_message(error_message)
+                # The tool-call message and its results go in together, before
+                # the next yield: a consumer that closes the stream at any
+                # yield must leave a history the provider accepts
+                self._add_tool_turn(state, full_content, tool_calls_accumulated, results)
+                yield {
+                    'type': 'tool_end',
+                    'tools': [tc.get("name") for tc in tool_calls_accumulated],
+                    'duration_ms': round((time.perf_counter() - tools_start) * 1000, 1)
+                }
                 
                 # Stream final response with tool context
                 logger.info(f"[Session: {session_id}] Streaming final response after tools...")
                 recent_messages = state.get_recent_messages()
                 
-                async for chunk in llm_with_tools.astream(recent_messages):
+                final_content = ""
+                async for chunk in self._astream_llm(recent_messages, turn_usage):
                     if hasattr(chunk, 'content') and chunk.content:
+                        final_content += chunk.content
                         yield {
                             'type': 'content_chunk',
                             'content': chunk.content
                         }
+            else:
+                final_content = full_content
+            
+            # Keep the reply in history so later turns (and the window summary) see it
+            if final_content:
+                state.add_message(AIMessage(content=final_content))
+            
+            self._record_turn_usage(session_id, state, turn_usage)
+            
+            # Persisted in the background - never on the turn's critical path
+            session_persister.mark_dirty(state, user.id)
             
             # Signal completion
             yield {
                 'type': 'complete',
                 'session_id': session_id,
-                'turn_count': state.turn_count
+                'turn_count': state.turn_count,
+                'usage': turn_usage
             }
             
             logger.info(f"[Session: {session_id}] Streaming complete")
         
         except Exception as e:
             logger.error(f"[Session: {session_id}] Error in streaming: {e}", exc_info=True)
+            session_persister.mark_dirty(state, user.id)
             yield {
                 'type': 'error',
                 'error': str(e)
             }
 
+    async def _try_fast_path(self, session_id: str, state: ConversationState, intent) -> Optional[str]:
+        """
+        Run a fast-path intent's tool and render the reply, or return None
+        to fall back to the LLM
+        
+        The user's message is already in the history; on success the rest of
+        the turn is stored exactly as the LLM would have left it (tool call,
+        tool result, reply), so follow-up questions have the events in context.
+        """
+        start = time.perf_counter()
+        try:
+            result = await self._execute_tool(intent.tool, intent.args)
+            reply = fast_path_router.render(intent, result)
+        except Exception as e:
+            logger.warning(f"[Session: {session_id}] Fast path {intent.name} failed, using LLM: {e}")
+            reply = None
+        if not reply:
+            fast_path_router.record(None)
+            return None
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        fast_path_router.record(intent, elapsed_ms)
+        logger.info(f"[Session: {session_id}] Fast path {intent.name} answered in {elapsed_ms:.1f} ms")
+        
+        tool_call = {"name": intent.tool, "args": intent.args, "id": f"call_fp{uuid.uuid4().hex[:16]}"}
+        self._add_tool_turn(state, "", [tool_call], [result])
+        state.add_message(AIMessage(content=reply))
+        return reply
+
+    @staticmethod
+    def _add_tool_turn(state: ConversationState, content: str, tool_calls: List[Dict[str, Any]], results: List[Any]):
+        """Append an AIMessage with tool_calls and one ToolMessage per call"""
+        state.add_message(AIMessage(content=content, tool_calls=tool_calls))
+        for tool_call, result in zip(tool_calls, results):
+            state.add_message(ToolMessage(
+                content=encode_tool_result(tool_call.get("name"), result),
+                tool_call_id=tool_call.get("id")
+            ))
+
+    @staticmethod
+    def _new_turn_usage() -> Dict[str, Any]:
+        return {"llm_calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0, "first_token_ms": []}
+
+    async def _astream_llm(self, messages: List[Any], usage: Dict[str, Any]):
+        """astream the tool-bound LLM, adding token counts and first-token latency to usage"""
+        start = time.perf_counter()
+        first = True
+        usage["llm_calls"] += 1
+        async for chunk in self.llm_with_tools.astream(messages):
+            if first:
+                usage["first_token_ms"].append(round((time.perf_counter() - start) * 1000, 1))
+                first = False
+            meta = getattr(chunk, 'usage_metadata', None)
+            if meta:
+                usage["input_tokens"] += meta.get("input_tokens", 0) or 0
+                usage["output_tokens"] += meta.get("output_tokens", 0) or 0
+                usage["cached_input_tokens"] += (meta.get("input_token_details") or {}).get("cache_read", 0) or 0
+            yield chunk
+
+    def _record_turn_usage(self, session_id: str, state: ConversationState, usage: Dict[str, Any]):
+        state.metadata["last_turn_usage"] = usage
+        for key in ("llm_calls", "input_tokens", "cached_input_tokens", "output_tokens"):
+            self.usage_totals[key] += usage[key]
+        self.usage_totals["turns"] += 1
+        logger.info(
+            f"[Session: {session_id}] Tokens: input={usage['input_tokens']} "
+            f"(cached {usage['cached_input_tokens']}), output={usage['output_tokens']}, "
+            f"first token ms={usage['first_token_ms']}"
+        )
+
+    def usage_stats(self) -> Dict[str, Any]:
+        """LLM token usage totals since startup"""
+        totals = dict(self.usage_totals)
+        turns = totals["turns"]
+        totals["avg_input_tokens_per_turn"] = round(totals["input_tokens"] / turns, 1) if turns else 0.0
+        totals["cached_input_ratio"] = (
+            round(totals["cached_input_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0
+        )
+        return totals
+
+    async def _execute_tool_calls(self, session_id: str, tool_calls: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Execute one LLM turn's tool calls, returning results in call order
+        
+        Consecutive read-only calls run concurrently; a mutating call waits
+        for everything before it and runs on its own, so writes keep the
+        order the LLM asked for.
+        """
+        results: List[Any] = [None] * len(tool_calls)
+        
+        async def run(index: int, tool_call: Dict[str, Any]):
+            tool_name = tool_call.get("name")
+            try:
+                logger.info(f"[Session: {session_id}] Executing: {tool_name}")
+                results[index] = await self._execute_tool(tool_name, tool_call.get("args", {}))
+            except Exception as e:
+                logger.error(f"[Session: {session_id}] Tool {tool_name} failed: {e}")
+                results[index] = {"error": str(e)}
+        
+        pending = []
+        for index, tool_call in enumerate(tool_calls):
+            if tool_call.get("name") in self.MUTATING_TOOLS:
+                if pending:
+                    await asyncio.gather(*pending)
+                    pending = []
+                await run(index, tool_call)
+            else:
+                pending.append(run(index, tool_call))
+        if pending:
+            await asyncio.gather(*pending)
+        
+        return results
+
     async def _execute_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """Execute a tool and return its result"""
         tool = self.tool_map.get(tool_name)
@@ -283,7 +517,8 @@ class SmartSchedulerAgent:
             raise ValueError(f"Unknown tool: {tool_name}")
         
         try:
-            result = tool.invoke(args)
+            # Tools do blocking HTTP/DB work - keep it off the event loop
+            result = await tool_executor.run(tool.invoke, args)
             return result
         except Exception as e:
             logger.error(f"Tool execution failed for {tool_name}: {e}", exc_info=True)
@@ -293,16 +528,18 @@ class SmartSchedulerAgent:
     async def process_message(self, session_id: str, user_message: str, user: User) -> Dict[str, Any]:
         """Legacy method - collects streaming response into single dict"""
         full_reply = ""
+        state = None
         
         async for chunk_data in self.process_message_streaming(session_id, user_message, user):
             if chunk_data['type'] == 'content_chunk':
                 full_reply += chunk_data['content']
             elif chunk_data['type'] == 'complete':
+                state = self.sessions.get(session_id)
                 return {
                     "session_id": chunk_data['session_id'],
                     "reply": full_reply,
                     "tools_used": [],
-                    "metadata": self.sessions[session_id].metadata,
+                    "metadata": state.metadata if state else {},
                     "turn_count": chunk_data['turn_count'],
                     "timestamp": datetime.now().isoformat()
                 }
@@ -319,11 +556,23 @@ class SmartSchedulerAgent:
 
     def store_audio(self, audio_id: str, audio_data: bytes):
         """Store audio temporarily"""
-        self.audio_cache[audio_id] = audio_data
+        self.audio_cache.put(audio_id, audio_data)
 
-    def get_audio(self, audio_id: str) -> Optional[bytes]:
+    def get_audio(self, audio_id: str) -> Optional[AudioEntry]:
         """Retrieve stored audio"""
-        return self.audio_cache.get(audio_id)
+        return self.audio_cache.open(audio_id)
+
+    def start_live_audio(self, audio_id: str) -> LiveAudio:
+        """Register audio that is served while it is still being synthesized"""
+        return self.audio_cache.start_live(audio_id)
+
+    def get_live_audio(self, audio_id: str) -> Optional[LiveAudio]:
+        """Audio still being synthesized, if any"""
+        return self.audio_cache.open_live(audio_id)
+
+    async def finish_live_audio(self, audio_id: str):
+        """Mark live audio complete and keep it like any stored audio"""
+        await self.audio_cache.finish_live(audio_id)
 
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Get session information"""
@@ -336,15 +585,16 @@ class SmartSchedulerAgent:
 
     def clear_session(self, session_id: str) -> bool:
         """Clear a session"""
-        if session_id in self.sessions:
+        session_persister.forget(session_id)
+        if self.sessions.pop(session_id) is not None:
             logger.info(f"Clearing session: {session_id}")
-            del self.sessions[session_id]
             return True
         return False
 
     def clear_all_sessions(self):
         """Clear all sessions"""
         count = len(self.sessions)
+        session_persister.forget_all()
         self.sessions.clear()
         self.audio_cache.clear()
         logger.info(f"Cleared {count} sessions and audio cache")
@@ -0,0 +1,352 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger("audio_cache")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class AudioEntry:
+    """
+    A cached audio payload in either tier, readable by byte range
+
+    Disk entries hold the file open from open() on, so the bytes stay
+    readable even if the cache evicts and unlinks the file mid-response.
+    A disk entry is read once: iter_range() closes the file when done.
+    """
+
+    def __init__(self, size: int, data: Optional[bytes] = None, file: Optional[BinaryIO] = None):
+        self.size = size
+        self._data = data
+        self._file = file
+
+    @property
+    def tier(self) -> str:
+        return "memory" if self._data is not None else "disk"
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield bytes [start, end] (inclusive) in CHUNK_SIZE pieces"""
+        end = self.size - 1 if end is None else end
+        if self._data is not None:
+            view = memoryview(self._data)
+            for offset in range(start, end + 1, CHUNK_SIZE):
+                yield bytes(view[offset:min(offset + CHUNK_SIZE, end + 1)])
+            return
+
+        try:
+            if self._file is None or self.size == 0 or start > end:
+                return  # mmap can't map an empty file
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(start, end + 1, CHUNK_SIZE):
+                    yield mm[offset:min(offset + CHUNK_SIZE, end + 1)]
+        finally:
+            self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LiveAudio:
+    """Audio still being synthesized; readers follow along as bytes arrive"""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._changed = asyncio.Condition()
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def data(self) -> bytes:
+        return bytes(self._buf)
+
+    async def append(self, data: bytes):
+        async with self._changed:
+            self._buf += data
+            self._changed.notify_all()
+
+    async def finish(self):
+        async with self._changed:
+            self.done = True
+            self._changed.notify_all()
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Yield everything written so far, then new bytes until finished"""
+        offset = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self._buf) > offset or self.done)
+                chunk = bytes(self._buf[offset:])
+                finished = self.done
+            if chunk:
+                offset += len(chunk)
+                yield chunk
+            elif finished:
+                return
+
+
+class AudioCache:
+    """
+    Byte-budgeted two-tier cache for synthesized audio
+
+    Recent clips live in memory in LRU order. When the memory budget is
+    exceeded the coldest clips are spilled to files under AUDIO_CACHE_DIR
+    and served through mmap; the disk tier has its own budget. Entries in
+    either tier expire after AUDIO_CACHE_TTL_SECONDS.
+
+    Spill writes run on a worker thread when called from the event loop;
+    until a write lands the clip is still served from memory.
+
+    With persistent=True every clip is also written through to disk under
+    its own id (ids must be file-name safe, e.g. content hashes), and the
+    files are re-indexed on startup instead of purged, so the disk tier
+    survives restarts.
+    """
+
+    def __init__(self, max_memory_bytes: int, max_disk_bytes: int, ttl_seconds: int, directory: str,
+                 persistent: bool = False):
+        self.persistent = persistent
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory)
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk: "OrderedDict[str, Path]" = OrderedDict()
+        self._spilling: Dict[str, bytes] = {}
+        self._sizes: Dict[str, int] = {}
+        self._created: Dict[str, float] = {}
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self._live: Dict[str, LiveAudio] = {}
+
+        # Metrics
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.spills = 0
+        self.evictions = 0
+
+        for partial in self.directory.glob("*.tmp"):
+            self._unlink(partial)
+        if persistent:
+            self._reindex()
+        else:
+            # Spilled files from a previous process aren't indexed - drop them
+            for leftover in self.directory.glob("*.mp3"):
+                self._unlink(leftover)
+
+    def _reindex(self):
+        """Pick up files from a previous process, oldest first, within TTL and disk budget"""
+        now_wall, now = time.time(), time.monotonic()
+        found = []
+        for path in self.directory.glob("*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path, stat.st_size))
+        for mtime, path, size in sorted(found):
+            age = max(now_wall - mtime, 0.0)
+            if age > self.ttl_seconds:
+                self._unlink(path)
+                continue
+            audio_id = path.stem
+            self._disk[audio_id] = path
+            self._sizes[audio_id] = size
+            self._created[audio_id] = now - age
+            self.disk_bytes += size
+        self._trim_disk()
+        if self._disk:
+            logger.info(f"Re-indexed {len(self._disk)} cached clip(s) ({self.disk_bytes} bytes) from {self.directory}")
+
+    def _file_for(self, audio_id: str) -> Path:
+        if self.persistent:
+            return self.directory / f"{audio_id}.mp3"
+        return self.directory / (hashlib.sha1(audio_id.encode()).hexdigest() + ".mp3")
+
+    def put(self, audio_id: str, data: bytes):
+        """Store a clip in the memory tier (and on disk, if persistent)"""
+        self.discard(audio_id)
+        self._memory[audio_id] = data
+        self._sizes[audio_id] = len(data)
+        self._created[audio_id] = time.monotonic()
+        self.memory_bytes += len(data)
+        if self.persistent:
+            self._write_behind(audio_id, data)
+        self._expire()
+        self._spill()
+
+    def open(self, audio_id: str) -> Optional[AudioEntry]:
+        """Look a clip up in either tier"""
+        if audio_id in self._created and self._is_expired(audio_id):
+            self.discard(audio_id)
+
+        if audio_id in self._memory:
+            self._memory.move_to_end(audio_id)
+            self.hits_memory += 1
+            data = self._memory[audio_id]
+            return AudioEntry(len(data), data=data)
+
+        if audio_id in self._spilling:
+            self.hits_memory += 1
+            data = self._spilling[audio_id]
+            return AudioEntry(len(data), data=data)
+
+        if audio_id in self._disk:
+            try:
+                file = open(self._disk[audio_id], "rb")
+            except OSError as e:
+                logger.error(f"Cached audio {audio_id} is gone from disk: {e}")
+                self.discard(audio_id)
+                self.misses += 1
+                return None
+            self._disk.move_to_end(audio_id)
+            self.hits_disk += 1
+            return AudioEntry(os.fstat(file.fileno()).st_size, file=file)
+
+        self.misses += 1
+        return None
+
+    def start_live(self, audio_id: str) -> LiveAudio:
+        """Register a clip that readers can stream while it is being written"""
+        live = LiveAudio()
+        self._live[audio_id] = live
+        return live
+
+    def open_live(self, audio_id: str) -> Optional[LiveAudio]:
+        return self._live.get(audio_id)
+
+    async def finish_live(self, audio_id: str):
+        """Mark a live clip complete and move it into the cache proper"""
+        live = self._live.get(audio_id)
+        if live is None:
+            return
+        if live.data:
+            self.put(audio_id, live.data)
+        del self._live[audio_id]
+        await live.finish()
+
+    def discard(self, audio_id: str):
+        if audio_id in self._memory:
+            self.memory_bytes -= len(self._memory.pop(audio_id))
+        self._spilling.pop(audio_id, None)
+        if audio_id in self._disk:
+            self._unlink(self._disk.pop(audio_id))
+            self.disk_bytes -= self._sizes.get(audio_id, 0)
+        self._sizes.pop(audio_id, None)
+        self._created.pop(audio_id, None)
+
+    def clear(self):
+        for audio_id in list(self._created):
+            self.discard(audio_id)
+
+    def _is_expired(self, audio_id: str) -> bool:
+        return time.monotonic() - self._created[audio_id] > self.ttl_seconds
+
+    def _expire(self):
+        for audio_id in [a for a in self._created if self._is_expired(a)]:
+            self.discard(audio_id)
+            self.evictions += 1
+
+    def _spill(self):
+        """Move the coldest memory entries to disk until under budget"""
+        while self.memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            audio_id, data = self._memory.popitem(last=False)
+            self.memory_bytes -= len(data)
+            if audio_id in self._disk:
+                continue  # already written through
+            if audio_id in self._spilling:
+                continue  # write in flight; served from _spilling until it lands
+            self._write_behind(audio_id, data)
+
+        self._trim_disk()
+
+    def _write_behind(self, audio_id: str, data: bytes):
+        """Write a clip to disk - on a worker thread if called from the event loop"""
+        self._spilling[audio_id] = data
+        path = self._file_for(audio_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            self._spilled(audio_id, path, data, self._write_file(path, data))
+        else:
+            task = loop.create_task(asyncio.to_thread(self._write_file, path, data))
+            task.add_done_callback(
+                lambda t, audio_id=audio_id, path=path, data=data: self._spilled(
+                    audio_id, path, data, OSError("spill cancelled") if t.cancelled() else t.result()
+                )
+            )
+
+    def _write_file(self, path: Path, data: bytes) -> Optional[OSError]:
+        """Blocking write via a temp file, so a reader never sees a partial clip"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{id(data)}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            return None
+        except OSError as e:
+            return e
+
+    def _spilled(self, audio_id: str, path: Path, data: bytes, error: Optional[OSError]):
+        if self._spilling.get(audio_id) is not data:
+            # Discarded or replaced while the write was in flight
+            if error is None and audio_id not in self._disk and audio_id not in self._spilling:
+                self._unlink(path)
+            return
+        del self._spilling[audio_id]
+        if error is not None:
+            logger.error(f"Failed to spill audio {audio_id} to disk: {error}")
+            if audio_id in self._memory:
+                return  # write-through failed; the memory copy is still good
+            self._sizes.pop(audio_id, None)
+            self._created.pop(audio_id, None)
+            self.evictions += 1
+            return
+        self._disk[audio_id] = path
+        self.disk_bytes += len(data)
+        self.spills += 1
+        self._trim_disk()
+
+    def _trim_disk(self):
+        while self.disk_bytes > self.max_disk_bytes and self._disk:
+            audio_id, path = self._disk.popitem(last=False)
+            self._unlink(path)
+            self.disk_bytes -= self._sizes.get(audio_id, 0)
+            if audio_id not in self._memory:
+                self._sizes.pop(audio_id, None)
+                self._created.pop(audio_id, None)
+                self.evictions += 1
+
+    def _unlink(self, path: Path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live_entries": len(self._live),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self.memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self.disk_bytes,
+            "pending_spills": len(self._spilling),
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "spills": self.spills,
+            "evictions": self.evictions
+        }
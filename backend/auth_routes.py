@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import RedirectResponse
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
 import uuid
 from datetime import datetime
@@ -12,7 +11,9 @@ from config import config
 from database import User, get_db
 from utils.auth import create_access_token
 from utils.logger import setup_logger
+from utils.discovery import build_service
 from utils.auth import get_current_user
+from tools_gcal import calendar_service_cache
 
 logger = setup_logger("auth")
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -58,7 +59,7 @@ async def auth_callback(code: str, db: Session = Depends(get_db)):
         credentials = flow.credentials
         
         # Get user info
-        service = build('oauth2', 'v2', credentials=credentials)
+        service = build_service('oauth2', 'v2', credentials)
         user_info = service.userinfo().get().execute()
         
         email = user_info['email']
@@ -96,6 +97,10 @@ async def auth_callback(code: str, db: Session = Depends(get_db)):
         
         db.commit()
         
+        # Main account tokens changed - rebuild the shared calendar client
+        if user.is_main_account:
+            calendar_service_cache.invalidate()
+        
         # Create JWT token
         access_token = create_access_token(data={"sub": user.id, "email": user.email})
         
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import config
+from utils.intervals import Interval, BusyIntervalIndex, sweep_line
+from utils.logger import setup_logger
+
+logger = setup_logger("availability")
+
+MAIN_CALENDAR_KEY = "primary"
+
+
+def _parse_busy(busy: List[Dict[str, str]]) -> List[Interval]:
+    return [
+        (
+            datetime.fromisoformat(b['start'].replace("Z", "+00:00")).timestamp(),
+            datetime.fromisoformat(b['end'].replace("Z", "+00:00")).timestamp(),
+        )
+        for b in busy
+    ]
+
+
+class AvailabilityEngine:
+    """
+    Common free time across the main calendar and attendee calendars
+
+    Attendee busy times come from freebusy().query, chunked to the API's
+    per-request calendar limit and sent as a single HTTP batch. The main
+    calendar's busy times come from the local mirror index. Everything is
+    merged with one sweep-line pass and the resulting slots are ranked.
+    """
+
+    def query_busy(
+        self,
+        service,
+        calendars: List[str],
+        time_min: datetime,
+        time_max: datetime
+    ) -> Tuple[Dict[str, List[Interval]], List[str]]:
+        """Busy intervals per calendar, plus calendars we couldn't read"""
+        busy_by_calendar: Dict[str, List[Interval]] = {}
+        unavailable: List[str] = []
+        if not calendars:
+            return busy_by_calendar, unavailable
+
+        chunk_size = config.FREEBUSY_BATCH_SIZE
+        chunks = [calendars[i:i + chunk_size] for i in range(0, len(calendars), chunk_size)]
+        bodies = [
+            {
+                "timeMin": time_min.isoformat(),
+                "timeMax": time_max.isoformat(),
+                "items": [{"id": cal} for cal in chunk]
+            }
+            for chunk in chunks
+        ]
+
+        def collect(chunk: List[str], response: Dict[str, Any]):
+            # A calendar missing from the response is unknown, not free
+            returned = {cal_id.lower(): data for cal_id, data in (response.get('calendars') or {}).items()}
+            for cal_id in chunk:
+                data = returned.get(cal_id.lower())
+                if data is None or data.get('errors'):
+                    unavailable.append(cal_id)
+                else:
+                    busy_by_calendar[cal_id] = _parse_busy(data.get('busy', []))
+
+        if len(bodies) == 1:
+            collect(chunks[0], service.freebusy().query(body=bodies[0]).execute())
+        else:
+            def callback(request_id, response, exception):
+                chunk = chunks[int(request_id)]
+                if exception is not None:
+                    logger.error(f"Freebusy batch part {request_id} failed: {exception}")
+                    unavailable.extend(chunk)
+                    return
+                collect(chunk, response)
+
+            batch = service.new_batch_http_request(callback=callback)
+            for index, body in enumerate(bodies):
+                batch.add(service.freebusy().query(body=body), request_id=str(index))
+            batch.execute()
+
+        logger.info(
+            f"Freebusy for {len(calendars)} calendar(s) in {len(bodies)} part(s), "
+            f"{len(unavailable)} unavailable"
+        )
+        return busy_by_calendar, unavailable
+
+    def find_slots(
+        self,
+        service,
+        main_index: BusyIntervalIndex,
+        attendees: List[str],
+        windows: List[Tuple[datetime, datetime]],
+        duration_min: int,
+        max_slots: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Ranked slots inside the given windows
+
+        Slots where every attendee is free come first, in time order. If
+        there are not enough of those, slots where the host is free but some
+        attendees are busy follow, fewest conflicts first.
+        """
+        if not windows:
+            return {"slots": [], "count": 0, "unavailable_calendars": []}
+
+        tz = windows[0][0].tzinfo
+        range_start, range_end = windows[0][0], windows[-1][1]
+        busy_by_calendar, unavailable = self.query_busy(service, attendees, range_start, range_end)
+        busy_by_calendar[MAIN_CALENDAR_KEY] = main_index.busy_between(range_start, range_end)
+
+        duration = duration_min * 60
+        full: List[Tuple[float, float]] = []
+        partial: List[Tuple[int, float, float, frozenset]] = []
+
+        for window_start, window_end in windows:
+            segments = sweep_line(busy_by_calendar, window_start.timestamp(), window_end.timestamp())
+            for seg_start, seg_end, busy in segments:
+                if seg_end - seg_start < duration or MAIN_CALENDAR_KEY in busy:
+                    continue
+                if busy:
+                    partial.append((len(busy), seg_start, seg_end, busy))
+                else:
+                    full.append((seg_start, seg_end))
+
+        def render(start: float, unavailable_for: Optional[frozenset] = None) -> Dict[str, Any]:
+            slot_start = datetime.fromtimestamp(start, tz)
+            slot_end = slot_start + timedelta(minutes=duration_min)
+            slot = {
+                "start": slot_start.strftime("%A, %B %d at %I:%M %p"),
+                "end": slot_end.strftime("%I:%M %p"),
+                "start_iso": slot_start.isoformat(),
+                "end_iso": slot_end.isoformat(),
+                # Calendars we couldn't read may well be busy
+                "everyone_free": not unavailable_for and not unavailable
+            }
+            if unavailable_for:
+                slot["busy_attendees"] = sorted(unavailable_for)
+            return slot
+
+        slots = [render(start) for start, _ in full[:max_slots]]
+        if len(slots) < max_slots:
+            partial.sort(key=lambda p: (p[0], p[1]))
+            slots.extend(render(start, busy) for _, start, _, busy in partial[:max_slots - len(slots)])
+
+        return {
+            "slots": slots,
+            "count": len(full),
+            "partial_count": len(partial),
+            "unavailable_calendars": unavailable
+        }
+
+
+availability_engine = AvailabilityEngine()
@@ -0,0 +1,89 @@
+"""
+Per-turn agent overhead, excluding the network
+
+The LLM is a zero-latency script: one tool call, then a short reply, which
+is what a typical calendar question looks like. What is left is the
+agent's own work per turn: session lookup, history and context window
+updates, tool dispatch, result encoding and event plumbing. This script
+reports:
+
+- llm.bind_tools(tools) on the real ChatOpenAI. This is the per-turn cost
+  the agent paid before the tool-bound runnable was cached in __init__.
+- A full scripted turn with the cached runnable, and the same turn with a
+  bind_tools call added, as the old code did.
+- How the cached-path turn time grows with the session length (median of
+  five turns at each length).
+"""
+import asyncio
+import uuid
+
+from common import measure, report
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+from agent import SmartSchedulerAgent
+from config import config
+from database import User
+
+
+class InstantLLM:
+    """Tool-bound LLM stand-in that answers immediately"""
+
+    async def astream(self, messages):
+        if not isinstance(messages[-1], ToolMessage):
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "calendar_today_summary", "args": "{}", "id": f"call_{uuid.uuid4().hex[:8]}", "index": 0}
+            ])
+            return
+        for piece in ["You have ", "two meetings ", "today."]:
+            yield AIMessageChunk(content=piece)
+
+
+class TodayTool:
+    name = "calendar_today_summary"
+
+    def invoke(self, args):
+        return {"date": "2025-10-06", "events": [
+            {"title": "Standup", "start": "09:00 AM", "end": "09:15 AM", "attendees": ["a@example.com"]},
+            {"title": "Design review", "start": "01:30 PM", "end": "02:00 PM", "attendees": ["a@example.com"]},
+        ]}
+
+
+def main():
+    config.FAST_PATH_ENABLED = False
+    agent = SmartSchedulerAgent()
+    real_llm = agent.llm
+    agent.llm_with_tools = InstantLLM()
+    agent.tool_map["calendar_today_summary"] = TodayTool()
+    user = User(id="bench-user", email="bench@example.com", name="Bench", google_id="g-bench", is_main_account=False)
+
+    async def turn(session_id, rebind=False):
+        if rebind:
+            real_llm.bind_tools(agent.tools)
+        async for _ in agent.process_message_streaming(session_id, "what do I have today?", user):
+            pass
+
+    bind = measure(lambda: real_llm.bind_tools(agent.tools), repeat=200, warmup=5)
+    cached = measure(lambda: asyncio.run(turn(f"bench-{uuid.uuid4().hex[:8]}")), repeat=100, warmup=5)
+    per_turn = measure(lambda: asyncio.run(turn(f"bench-{uuid.uuid4().hex[:8]}", rebind=True)), repeat=100, warmup=5)
+    report(f"Per-turn overhead, {len(agent.tools)} tools, no network", [
+        {"step": "bind_tools (removed from each turn)", **bind},
+        {"step": "turn, cached tool binding", **cached},
+        {"step": "turn, bind_tools per turn (old)", **per_turn},
+    ])
+
+    rows = []
+    session_id = f"bench-long-{uuid.uuid4().hex[:8]}"
+    done = 0
+    for turns in (1, 10, 50, 200):
+        while done < turns - 1:
+            asyncio.run(turn(session_id))
+            done += 1
+        stats = measure(lambda: asyncio.run(turn(session_id)), repeat=5, warmup=0)
+        done += 5
+        rows.append({"session_turns": done, "turn_ms": stats["median_ms"]})
+    report("Cached-path turn time by session length", rows)
+
+
+if __name__ == "__main__":
+    main()
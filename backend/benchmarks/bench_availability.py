@@ -0,0 +1,140 @@
+"""
+Availability engine vs. a naive per-attendee scan on synthetic calendars
+
+The naive baseline issues one freebusy request per attendee and checks
+every 15-minute candidate start against every calendar's busy list. The
+engine sends one batched request per FREEBUSY_BATCH_SIZE calendars and
+finds slots with a single sweep-line pass. The engine also ranks partial
+slots (host free, some attendees busy), which the baseline doesn't, so on
+dense calendars its CPU time can be higher; the win is in round-trips.
+total_ms adds RTT_MS per sequential HTTP request to the CPU time.
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from common import measure, report
+
+import pytz
+
+from availability import AvailabilityEngine
+from config import config
+from utils.intervals import BusyIntervalIndex, daily_windows
+
+TZ = pytz.timezone("Asia/Kolkata")
+DURATION_MIN = 30
+STEP_MIN = 15
+RTT_MS = float(sys.argv[1]) if len(sys.argv) > 1 else 80.0
+
+
+def synthetic_busy(rng, first_day, days, meetings_per_day=(3, 6)):
+    busy = []
+    for d in range(days):
+        day = first_day + timedelta(days=d)
+        for _ in range(rng.randint(*meetings_per_day)):
+            start = day.replace(hour=rng.randint(9, 17), minute=rng.choice((0, 15, 30, 45)))
+            end = start + timedelta(minutes=rng.choice((30, 45, 60, 90)))
+            busy.append({"start": start.astimezone(pytz.utc).isoformat(), "end": end.astimezone(pytz.utc).isoformat()})
+    return busy
+
+
+class CountingService:
+    """freebusy() stand-in that answers from synthetic data and counts HTTP requests"""
+
+    def __init__(self, busy):
+        self.busy = busy
+        self.requests = 0
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        service = self
+
+        class Request:
+            def execute(self):
+                service.requests += 1
+                return {"calendars": {i["id"]: {"busy": service.busy.get(i["id"], [])} for i in body["items"]}}
+        return Request()
+
+    def new_batch_http_request(self, callback):
+        service = self
+
+        class Batch:
+            def __init__(self):
+                self.parts = []
+
+            def add(self, request, request_id=None):
+                self.parts.append((request_id, request))
+
+            def execute(self):
+                service.requests += 1  # one HTTP round-trip for the whole batch
+                requests_before = service.requests
+                for request_id, request in self.parts:
+                    callback(request_id, request.execute(), None)
+                service.requests = requests_before
+        return Batch()
+
+
+def naive_find_slots(service, main_busy, attendees, windows, duration_min, max_slots=5):
+    """What a straightforward implementation would do: one request per attendee, then a minute-step scan"""
+    busy = {"primary": main_busy}
+    for cal in attendees:
+        response = service.freebusy().query(body={"items": [{"id": cal}]}).execute()
+        busy[cal] = [
+            (datetime.fromisoformat(b["start"]).timestamp(), datetime.fromisoformat(b["end"]).timestamp())
+            for b in response["calendars"][cal]["busy"]
+        ]
+    slots = []
+    for start, end in windows:
+        t = start
+        while t + timedelta(minutes=duration_min) <= end:
+            a, b = t.timestamp(), t.timestamp() + duration_min * 60
+            if all(not (s < b and e > a) for intervals in busy.values() for s, e in intervals):
+                slots.append(t)
+            t += timedelta(minutes=STEP_MIN)
+    return slots[:max_slots], len(slots)
+
+
+def main():
+    rng = random.Random(7)
+    engine = AvailabilityEngine()
+    rows = []
+    for attendees_count in (10, 50, 100):
+        for days in (5, 21):
+            first_day = TZ.localize(datetime(2025, 10, 6))
+            attendees = [f"user{i}@example.com" for i in range(attendees_count)]
+            busy = {cal: synthetic_busy(rng, first_day, days, (1, 2)) for cal in attendees}
+            main_busy_dt = [
+                (datetime.fromisoformat(b["start"]), datetime.fromisoformat(b["end"]))
+                for b in synthetic_busy(rng, first_day, days)
+            ]
+            main_index = BusyIntervalIndex.from_datetimes(main_busy_dt)
+            main_busy = [(s.timestamp(), e.timestamp()) for s, e in main_busy_dt]
+            windows = daily_windows(first_day, first_day + timedelta(days=days - 1), 9, 18)
+
+            service = CountingService(busy)
+            engine.find_slots(service, main_index, attendees, windows, DURATION_MIN)
+            engine_requests = service.requests
+            engine_time = measure(lambda: engine.find_slots(service, main_index, attendees, windows, DURATION_MIN), repeat=10)
+
+            service = CountingService(busy)
+            naive_find_slots(service, main_busy, attendees, windows, DURATION_MIN)
+            naive_requests = service.requests
+            naive_time = measure(lambda: naive_find_slots(service, main_busy, attendees, windows, DURATION_MIN), repeat=3, warmup=0)
+
+            rows.append({
+                "attendees": attendees_count,
+                "days": days,
+                "engine_http_requests": engine_requests,
+                "naive_http_requests": naive_requests,
+                "engine_ms": engine_time["median_ms"],
+                "naive_ms": naive_time["median_ms"],
+                "engine_total_ms": engine_time["median_ms"] + engine_requests * RTT_MS,
+                "naive_total_ms": naive_time["median_ms"] + naive_requests * RTT_MS,
+            })
+    report(f"find_slots, {DURATION_MIN} min meetings (batch size {config.FREEBUSY_BATCH_SIZE}, RTT {RTT_MS:g} ms)", rows)
+
+
+if __name__ == "__main__":
+    main()
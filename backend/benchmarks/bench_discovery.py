@@ -0,0 +1,59 @@
+"""
+Building Google API clients: network discovery vs bundled documents
+
+This script reports, per API the backend uses (calendar v3, oauth2 v2):
+
+- network: build(..., static_discovery=False) fetches the discovery
+  document over HTTPS on every build. This is the pre-2.0 client behaviour
+  and the cost of a cold start without bundled documents. It is skipped if
+  there is no network.
+- library static: build(..., cache_discovery=False), the previous call.
+  Recent google-api-python-client versions read the bundled document from
+  disk and parse it on every build.
+- build_service: utils.discovery, which loads the document once per
+  process and builds with build_from_document. The first call is shown
+  separately as "cold".
+
+Pass "--offline" to skip the network rows.
+"""
+import sys
+
+from common import measure, report
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from utils import discovery
+
+APIS = [("calendar", "v3"), ("oauth2", "v2")]
+
+
+def main():
+    credentials = Credentials(token="bench-token")
+    offline = "--offline" in sys.argv
+    rows = []
+    for service, version in APIS:
+        discovery._documents.pop((service, version), None)
+        cold = measure(lambda: discovery.build_service(service, version, credentials), repeat=1, warmup=0)
+        rows.append({"api": f"{service}.{version}", "method": "build_service (cold)", **cold})
+        warm = measure(lambda: discovery.build_service(service, version, credentials), repeat=30)
+        rows.append({"api": f"{service}.{version}", "method": "build_service", **warm})
+
+        static = measure(lambda: build(service, version, credentials=credentials, cache_discovery=False), repeat=30)
+        rows.append({"api": f"{service}.{version}", "method": "library static", **static})
+
+        if offline:
+            continue
+        try:
+            network = measure(
+                lambda: build(service, version, credentials=credentials, cache_discovery=False, static_discovery=False),
+                repeat=5, warmup=1,
+            )
+            rows.append({"api": f"{service}.{version}", "method": "network", **network})
+        except Exception as e:
+            print(f"Skipping network discovery for {service}.{version}: {e}")
+    report("Client build time", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Fast path for simple calendar reads vs the full agent loop
+
+This script reports:
+
+- classify() cost and decision for a mix of queries. Every query pays this
+  cost, including the ones that go to the LLM.
+- End-to-end turn time through process_message_streaming, with the fast
+  path on and off. The LLM is scripted: each call waits FIRST_TOKEN_MS, then
+  streams tokens at TOKEN_MS. The tool is a local stub, so the result is the
+  turn overhead the fast path removes, not network time.
+
+Pass a different first-token latency as argv[1] (default 450 ms).
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+from common import measure, report
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+from agent import SmartSchedulerAgent
+from config import config
+from database import User
+from fast_path import fast_path_router
+
+FIRST_TOKEN_MS = float(sys.argv[1]) if len(sys.argv) > 1 else 450.0
+TOKEN_MS = 25.0
+
+QUERIES = [
+    "What's on my calendar today?",
+    "what do I have tomorrow",
+    "What's my next meeting?",
+    "list my next 3 meetings",
+    "Do I have a meeting at 3 PM tomorrow?",
+    "Do I have the design review meeting today?",
+    "book a meeting with Priya tomorrow at 4",
+    "am I free on friday afternoon",
+]
+
+EVENTS = [
+    {"title": "Standup", "start": "09:00 AM", "end": "09:15 AM"},
+    {"title": "Design review", "start": "01:30 PM", "end": "02:00 PM"},
+    {"title": "Hiring sync", "start": "04:00 PM", "end": "04:30 PM"},
+]
+REPLY = "You have three meetings today. First is Standup from 9 AM to 9:15 AM, then Design review, and finally Hiring sync."
+
+
+class SlowLLM:
+    """Tool-bound LLM stand-in with realistic first-token and per-token latency"""
+
+    async def astream(self, messages):
+        await asyncio.sleep(FIRST_TOKEN_MS / 1000)
+        if not isinstance(messages[-1], ToolMessage):
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "calendar_today_summary", "args": "{}", "id": f"call_{uuid.uuid4().hex[:8]}", "index": 0}
+            ])
+            return
+        for word in REPLY.split(" "):
+            await asyncio.sleep(TOKEN_MS / 1000)
+            yield AIMessageChunk(content=word + " ")
+
+
+class TodayTool:
+    name = "calendar_today_summary"
+
+    def invoke(self, args):
+        return {"events": EVENTS}
+
+
+async def timed_turn(agent, user, message):
+    """(ms to first content chunk, ms to complete)"""
+    start = time.perf_counter()
+    first = None
+    async for event in agent.process_message_streaming(f"bench-{uuid.uuid4().hex[:8]}", message, user):
+        if event["type"] == "content_chunk" and first is None:
+            first = (time.perf_counter() - start) * 1000
+    return first, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rows = []
+    for query in QUERIES:
+        stats = measure(lambda: fast_path_router.classify(query), repeat=2000, warmup=50)
+        intent = fast_path_router.classify(query)
+        rows.append({
+            "query": query,
+            "decision": intent.name if intent else "llm",
+            "classify_us": stats["median_ms"] * 1000,
+        })
+    report("classify() per query", rows)
+
+    agent = SmartSchedulerAgent()
+    agent.llm_with_tools = SlowLLM()
+    agent.tool_map["calendar_today_summary"] = TodayTool()
+    user = User(id="bench-user", email="bench@example.com", name="Bench", google_id="g-bench", is_main_account=False)
+
+    turn_rows = []
+    for enabled in (False, True):
+        config.FAST_PATH_ENABLED = enabled
+        samples = [asyncio.run(timed_turn(agent, user, QUERIES[0])) for _ in range(5)]
+        samples.sort(key=lambda s: s[1])
+        first, total = samples[len(samples) // 2]
+        turn_rows.append({
+            "path": "fast path" if enabled else "agent loop",
+            "first_content_ms": first,
+            "turn_ms": total,
+        })
+    report(
+        f"'{QUERIES[0]}' end to end (LLM first token {FIRST_TOKEN_MS:g} ms, {TOKEN_MS:g} ms/token, local tool)",
+        turn_rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
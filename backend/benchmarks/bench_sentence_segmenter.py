@@ -0,0 +1,117 @@
+"""
+Streaming sentence segmentation: the old per-chunk rescan vs SentenceSegmenter
+
+The old loop in stream_llm_to_tts appended each token to a buffer,
+rescanned the whole buffer for terminators and re.split it on every chunk.
+It also dropped sentences of 10 characters or fewer. This script reports:
+
+- CPU per response for both, at several response lengths.
+- Time to first audio (TTFA): the point at which the first chunk reaches
+  TTS, for a simulated LLM emitting one token every TOKEN_MS. The default
+  TTS_FIRST_CHUNK_MIN_CHARS clause flush is included.
+"""
+import re
+
+from common import measure, report
+
+from config import config
+from utils.sentence_segmenter import SentenceSegmenter
+
+TOKEN_MS = 25.0  # typical streamed token interval
+TOKEN = re.compile(r"\s*\S{1,4}")
+
+REPLIES = [
+    "Okay, I checked your calendar for tomorrow, and you have two meetings. First is the Deadline Discussion "
+    "from 1 PM to 1:45 PM, and then you have a Startup Talk from 3 PM to 3:45 PM.",
+    "No. I don't see anything on Friday. Would you like me to find a time?",
+    "I found a few times that work. You could do Monday at 2 PM, Tuesday at 3, or Wednesday at 4. "
+    "Which works best for you?",
+    "Let me confirm the details. The meeting is Project Sync with Dr. Rao, on Monday, October 7 at 2:30 p.m. "
+    "for 30 minutes. Guests are alice@example.com and bob@example.com. Should I go ahead and book this meeting?",
+]
+
+
+def tokens(text):
+    return TOKEN.findall(text)
+
+
+def old_segmenter(chunks):
+    """The pre-segmenter loop, minus TTS cleaning; returns (sentences, token index of the first)"""
+    sentence_buffer = ""
+    out = []
+    first = None
+    for index, content in enumerate(chunks):
+        sentence_buffer += content
+        if any(punct in sentence_buffer for punct in ['. ', '! ', '? ', '.\n', '!\n', '?\n']):
+            sentences = re.split(r'([.!?]+\s*)', sentence_buffer)
+            for i in range(0, len(sentences) - 1, 2):
+                if i + 1 < len(sentences):
+                    complete = (sentences[i] + sentences[i + 1]).strip()
+                    if complete and len(complete) > 10:
+                        out.append(complete)
+                        if first is None:
+                            first = index
+            sentence_buffer = sentences[-1] if len(sentences) % 2 == 1 else ""
+    if sentence_buffer.strip():
+        out.append(sentence_buffer.strip())
+        if first is None:
+            first = len(chunks)
+    return out, first
+
+
+def new_segmenter(chunks, first_chunk_min_chars=0):
+    segmenter = SentenceSegmenter(first_chunk_min_chars=first_chunk_min_chars)
+    out = []
+    first = None
+    for index, content in enumerate(chunks):
+        done = segmenter.feed(content)
+        if done and first is None:
+            first = index
+        out.extend(done)
+    rest = segmenter.flush()
+    if rest:
+        out.append(rest)
+        if first is None:
+            first = len(chunks)
+    return out, first
+
+
+def main():
+    cpu_rows = []
+    long_reply = " ".join(REPLIES)
+    for repeat in (1, 4, 16):
+        chunks = tokens(" ".join([long_reply] * repeat))
+        old = measure(lambda: old_segmenter(chunks), repeat=20)
+        new = measure(lambda: new_segmenter(chunks), repeat=20)
+        cpu_rows.append({
+            "tokens": len(chunks),
+            "old_ms": old["median_ms"],
+            "new_ms": new["median_ms"],
+            "old_us_per_token": old["median_ms"] * 1000 / len(chunks),
+            "new_us_per_token": new["median_ms"] * 1000 / len(chunks),
+        })
+    report("Segmentation CPU per response", cpu_rows)
+
+    ttfa_rows = []
+    for reply in REPLIES:
+        chunks = tokens(reply)
+        old_sentences, old_first = old_segmenter(chunks)
+        _, new_first = new_segmenter(chunks)
+        clause_sentences, clause_first = new_segmenter(chunks, config.TTS_FIRST_CHUNK_MIN_CHARS)
+        ttfa_rows.append({
+            "reply": reply[:28] + "...",
+            "old_ttfa_ms": (old_first + 1) * TOKEN_MS,
+            "new_ttfa_ms": (new_first + 1) * TOKEN_MS,
+            "clause_ttfa_ms": (clause_first + 1) * TOKEN_MS,
+            "old_first_chunk": old_sentences[0][:24],
+            "clause_first_chunk": clause_sentences[0][:24],
+        })
+    report(
+        f"Time to first TTS chunk, {TOKEN_MS:g} ms/token "
+        f"(clause = first_chunk_min_chars {config.TTS_FIRST_CHUNK_MIN_CHARS}; add TTS first-byte latency for TTFA)",
+        ttfa_rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
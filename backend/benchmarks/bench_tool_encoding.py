@@ -0,0 +1,108 @@
+"""
+Compact tool-result encoding vs plain JSON
+
+Results are generated in the shape tools_gcal returns them, for a light,
+typical and heavy calendar. This script reports, per tool and calendar:
+
+- Estimated tokens for the ToolMessage. context_window.estimate_tokens is
+  the same ~4 chars/token estimate that the context budget uses.
+- Encode time for both formats.
+
+Every tool call sends its ToolMessage back to the LLM at least once (and on
+each later turn until the context window compacts it), so the tokens saved
+are input tokens saved on every one of those calls.
+"""
+import random
+from datetime import datetime, timedelta
+
+from common import measure, report
+
+from langchain_core.messages import ToolMessage
+
+from config import config
+from context_window import estimate_tokens
+from tool_encoding import encode_tool_result
+
+TITLES = ["Standup", "Design review", "Hiring sync", "1:1 with manager", "Customer call - Acme",
+          "Sprint planning", "Lunch", "Focus time", "Quarterly business review", "Interview: backend"]
+PEOPLE = [f"{name}@example.com" for name in
+          ["alice", "bob", "carol", "dev", "erin", "farah", "gopal", "hana", "ivan", "jyoti", "kiran", "lee"]]
+
+CALENDARS = {"light": 3, "typical": 8, "heavy": 15}
+
+
+def events(count, days, rng):
+    start = datetime(2025, 10, 6, 9, 0)
+    out = []
+    for i in range(count):
+        day = start + timedelta(days=i % days)
+        begin = day + timedelta(minutes=30 * (i // days) * 2)
+        out.append({
+            "title": rng.choice(TITLES),
+            "start": begin.strftime("%A, %B %d at %I:%M %p") if days > 1 else begin.strftime("%I:%M %p"),
+            "end": (begin + timedelta(minutes=30)).strftime("%I:%M %p"),
+            "attendees": rng.sample(PEOPLE, rng.randint(0, 6)),
+        })
+    return out
+
+
+def slots(count):
+    start = datetime(2025, 10, 6, 10, 0)
+    out = []
+    for i in range(count):
+        begin = start + timedelta(minutes=45 * i)
+        end = begin + timedelta(minutes=30)
+        out.append({
+            "start": begin.strftime("%I:%M %p"),
+            "end": end.strftime("%I:%M %p"),
+            "start_iso": begin.isoformat() + "+05:30",
+            "end_iso": end.isoformat() + "+05:30",
+        })
+    return out
+
+
+def cases(rng):
+    for label, count in CALENDARS.items():
+        yield "calendar_today_summary", label, {"date": "2025-10-06", "events": events(count, 1, rng), "count": count}
+        yield "calendar_list_upcoming", label, {"events": events(count, 3, rng), "count": count}
+    yield "calendar_freebusy", "typical", {"date": "2025-10-06", "slots": slots(5), "count": 9}
+    yield "calendar_create_event", "typical", {
+        "status": "created", "event_id": "a1b2c3d4e5", "title": "Design review",
+        "start": "Monday, October 06 at 02:00 PM", "attendees": PEOPLE[:3],
+        "link": "https://www.google.com/calendar/event?eid=a1b2c3d4e5",
+    }
+
+
+def encode_as(mode, tool, result):
+    config.TOOL_RESULT_ENCODING = mode
+    return encode_tool_result(tool, result)
+
+
+def main():
+    rng = random.Random(7)
+    rows = []
+    total_json = total_compact = 0
+    for tool, label, result in cases(rng):
+        as_json = encode_as("json", tool, result)
+        compact = encode_as("compact", tool, result)
+        json_tokens = estimate_tokens(ToolMessage(content=as_json, tool_call_id="x"))
+        compact_tokens = estimate_tokens(ToolMessage(content=compact, tool_call_id="x"))
+        total_json += json_tokens
+        total_compact += compact_tokens
+        json_us = measure(lambda: encode_as("json", tool, result), repeat=500, warmup=20)["median_ms"] * 1000
+        compact_us = measure(lambda: encode_as("compact", tool, result), repeat=500, warmup=20)["median_ms"] * 1000
+        rows.append({
+            "tool": tool,
+            "calendar": label,
+            "json_tokens": json_tokens,
+            "compact_tokens": compact_tokens,
+            "saved": f"{1 - compact_tokens / json_tokens:.0%}",
+            "json_us": json_us,
+            "compact_us": compact_us,
+        })
+    report("ToolMessage size and encode time", rows)
+    print(f"\nTotal: {total_json} -> {total_compact} tokens ({1 - total_compact / total_json:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
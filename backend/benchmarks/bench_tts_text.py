@@ -0,0 +1,61 @@
+"""
+Throughput of clean_response_for_tts: legacy re.sub chain vs precompiled passes
+
+Reports characters per second on the golden corpus, once as the voice
+handler calls it (one call per sentence) and once as full responses.
+The legacy cleaner is the reference kept in tests/legacy_tts_cleaner.py.
+"""
+import json
+import sys
+
+from common import BACKEND_DIR, measure, report
+
+sys.path.insert(0, str(BACKEND_DIR / "tests"))
+
+from legacy_tts_cleaner import clean_response_for_tts as legacy_clean
+from utils.sentence_segmenter import SentenceSegmenter
+from utils.tts_text import clean_response_for_tts
+
+CORPUS = [c["input"] for c in json.loads((BACKEND_DIR / "tests" / "data" / "tts_golden.json").read_text(encoding="utf-8"))]
+PLAIN = (
+    "You have two meetings today. First is your Deadline Discussion from 1 PM to 1:45 PM, "
+    "and then you have a Startup Talk from 3 PM to 3:45 PM. Would you like me to add anything?"
+)
+
+
+def sentences(texts):
+    out = []
+    for text in texts:
+        segmenter = SentenceSegmenter()
+        out.extend(segmenter.feed(text))
+        rest = segmenter.flush()
+        if rest:
+            out.append(rest)
+    return out
+
+
+def main():
+    workloads = {
+        "corpus, per sentence": sentences(CORPUS),
+        "corpus, full responses": CORPUS,
+        "plain replies, per sentence": sentences([PLAIN] * 50),
+        "plain replies, full responses": [PLAIN] * 50,
+    }
+    rows = []
+    for name, texts in workloads.items():
+        chars = sum(len(t) for t in texts)
+        legacy = measure(lambda: [legacy_clean(t) for t in texts], repeat=50)
+        new = measure(lambda: [clean_response_for_tts(t) for t in texts], repeat=50)
+        rows.append({
+            "workload": name,
+            "calls": len(texts),
+            "chars": chars,
+            "legacy_chars_per_s": int(chars / (legacy["median_ms"] / 1000)),
+            "new_chars_per_s": int(chars / (new["median_ms"] / 1000)),
+            "speedup": legacy["median_ms"] / new["median_ms"],
+        })
+    report("clean_response_for_tts throughput", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Voice pipeline pacing: the old 10 ms sleep per chunk vs socket backpressure
+
+The real DeepgramStream and StreamingVoiceService.synthesize_stream_ws
+talk to local fake Deepgram and ElevenLabs websocket servers (aiohttp).
+The servers answer every audio chunk or text chunk immediately, so what is
+measured is the latency the client adds: the time from a chunk being queued
+(by the browser or the LLM) to its transcript or audio coming back.
+
+The old senders slept 10 ms after every send. That is reproduced by pacing
+the input stream the same way. Scenarios:
+
+- realtime: chunks arrive at their natural rate (100 ms mic chunks, or
+  sentences every 300 ms). The sleep hides inside the gaps, so expect no
+  difference.
+- burst: a backlog arrives at once. Examples are audio queued while the
+  socket reconnected, or a reply whose sentences were all ready (fast LLM,
+  cached response). The sleep puts chunk k roughly k * 10 ms behind.
+"""
+import asyncio
+import base64
+import json
+import statistics
+import time
+
+from common import report
+
+from aiohttp import WSMsgType, web
+
+from config import config
+from http_pool import http_pool
+from streaming_voice_service import streaming_voice_service
+from stt_stream import DeepgramStream
+from tts_socket_pool import tts_socket_pool
+
+OLD_SLEEP_S = 0.01
+AUDIO_CHUNK_BYTES = 1600  # ~100 ms of webm/opus from MediaRecorder
+SENTENCES = [
+    "Okay, I checked your calendar for tomorrow.",
+    "You have two meetings.",
+    "First is the Deadline Discussion from 1 PM to 1:45 PM.",
+    "Then you have a Startup Talk from 3 PM to 3:45 PM.",
+    "After that, your afternoon is free.",
+    "Would you like me to book something?",
+]
+
+
+async def fake_deepgram(request):
+    """Replies to every audio chunk with a transcript naming the chunk"""
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for msg in ws:
+        if msg.type == WSMsgType.BINARY:
+            index = int.from_bytes(msg.data[:8], "big")
+            await ws.send_json({
+                "type": "Results",
+                "is_final": False,
+                "channel": {"alternatives": [{"transcript": f"chunk {index}"}]},
+            })
+        elif msg.type == WSMsgType.TEXT and json.loads(msg.data).get("type") == "CloseStream":
+            break
+    await ws.close()
+    return ws
+
+
+async def fake_elevenlabs(request):
+    """Replies to every text chunk with an audio chunk naming it; isFinal on EOS"""
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    index = 0
+    async for msg in ws:
+        if msg.type != WSMsgType.TEXT:
+            continue
+        text = json.loads(msg.data).get("text")
+        if text == "":
+            await ws.send_json({"isFinal": True})
+            break
+        if text.strip():
+            audio = index.to_bytes(8, "big") + b"\0" * 2048
+            await ws.send_json({"audio": base64.b64encode(audio).decode()})
+            index += 1
+    await ws.close()
+    return ws
+
+
+async def queued(queue):
+    """Drain a producer's queue, like the handler's audio/text generators"""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        yield item
+
+
+async def paced(stream):
+    """The old senders' asyncio.sleep(0.01) after every send"""
+    async for item in stream:
+        yield item  # resumes once the sender has sent it
+        await asyncio.sleep(OLD_SLEEP_S)
+
+
+async def produce(queue, items, interval_s, produced):
+    for index, item in enumerate(items):
+        if index and interval_s:
+            await asyncio.sleep(interval_s)
+        produced[index] = time.perf_counter()
+        await queue.put(item)
+    await queue.put(None)
+
+
+async def run_stt(base_url, chunks, interval_s, old):
+    produced, received = {}, {}
+
+    async def on_transcript(text):
+        received.setdefault(int(text.split()[1]), time.perf_counter())
+
+    async def on_final(text):
+        pass
+
+    queue = asyncio.Queue()
+    audio = queued(queue)
+    stream = DeepgramStream(f"{base_url}/listen", {}, on_transcript, on_final)
+    producer = asyncio.create_task(produce(queue, chunks, interval_s, produced))
+    await stream.run(paced(audio) if old else audio)
+    await producer
+    return produced, received
+
+
+async def run_tts(sentences, interval_s, old):
+    produced, received = {}, {}
+
+    async def on_audio_chunk(audio):
+        received.setdefault(int.from_bytes(audio[:8], "big"), time.perf_counter())
+
+    key = (streaming_voice_service.elevenlabs_voice_id, streaming_voice_service.elevenlabs_model_id)
+    await tts_socket_pool._fill(key)  # a pre-warmed socket, as in production
+    queue = asyncio.Queue()
+    text = queued(queue)
+    producer = asyncio.create_task(produce(queue, sentences, interval_s, produced))
+    await streaming_voice_service.synthesize_stream_ws(paced(text) if old else text, on_audio_chunk)
+    await producer
+    return produced, received
+
+
+def row(stage, scenario, old, produced, received):
+    added = [(received[i] - produced[i]) * 1000 for i in produced if i in received]
+    return {
+        "stage": stage,
+        "scenario": scenario,
+        "pacing": "sleep 10ms" if old else "backpressure",
+        "chunks": len(added),
+        "mean_added_ms": statistics.fmean(added),
+        "max_added_ms": max(added),
+        "last_chunk_ms": (max(received.values()) - min(produced.values())) * 1000,
+    }
+
+
+def audio_chunks(count):
+    return [i.to_bytes(8, "big") + b"\0" * (AUDIO_CHUNK_BYTES - 8) for i in range(count)]
+
+
+async def main():
+    app = web.Application()
+    app.router.add_get("/listen", fake_deepgram)
+    app.router.add_get("/tts", fake_elevenlabs)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    config.ELEVENLABS_API_KEY = config.ELEVENLABS_API_KEY or "bench-key"
+    config.ELEVENLABS_POOL_SIZE = 1
+    tts_socket_pool._url = lambda key: f"{base_url}/tts"
+    await http_pool.start()
+
+    rows = []
+    try:
+        for scenario, count, interval_s in (("realtime 100ms", 30, 0.1), ("burst", 100, 0)):
+            for old in (True, False):
+                produced, received = await run_stt(base_url, audio_chunks(count), interval_s, old)
+                rows.append(row("stt audio", scenario, old, produced, received))
+        for scenario, interval_s in (("realtime 300ms", 0.3), ("burst", 0)):
+            for old in (True, False):
+                produced, received = await run_tts(SENTENCES * 3, interval_s, old)
+                rows.append(row("tts text", scenario, old, produced, received))
+    finally:
+        while tts_socket_pool._filling:  # let the post-checkout refill finish
+            await asyncio.sleep(0.01)
+        await tts_socket_pool.close()
+        await http_pool.close()
+        await runner.cleanup()
+
+    report("Latency added between queueing a chunk and its response (local fake servers)", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Shared setup for the scripts in this directory
+
+Run a benchmark from backend/, e.g. `python benchmarks/bench_availability.py`.
+Settings point at a throwaway database and cache directories, so nothing
+touches the real ones and no API keys are needed.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp = tempfile.mkdtemp(prefix="scheduler-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("LLM_PROVIDER", "openai")
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+os.environ.setdefault("DEFAULT_TIMEZONE", "Asia/Kolkata")
+os.environ.setdefault("AUDIO_CACHE_DIR", f"{_tmp}/audio_cache")
+os.environ.setdefault("TTS_CACHE_DIR", f"{_tmp}/tts_cache")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def measure(fn: Callable[[], object], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """Wall-clock milliseconds per call: median, p95 and mean"""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def report(title: str, rows: List[Dict[str, object]]):
+    """Print rows as an aligned table"""
+    print(f"\n== {title} ==")
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[_fmt(row.get(c)) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}" if value < 100 else f"{value:.1f}"
+    return str(value)
@@ -0,0 +1,231 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from googleapiclient.errors import HttpError
+import pytz
+
+from config import config
+from database import CalendarEvent, CalendarSyncState, SessionLocal
+from utils.logger import setup_logger
+
+logger = setup_logger("calendar_mirror")
+
+
+def _to_utc(value: Dict[str, str]) -> datetime:
+    """Convert a Google start/end object to a naive UTC datetime"""
+    if 'dateTime' in value:
+        dt = datetime.fromisoformat(value['dateTime'].replace("Z", "+00:00"))
+    else:
+        # All-day events are anchored to midnight in the calendar timezone
+        tz = pytz.timezone(value.get('timeZone') or config.DEFAULT_TIMEZONE)
+        dt = tz.localize(datetime.strptime(value['date'], "%Y-%m-%d"))
+    return dt.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _search_text(event: Dict[str, Any]) -> str:
+    parts = [
+        event.get('summary', ''),
+        event.get('description', ''),
+        event.get('location', ''),
+    ]
+    parts.extend(a.get('email', '') for a in event.get('attendees', []))
+    return " ".join(p for p in parts if p).lower()
+
+
+def _declined_by_self(event: Dict[str, Any]) -> bool:
+    """The calendar owner declined the invite (freebusy doesn't count these as busy)"""
+    return any(a.get('self') and a.get('responseStatus') == 'declined' for a in event.get('attendees', []))
+
+
+class CalendarMirror:
+    """
+    Local SQLite mirror of the main calendar
+
+    Kept current with Calendar API incremental sync (syncToken). Read tools
+    query the mirror; writes go to Google first and are then upserted here.
+    """
+
+    def __init__(self, calendar_id: str = 'primary'):
+        self.calendar_id = calendar_id
+        self._lock = threading.RLock()
+        self._last_sync = 0.0
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.api_calls = 0
+        # Bumped on every change so derived indexes know when to rebuild
+        self.version = 0
+
+    # ---------------- SYNC ---------------- #
+
+    def ensure_fresh(self, service, max_age: Optional[float] = None):
+        """Sync if the mirror is older than max_age seconds"""
+        max_age = config.CALENDAR_MIRROR_MAX_AGE_SECONDS if max_age is None else max_age
+        if time.monotonic() - self._last_sync < max_age:
+            return
+        with self._lock:
+            # Another caller may have synced while we waited for the lock
+            if time.monotonic() - self._last_sync >= max_age:
+                self.sync(service)
+
+    def sync(self, service):
+        """Pull changes from Google, falling back to a full sync if needed"""
+        with self._lock:
+            db = SessionLocal()
+            try:
+                state = db.query(CalendarSyncState).filter(
+                    CalendarSyncState.calendar_id == self.calendar_id
+                ).first()
+                if state is None:
+                    state = CalendarSyncState(calendar_id=self.calendar_id)
+                    db.add(state)
+
+                try:
+                    next_token, changed = self._pull(service, db, state.sync_token)
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    # Sync token expired - wipe and start over
+                    logger.warning("Calendar sync token invalidated, running full sync")
+                    next_token, changed = self._pull(service, db, None)
+
+                state.sync_token = next_token
+                state.last_synced = datetime.utcnow()
+                db.commit()
+                self._last_sync = time.monotonic()
+                if changed:
+                    self.version += 1
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def _pull(self, service, db, sync_token: Optional[str]) -> Tuple[Optional[str], bool]:
+        """Page through events().list and apply changes; returns (next token, changed)"""
+        params = {
+            'calendarId': self.calendar_id,
+            'singleEvents': True,
+            'maxResults': 2500,
+        }
+        if sync_token:
+            params['syncToken'] = sync_token
+            self.incremental_syncs += 1
+        else:
+            db.query(CalendarEvent).filter(CalendarEvent.calendar_id == self.calendar_id).delete()
+            self.full_syncs += 1
+
+        changed = 0
+        page_token = None
+        while True:
+            if page_token:
+                params['pageToken'] = page_token
+            result = service.events().list(**params).execute()
+            self.api_calls += 1
+
+            for event in result.get('items', []):
+                if event.get('status') == 'cancelled':
+                    db.query(CalendarEvent).filter(CalendarEvent.id == event['id']).delete()
+                else:
+                    self._upsert(db, event)
+                changed += 1
+
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                logger.info(
+                    f"Calendar mirror {'incremental' if sync_token else 'full'} sync: {changed} change(s)"
+                )
+                return result.get('nextSyncToken'), changed or not sync_token
+
+    def _upsert(self, db, event: Dict[str, Any]):
+        if 'start' not in event or 'end' not in event:
+            return
+        db.merge(CalendarEvent(
+            id=event['id'],
+            calendar_id=self.calendar_id,
+            summary=event.get('summary', ''),
+            start_time=_to_utc(event['start']),
+            end_time=_to_utc(event['end']),
+            search_text=_search_text(event),
+            transparent=event.get('transparency') == 'transparent',
+            declined=_declined_by_self(event),
+            raw=json.dumps(event),
+            updated=datetime.utcnow()
+        ))
+
+    def apply(self, event: Dict[str, Any]):
+        """Write-through for an event created or updated via the API"""
+        db = SessionLocal()
+        try:
+            self._upsert(db, event)
+            db.commit()
+            self.version += 1
+        finally:
+            db.close()
+
+    # ---------------- READS ---------------- #
+
+    def _query(self, db):
+        return db.query(CalendarEvent).filter(CalendarEvent.calendar_id == self.calendar_id)
+
+    def upcoming(self, now: datetime, n: int) -> List[Dict[str, Any]]:
+        """Next n events that have not ended yet"""
+        now_utc = now.astimezone(pytz.utc).replace(tzinfo=None)
+        db = SessionLocal()
+        try:
+            rows = (
+                self._query(db)
+                .filter(CalendarEvent.end_time > now_utc)
+                .order_by(CalendarEvent.start_time)
+                .limit(n)
+                .all()
+            )
+            return [json.loads(row.raw) for row in rows]
+        finally:
+            db.close()
+
+    def between(self, start: datetime, end: datetime, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Events overlapping [start, end), optionally matching a keyword"""
+        start_utc = start.astimezone(pytz.utc).replace(tzinfo=None)
+        end_utc = end.astimezone(pytz.utc).replace(tzinfo=None)
+        db = SessionLocal()
+        try:
+            q = (
+                self._query(db)
+                .filter(CalendarEvent.start_time < end_utc)
+                .filter(CalendarEvent.end_time > start_utc)
+            )
+            if query:
+                for word in query.lower().split():
+                    q = q.filter(CalendarEvent.search_text.contains(word))
+            rows = q.order_by(CalendarEvent.start_time).all()
+            return [json.loads(row.raw) for row in rows]
+        finally:
+            db.close()
+
+    def busy_intervals(self) -> List[Tuple[datetime, datetime]]:
+        """(start, end) in aware UTC for every event that blocks time"""
+        db = SessionLocal()
+        try:
+            rows = (
+                self._query(db)
+                .filter(CalendarEvent.transparent.isnot(True))
+                .filter(CalendarEvent.declined.isnot(True))
+                .with_entities(CalendarEvent.start_time, CalendarEvent.end_time)
+                .all()
+            )
+            return [(pytz.utc.localize(start), pytz.utc.localize(end)) for start, end in rows]
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "api_calls": self.api_calls,
+            "seconds_since_sync": round(time.monotonic() - self._last_sync, 1) if self._last_sync else None
+        }
+
+
+calendar_mirror = CalendarMirror()
@@ -27,6 +27,13 @@ class Config:
         'https://www.googleapis.com/auth/calendar',
         'https://www.googleapis.com/auth/calendar.events'
     ]
+    DISCOVERY_DOCS_DIR = os.getenv("DISCOVERY_DOCS_DIR", "discovery")
+    CALENDAR_SERVICE_RECHECK_SECONDS = int(os.getenv("CALENDAR_SERVICE_RECHECK_SECONDS", "60"))
+    CALENDAR_MIRROR_MAX_AGE_SECONDS = int(os.getenv("CALENDAR_MIRROR_MAX_AGE_SECONDS", "30"))
+    CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS = int(os.getenv("CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS", "20"))
+    FREEBUSY_MAX_RANGE_DAYS = int(os.getenv("FREEBUSY_MAX_RANGE_DAYS", "42"))
+    TOOL_EXECUTOR_MAX_WORKERS = int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", "8"))
+    FREEBUSY_BATCH_SIZE = int(os.getenv("FREEBUSY_BATCH_SIZE", "50"))  # calendars per freebusy request
     
     # OAuth Configuration (NEW)
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
@@ -46,6 +53,37 @@ class Config:
     ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")  # For TTS
     VOICE_ENABLED = os.getenv("VOICE_ENABLED", "true").lower() == "true"
     ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM") 
+    ELEVENLABS_STREAM_MODEL_ID = os.getenv("ELEVENLABS_STREAM_MODEL_ID", "eleven_turbo_v2_5")
+    ELEVENLABS_POOL_SIZE = int(os.getenv("ELEVENLABS_POOL_SIZE", "2"))  # idle sockets per voice/model
+    ELEVENLABS_INACTIVITY_TIMEOUT_SECONDS = int(os.getenv("ELEVENLABS_INACTIVITY_TIMEOUT_SECONDS", "180"))
+    ELEVENLABS_POOL_MAX_IDLE_SECONDS = int(os.getenv("ELEVENLABS_POOL_MAX_IDLE_SECONDS", "150"))
+    ELEVENLABS_POOL_CHECK_INTERVAL_SECONDS = int(os.getenv("ELEVENLABS_POOL_CHECK_INTERVAL_SECONDS", "15"))
+    VOICE_AUDIO_QUEUE_MAX_CHUNKS = int(os.getenv("VOICE_AUDIO_QUEUE_MAX_CHUNKS", "100"))  # ~10s of 100ms mic chunks
+    VOICE_TEXT_QUEUE_MAX_CHUNKS = int(os.getenv("VOICE_TEXT_QUEUE_MAX_CHUNKS", "32"))
+    VOICE_FILLERS_ENABLED = os.getenv("VOICE_FILLERS_ENABLED", "true").lower() == "true"  # "Let me check..." while tools run
+    TTS_FIRST_CHUNK_MIN_CHARS = int(os.getenv("TTS_FIRST_CHUNK_MIN_CHARS", "20"))  # 0 = only flush whole sentences first
+    DEEPGRAM_KEEPALIVE_SECONDS = float(os.getenv("DEEPGRAM_KEEPALIVE_SECONDS", "5"))  # Deepgram closes after ~10s without data
+    DEEPGRAM_REPLAY_MS = int(os.getenv("DEEPGRAM_REPLAY_MS", "300"))  # audio re-sent after a reconnect
+    DEEPGRAM_MAX_RECONNECT_ATTEMPTS = int(os.getenv("DEEPGRAM_MAX_RECONNECT_ATTEMPTS", "3"))
+    DEEPGRAM_RECONNECT_BACKOFF_SECONDS = float(os.getenv("DEEPGRAM_RECONNECT_BACKOFF_SECONDS", "0.25"))
+    HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+    HTTP_POOL_DNS_TTL_SECONDS = int(os.getenv("HTTP_POOL_DNS_TTL_SECONDS", "300"))
+    HTTP_POOL_KEEPALIVE_SECONDS = float(os.getenv("HTTP_POOL_KEEPALIVE_SECONDS", "60"))
+    HTTP_POOL_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_POOL_CONNECT_TIMEOUT_SECONDS", "5"))
+    HTTP_POOL_TOTAL_TIMEOUT_SECONDS = float(os.getenv("HTTP_POOL_TOTAL_TIMEOUT_SECONDS", "30"))
+    AUDIO_CACHE_MEMORY_BYTES = int(os.getenv("AUDIO_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+    AUDIO_CACHE_DISK_BYTES = int(os.getenv("AUDIO_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+    AUDIO_CACHE_TTL_SECONDS = int(os.getenv("AUDIO_CACHE_TTL_SECONDS", "3600"))
+    AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "audio_cache")
+    CHAT_STREAM_AUDIO = os.getenv("CHAT_STREAM_AUDIO", "false").lower() == "true"  # default for /chat and /voice/transcribe
+    CHAT_AUDIO_SYNTHESIS_CONCURRENCY = int(os.getenv("CHAT_AUDIO_SYNTHESIS_CONCURRENCY", "2"))  # sentences synthesized ahead
+    TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+    TTS_CACHE_DISK_BYTES = int(os.getenv("TTS_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+    TTS_CACHE_TTL_SECONDS = int(os.getenv("TTS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+    TTS_CACHE_MAX_TEXT_CHARS = int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "300"))  # longer text rarely repeats
+    TTS_SENTENCE_CONCURRENCY = int(os.getenv("TTS_SENTENCE_CONCURRENCY", "2"))  # sentences synthesizing at once (streaming)
     
     # Timezone & Scheduling
     DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")
@@ -54,6 +92,17 @@ class Config:
     
     # Conversation
     MAX_CONVERSATION_HISTORY = int(os.getenv("MAX_CONVERSATION_HISTORY", "20"))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))  # estimated prompt tokens incl. system prompt
+    CONTEXT_TOOL_RESULT_MAX_CHARS = int(os.getenv("CONTEXT_TOOL_RESULT_MAX_CHARS", "1500"))  # for tool results of past turns
+    TOOL_RESULT_ENCODING = os.getenv("TOOL_RESULT_ENCODING", "compact")  # compact or json
+    TOOL_RESULT_JSON_TOOLS = [t.strip() for t in os.getenv("TOOL_RESULT_JSON_TOOLS", "").split(",") if t.strip()]
+    CONTEXT_SUMMARY_MAX_CHARS = int(os.getenv("CONTEXT_SUMMARY_MAX_CHARS", "2000"))
+    FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"  # answer simple calendar reads without the LLM
+    SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+    SESSION_IDLE_TTL_SECONDS = int(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600"))
+    SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+    SESSION_PERSIST_INTERVAL_SECONDS = float(os.getenv("SESSION_PERSIST_INTERVAL_SECONDS", "2"))
+    SESSION_RETENTION_SECONDS = int(os.getenv("SESSION_RETENTION_SECONDS", str(7 * 24 * 3600)))  # persisted rows
     
     # Server
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
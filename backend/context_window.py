@@ -0,0 +1,161 @@
+import json
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from utils.logger import setup_logger
+
+logger = setup_logger("context_window")
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+CONTEXT_PREFIX = re.compile(r'^\[Context\][^\n]*\n+')
+
+
+def estimate_tokens(message: Any) -> int:
+    """Cheap token estimate (~4 chars per token) - no tokenizer dependency"""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    chars = len(content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        chars += len(json.dumps(tool_calls, default=str))
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextWindow:
+    """
+    Token-budgeted view of a conversation for the LLM
+
+    The leading SystemMessage is always sent. After it, the window holds
+    whole turns (a HumanMessage plus the AI/tool messages that follow), so an
+    AIMessage with tool_calls is never separated from its ToolMessages. When
+    the window exceeds token_budget or max_messages, the oldest turns are
+    evicted and folded into a short running summary sent with the system
+    prompt. Tool results of finished turns are truncated to
+    tool_result_max_chars as soon as the next turn starts.
+
+    Token counts are cached per message and the window total is kept as a
+    running sum, so each message is counted, compacted and evicted once.
+    """
+
+    def __init__(self, token_budget: int, max_messages: int, tool_result_max_chars: int, summary_max_chars: int):
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+        self.tool_result_max_chars = tool_result_max_chars
+        self.summary_max_chars = summary_max_chars
+
+        self.token_counts: List[int] = []
+        self.start = 0           # first windowed (non-pinned) message
+        self.tokens = 0          # tokens in messages[start:]
+        self.pinned_tokens = 0
+        self.summary: List[str] = []
+        self._summary_chars = 0
+        self._turn_starts: Deque[int] = deque()
+
+    # ---- building ----
+
+    def append(self, messages: List[Any]):
+        """Account for messages[-1], which was just appended"""
+        index = len(messages) - 1
+        message = messages[index]
+        count = estimate_tokens(message)
+        self.token_counts.append(count)
+
+        if index == 0 and isinstance(message, SystemMessage):
+            self.pinned_tokens = count
+            self.start = 1
+            return
+
+        if isinstance(message, HumanMessage):
+            if self._turn_starts:
+                self._compact_turn(messages, self._turn_starts[-1], index)
+            self._turn_starts.append(index)
+
+        self.tokens += count
+        self._trim(messages)
+
+    def rebuild(self, messages: List[Any], start: Optional[int] = None, summary: Optional[List[str]] = None):
+        """Recompute cached counts for a rehydrated conversation"""
+        self.token_counts = [estimate_tokens(m) for m in messages]
+        pinned = 1 if messages and isinstance(messages[0], SystemMessage) else 0
+        self.pinned_tokens = self.token_counts[0] if pinned else 0
+        self.start = max(start or pinned, pinned)
+        self.tokens = sum(self.token_counts[self.start:])
+        self.summary = list(summary or [])
+        self._summary_chars = sum(len(line) + 1 for line in self.summary)
+        self._turn_starts = deque(
+            i for i in range(self.start, len(messages)) if isinstance(messages[i], HumanMessage)
+        )
+        self._trim(messages)
+
+    # ---- reading ----
+
+    def messages_for_llm(self, messages: List[Any]) -> List[Any]:
+        """Pinned system prompt (plus summary), then the windowed turns"""
+        window = messages[self.start:]
+        if not self.start:
+            return window
+        system = messages[0]
+        if self.summary:
+            system = SystemMessage(
+                content=f"{system.content}\n\nEARLIER IN THIS CONVERSATION (summarized):\n" + "\n".join(self.summary)
+            )
+        return [system] + window
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_tokens": self.pinned_tokens + self.tokens + self._summary_chars // CHARS_PER_TOKEN,
+            "windowed_messages": len(self.token_counts) - self.start,
+            "summarized_lines": len(self.summary)
+        }
+
+    # ---- internals ----
+
+    def _over_budget(self, messages: List[Any]) -> bool:
+        total = self.pinned_tokens + self.tokens + self._summary_chars // CHARS_PER_TOKEN
+        return total > self.token_budget or len(messages) - self.start > self.max_messages
+
+    def _trim(self, messages: List[Any]):
+        # The newest turn always stays, even if it alone is over budget
+        while len(self._turn_starts) > 1 and self._over_budget(messages):
+            first = self._turn_starts.popleft()
+            end = self._turn_starts[0]
+            # Anything before the first turn (legacy histories) goes with it
+            begin = min(self.start, first)
+            self._summarize_turn(messages, first, end)
+            self.tokens -= sum(self.token_counts[begin:end])
+            self.start = end
+
+    def _compact_turn(self, messages: List[Any], begin: int, end: int):
+        limit = self.tool_result_max_chars
+        for i in range(begin, end):
+            message = messages[i]
+            if isinstance(message, ToolMessage) and isinstance(message.content, str) and len(message.content) > limit:
+                dropped = len(message.content) - limit
+                message.content = f"{message.content[:limit]}... [truncated {dropped} chars]"
+                count = estimate_tokens(message)
+                if i >= self.start:
+                    self.tokens += count - self.token_counts[i]
+                self.token_counts[i] = count
+
+    def _summarize_turn(self, messages: List[Any], begin: int, end: int):
+        user_text = CONTEXT_PREFIX.sub("", messages[begin].content if isinstance(messages[begin].content, str) else "")
+        reply = ""
+        tools = []
+        for message in messages[begin + 1:end]:
+            if isinstance(message, AIMessage):
+                tools.extend(tc.get("name") for tc in (message.tool_calls or []))
+                if isinstance(message.content, str) and message.content.strip():
+                    reply = message.content
+        line = f"- User: {' '.join(user_text.split())[:160]}"
+        if tools:
+            line += f" (tools: {', '.join(t for t in tools if t)})"
+        if reply:
+            line += f" | Assistant: {' '.join(reply.split())[:200]}"
+
+        self.summary.append(line)
+        self._summary_chars += len(line) + 1
+        while self._summary_chars > self.summary_max_chars and len(self.summary) > 1:
+            self._summary_chars -= len(self.summary.pop(0)) + 1
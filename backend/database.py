@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Boolean, Text
+from sqlalchemy import create_engine, inspect, text, Column, String, DateTime, Boolean, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -35,9 +35,48 @@ class Session(Base):
     
     meta_data = Column("metadata", Text)  # JSON string
 
+class CalendarEvent(Base):
+    """Local mirror of an event on the main calendar"""
+    __tablename__ = "calendar_events"
+    
+    id = Column(String, primary_key=True)
+    calendar_id = Column(String, nullable=False, default="primary")
+    summary = Column(String)
+    start_time = Column(DateTime, nullable=False)  # UTC
+    end_time = Column(DateTime, nullable=False)  # UTC
+    search_text = Column(Text)  # lowercased summary/description/location/attendees
+    transparent = Column(Boolean, default=False)  # "show as available" - never blocks time
+    declined = Column(Boolean, default=False)  # declined by the calendar owner - never blocks time
+    raw = Column(Text)  # JSON event resource as returned by Google
+    updated = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_calendar_events_range", "calendar_id", "start_time", "end_time"),
+    )
+
+class CalendarSyncState(Base):
+    __tablename__ = "calendar_sync_state"
+    
+    calendar_id = Column(String, primary_key=True)
+    sync_token = Column(Text)
+    last_synced = Column(DateTime)
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+def _add_missing_columns():
+    """create_all() doesn't alter existing tables - add columns introduced later"""
+    columns = {c["name"] for c in inspect(engine).get_columns("calendar_events")}
+    missing = [name for name in ("transparent", "declined") if name not in columns]
+    if missing:
+        with engine.begin() as conn:
+            for name in missing:
+                conn.execute(text(f"ALTER TABLE calendar_events ADD COLUMN {name} BOOLEAN DEFAULT 0"))
+            # Existing rows don't have the new flags - force a full re-sync
+            conn.execute(text("DELETE FROM calendar_sync_state"))
+
+_add_missing_columns()
+
 def get_db():
     """Get database session"""
     db = SessionLocal()
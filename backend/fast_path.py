@@ -0,0 +1,239 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pytz
+
+from config import config
+from utils.logger import setup_logger
+from utils.time_parser import TimeParser
+
+logger = setup_logger("fast_path")
+
+MAX_UPCOMING = 10
+MAX_SPOKEN_EVENTS = 5
+MAX_QUERY_WORDS = 14
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+SPOKEN_NUMBERS = {n: w for w, n in NUMBER_WORDS.items()}
+
+# "Is this a request to read the calendar?"
+READ_CUE = re.compile(
+    r"\b(what'?s|what is|what are|what do i have|what have i got|do i have|have i got|"
+    r"show|list|tell me|read|give me|check|any)\b"
+)
+CALENDAR_CUE = re.compile(
+    r"\b(calendar|schedule|agenda|meetings?|events?|appointments?|plans?|booked|on|"
+    r"what do i have|what have i got|do i have|have i got)\b"
+)
+UPCOMING_CUE = re.compile(r"\b(next|upcoming|coming up)\b")
+COUNT = re.compile(r"\b(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")\s+(?:\w+\s+)?(meetings?|events?|appointments?)\b")
+
+DAY_WORDS = "|".join(["today", "tomorrow", "day after tomorrow"] + TimeParser.DAYS_OF_WEEK)
+
+# Anything beyond a plain listing (booking, searching, time windows,
+# clock times, people, specific titled events, ranges, months) goes to the LLM
+REJECT = re.compile(
+    r"\b(book|set up|create|add|invite|cancel|delete|remove|move|reschedule|change|update|"
+    r"free|time|available|availability|slots?|open|busy|with|about|called|titled|named|"
+    r"week|weekend|month|year|between|until|from|how|why|when|who|where|last|previous|not|don'?t)\b"
+    r"|schedule (a|an|me|my|the|it)\b|@"
+    # "at 3 pm", "14:30", "around 9", "noon"
+    r"|\b\d{1,2}:\d{2}\b|\b\d{1,2}\s*(am|pm|a\.m|p\.m|o'?clock)\b|\b(at|around|by|before|after)\s+\d{1,2}\b"
+    r"|\b(noon|midnight|tonight|morning|afternoon|evening)\b"
+    # "the design review meeting", "my standup", quoted titles
+    r"|\bthe\s+(?!next\b)[\w'-]+\s+(meeting|call|sync|event|appointment)\b"
+    r"|\b(standup|stand-up|sync|review|interview|demo|retro|one on one|1:1|lunch|dinner|calls?)\b"
+    r"|[\"“”]"
+    # Ranges and multi-day questions: "next 3 days", "friday and saturday", "in december"
+    r"|\bdays\b|\bday\b(?!\s+after\s+tomorrow)"
+    r"|\b(" + DAY_WORDS + r")\s+(and|or|through|thru|to|till)\s+(the\s+)?(" + DAY_WORDS + r")\b"
+    r"|\b(january|february|march|april|may|june|july|august|september|october|november|december|"
+    r"jan|feb|mar|apr|jun|jul|aug|sept?|oct|nov|dec)\b"
+)
+# Capitalized words that don't make a query about a specific event
+PROPER_WORDS = frozenset(["i", "i'm", "i've", "i'd", "today", "tomorrow"] + TimeParser.DAYS_OF_WEEK)
+DAY_AFTER_TOMORROW = re.compile(r"\bday after tomorrow\b")
+
+
+@dataclass
+class FastPathIntent:
+    """A query the fast path can answer: the tool to call and how to phrase it"""
+    name: str
+    tool: str
+    args: Dict[str, Any]
+    day: Optional[datetime] = None
+
+
+def _spoken_time(value: str) -> str:
+    """'01:00 PM' -> '1 PM', '01:45 PM' -> '1:45 PM'"""
+    clock, _, period = value.strip().partition(" ")
+    hour, _, minute = clock.partition(":")
+    hour = hour.lstrip("0") or "12"
+    return f"{hour} {period}" if minute in ("", "00") else f"{hour}:{minute} {period}"
+
+
+def _spoken_start(value: str) -> str:
+    """'Friday, October 17 at 01:00 PM' -> 'Friday, October 17 at 1 PM'"""
+    day, sep, clock = value.rpartition(" at ")
+    if not sep:
+        return _spoken_time(value)
+    month_day, _, number = day.rpartition(" ")
+    day = f"{month_day} {number.lstrip('0')}" if number.isdigit() else day
+    return f"{day} at {_spoken_time(clock)}"
+
+
+def _count(n: int, noun: str = "meeting") -> str:
+    return f"{SPOKEN_NUMBERS.get(n, str(n))} {noun}{'' if n == 1 else 's'}"
+
+
+def _join(parts: List[str]) -> str:
+    """'First is A, then B, and finally C'"""
+    if len(parts) == 1:
+        return parts[0]
+    if len(parts) == 2:
+        return f"First is {parts[0]}, and then {parts[1]}"
+    middle = "".join(f", then {p}" for p in parts[1:-1])
+    return f"First is {parts[0]}{middle}, and finally {parts[-1]}"
+
+
+class FastPathRouter:
+    """
+    Answers simple calendar reads without the LLM
+
+    classify() recognises short "what's on my calendar today / on friday /
+    list my next 5 meetings" queries with a few regexes and TimeParser, and
+    returns the tool call the LLM would have made. render() phrases the tool
+    result with a fixed voice-friendly template. Anything the classifier is
+    unsure about - bookings, searches, time windows, people, ranges - returns
+    None and goes through the agent as usual.
+    """
+
+    def __init__(self):
+        # Metrics
+        self.matched: Dict[str, int] = {}
+        self.fallbacks = 0
+        self.total_ms = 0.0
+
+    def classify(self, text: str) -> Optional[FastPathIntent]:
+        """The fast-path tool call for this query, or None to use the LLM"""
+        original = text
+        text = " ".join(text.lower().replace("’", "'").split()).rstrip("?.! ")
+        if not text or len(text.split()) > MAX_QUERY_WORDS:
+            return None
+        if not READ_CUE.search(text) or not CALENDAR_CUE.search(text) or REJECT.search(text):
+            return None
+        if self._has_title(original):
+            return None
+        if TimeParser.parse_time_preference(text):
+            return None
+
+        tz = pytz.timezone(config.DEFAULT_TIMEZONE)
+        if DAY_AFTER_TOMORROW.search(text):
+            day_pref = "day after tomorrow"
+        else:
+            day_pref = TimeParser.parse_day_preference(text)
+
+        if day_pref == "today":
+            return FastPathIntent("today", "calendar_today_summary", {}, datetime.now(tz))
+        if day_pref:
+            day = TimeParser.parse_relative_day(day_pref)
+            if day is None:
+                return None
+            return FastPathIntent("date", "calendar_list_events_by_date", {"date": day.strftime("%Y-%m-%d")}, day)
+
+        if UPCOMING_CUE.search(text):
+            match = COUNT.search(text)
+            if match:
+                raw = match.group(1)
+                n = int(raw) if raw.isdigit() else NUMBER_WORDS[raw]
+            elif re.search(r"\b(meetings|events|appointments)\b", text):
+                n = 5
+            elif re.search(r"\b(meeting|event|appointment)\b", text):
+                n = 1  # "what's my next meeting"
+            else:
+                return None  # "what's next on my calendar", "my schedule for the next ..."
+            if not 1 <= n <= MAX_UPCOMING:
+                return None
+            return FastPathIntent("upcoming", "calendar_list_upcoming", {"n": n})
+
+        return None
+
+    @staticmethod
+    def _has_title(text: str) -> bool:
+        """Capitalized words past the first other than days, months and "I" - likely an event title"""
+        words = re.findall(r"[A-Za-z][\w'-]*", text)[1:]
+        return any(
+            w[0].isupper() and w.lower() not in PROPER_WORDS
+            for w in words
+        )
+
+    def render(self, intent: FastPathIntent, result: Any) -> Optional[str]:
+        """Templated reply for the tool result; None if it can't be phrased (e.g. an error)"""
+        if not isinstance(result, dict) or "error" in result:
+            return None
+        events = result.get("events") or []
+
+        if intent.name == "upcoming":
+            if not events:
+                return "You don't have any upcoming meetings on the calendar."
+            parts = [f"{e.get('title', 'Untitled')} on {_spoken_start(e.get('start', ''))}" for e in events[:MAX_SPOKEN_EVENTS]]
+            if len(events) == 1:
+                reply = f"Your next meeting is {parts[0]}."
+            else:
+                reply = f"Here are your next {_count(len(events))}. {_join(parts)}."
+            return reply + self._more(len(events))
+
+        if intent.day is None:
+            return None
+        now = datetime.now(intent.day.tzinfo)
+        offset = (intent.day.date() - now.date()).days
+        if offset == 0:
+            when = "today"
+        elif offset == 1:
+            when = "tomorrow"
+        else:
+            when = f"on {intent.day.strftime('%A, %B')} {intent.day.day}"
+
+        if not events:
+            return f"You have nothing on the calendar {when}."
+        parts = [
+            f"{e.get('title', 'Untitled')} from {_spoken_time(e.get('start', ''))} to {_spoken_time(e.get('end', ''))}"
+            for e in events[:MAX_SPOKEN_EVENTS]
+        ]
+        if len(events) == 1:
+            reply = f"You have one meeting {when}: {parts[0]}."
+        else:
+            reply = f"You have {_count(len(events))} {when}. {_join(parts)}."
+        return reply + self._more(len(events))
+
+    @staticmethod
+    def _more(count: int) -> str:
+        extra = count - MAX_SPOKEN_EVENTS
+        if extra <= 0:
+            return ""
+        return f" There {'is' if extra == 1 else 'are'} {SPOKEN_NUMBERS.get(extra, str(extra))} more after that."
+
+    def record(self, intent: Optional[FastPathIntent], elapsed_ms: float = 0.0):
+        """Count a fast-path answer, or a fallback to the LLM after classify() matched"""
+        if intent is None:
+            self.fallbacks += 1
+            return
+        self.matched[intent.name] = self.matched.get(intent.name, 0) + 1
+        self.total_ms += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        answered = sum(self.matched.values())
+        return {
+            "enabled": config.FAST_PATH_ENABLED,
+            "answered": dict(self.matched),
+            "fallbacks": self.fallbacks,
+            "avg_ms": round(self.total_ms / answered, 1) if answered else 0.0
+        }
+
+
+fast_path_router = FastPathRouter()
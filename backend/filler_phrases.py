@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import config
+from streaming_voice_service import streaming_voice_service
+from utils.logger import setup_logger
+
+logger = setup_logger("filler_phrases")
+
+FILLER_PHRASES: Dict[str, List[str]] = {
+    "read": [
+        "Let me check the calendar.",
+        "One moment, I'm looking that up.",
+        "Let me take a look.",
+    ],
+    "availability": [
+        "Let me find some open times.",
+        "Checking availability now.",
+    ],
+    "write": [
+        "Okay, setting that up now.",
+        "One moment while I update the calendar.",
+    ],
+}
+
+TOOL_CATEGORIES = {
+    "calendar_freebusy": "availability",
+    "calendar_create_event": "write",
+    "calendar_update_event_attendees": "write",
+}
+
+
+class FillerBank:
+    """
+    Pre-synthesized filler phrases played while tools run
+
+    Each phrase is synthesized once at startup through the same streaming
+    voice as live replies and kept as MP3 bytes, so covering the tool phase
+    costs no TTS round-trip. Phrases rotate within a category so the same
+    one isn't heard twice in a row.
+    """
+
+    def __init__(self):
+        self._audio: Dict[str, List[bytes]] = {}
+        self._next: Dict[str, int] = {}
+
+        # Metrics
+        self.played = 0
+        self.misses = 0
+
+    async def _synthesize(self, phrase: str) -> bytes:
+        chunks: List[bytes] = []
+
+        async def text_stream():
+            yield phrase
+
+        async def collect(audio: bytes):
+            chunks.append(audio)
+
+        completed = await streaming_voice_service.synthesize_stream_ws(text_stream(), collect)
+        if not completed:
+            # Truncated audio would be replayed on every later turn
+            raise ConnectionError(f"TTS stream ended early after {len(chunks)} chunk(s)")
+        return b"".join(chunks)
+
+    async def warm(self):
+        """Synthesize the phrase bank; failures just leave a category empty"""
+        if not config.VOICE_FILLERS_ENABLED or not config.ELEVENLABS_API_KEY:
+            return
+        for category, phrases in FILLER_PHRASES.items():
+            results = await asyncio.gather(
+                *(self._synthesize(p) for p in phrases), return_exceptions=True
+            )
+            audio = [r for r in results if isinstance(r, bytes) and r]
+            for phrase, result in zip(phrases, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to synthesize filler '{phrase}': {result}")
+            self._audio[category] = audio
+        logger.info(f"Filler bank ready: { {c: len(a) for c, a in self._audio.items()} }")
+
+    @staticmethod
+    def category_for(tool_names: Iterable[str]) -> str:
+        categories = {TOOL_CATEGORIES.get(name, "read") for name in tool_names}
+        for category in ("write", "availability"):
+            if category in categories:
+                return category
+        return "read"
+
+    def pick(self, tool_names: Iterable[str]) -> Optional[bytes]:
+        """Audio for the next filler matching these tools, or None if not ready"""
+        if not config.VOICE_FILLERS_ENABLED:
+            return None
+        category = self.category_for(tool_names)
+        audio = self._audio.get(category)
+        if not audio:
+            self.misses += 1
+            return None
+        index = self._next.get(category, 0)
+        self._next[category] = (index + 1) % len(audio)
+        self.played += 1
+        return audio[index % len(audio)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "phrases": {c: len(a) for c, a in self._audio.items()},
+            "played": self.played,
+            "misses": self.misses
+        }
+
+
+filler_bank = FillerBank()
@@ -0,0 +1,88 @@
+from typing import Any, Dict, Optional
+import aiohttp
+
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger("http_pool")
+
+
+class HttpPool:
+    """
+    Application-lifetime aiohttp session shared by all voice/TTS/STT calls
+
+    Opened at FastAPI startup and closed at shutdown. Keeps connections alive
+    between requests, caches DNS, and limits connections per host, so voice
+    turns don't pay a fresh TCP+TLS handshake.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+
+        # Metrics
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    async def _on_connection_create_end(self, session, ctx, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, ctx, params):
+        self.connections_reused += 1
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+
+        self._connector = aiohttp.TCPConnector(
+            limit=config.HTTP_POOL_LIMIT,
+            limit_per_host=config.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=config.HTTP_POOL_DNS_TTL_SECONDS,
+            keepalive_timeout=config.HTTP_POOL_KEEPALIVE_SECONDS,
+        )
+        # No session-wide total timeout: it would also cap long-lived
+        # websockets. REST calls pass request_timeout explicitly.
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                connect=config.HTTP_POOL_CONNECT_TIMEOUT_SECONDS,
+            ),
+            trace_configs=[trace_config],
+        )
+        logger.info("Shared HTTP session opened")
+
+    @property
+    def request_timeout(self) -> aiohttp.ClientTimeout:
+        """Timeout for one-shot REST calls"""
+        return aiohttp.ClientTimeout(
+            total=config.HTTP_POOL_TOTAL_TIMEOUT_SECONDS,
+            connect=config.HTTP_POOL_CONNECT_TIMEOUT_SECONDS,
+        )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("Shared HTTP session closed")
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """The shared session, opened lazily if startup hasn't run (e.g. scripts)"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.connections_created + self.connections_reused
+        return {
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": round(self.connections_reused / total, 3) if total else 0.0
+        }
+
+
+http_pool = HttpPool()
@@ -28,6 +28,7 @@ def get_llm():
             api_key=config.OPENAI_API_KEY,
             temperature=config.LLM_TEMPERATURE,
             max_tokens=config.LLM_MAX_TOKENS,
+            stream_usage=True,  # token counts (incl. cached prompt tokens) on streamed turns
         )
 
     else:
@@ -42,14 +43,15 @@ SYSTEM_PROMPT = """You are an intelligent scheduling assistant named Scheduler f
 - When ANY user asks about events, they see the SAME shared calendar
 - Users can book meetings on behalf of the host calendar
 
-**CURRENT CONTEXT IS PROVIDED:** You will receive current date/time information. Use this to calculate dates.
+**CURRENT CONTEXT IS PROVIDED:** Each user message starts with a [Context] line giving the current date/time in the user's timezone. Always use the most recent one to calculate dates.
 
 **YOUR CAPABILITIES:**
 You have access to these tools:
 
 1. calendar_freebusy - Search for available time slots on the shared calendar
    - Required: duration_min (integer, minutes), date (YYYY-MM-DD format)
-   - Optional: time_pref (string), attendees (list of emails)
+   - Optional: time_pref (string), attendees (list of emails), end_date (YYYY-MM-DD, searches every day from date to end_date)
+   - When attendees are given, slots where everyone is free come first; other slots list busy_attendees
    - **CRITICAL:** You MUST convert relative dates to YYYY-MM-DD format:
      * If today is 2025-10-01 (Wednesday):
        - "tomorrow" → "2025-10-02"
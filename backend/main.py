@@ -6,7 +6,9 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 import uvicorn
 from datetime import datetime
-import io
+import asyncio
+import json
+import re
 
 from agent import SmartSchedulerAgent
 from config import config
@@ -15,6 +17,17 @@ from utils.auth import get_current_user
 from database import User
 from auth_routes import router as auth_router
 from voice_service import voice_service
+from tools_gcal import calendar_service_cache, get_main_calendar_service
+from calendar_mirror import calendar_mirror
+from tool_executor import tool_executor
+from session_persistence import session_persister
+from http_pool import http_pool
+from tts_socket_pool import tts_socket_pool
+from streaming_voice_service import streaming_voice_service
+from filler_phrases import filler_bank
+from fast_path import fast_path_router
+from tts_cache import tts_cache
+from utils.discovery import preload_discovery_documents
 
 # Setup logger
 logger = setup_logger("api", "api.log")
@@ -55,6 +68,7 @@ logger.info("Smart Scheduler Agent initialized")
 class ChatMessage(BaseModel):
     message: str = Field(..., description="User message", min_length=1)
     session_id: Optional[str] = Field(default=None, description="Session identifier")
+    stream_audio: Optional[bool] = Field(default=None, description="Return audio_url immediately and stream audio while it is synthesized")
 
 class ChatResponse(BaseModel):
     session_id: str
@@ -103,7 +117,20 @@ async def health():
         "timezone": config.DEFAULT_TIMEZONE,
         "llm_provider": config.LLM_PROVIDER,
         "voice_enabled": config.VOICE_ENABLED,
-        "active_sessions": len(agent.sessions)
+        "active_sessions": len(agent.sessions),
+        "session_store": agent.sessions.stats(),
+        "llm_usage": agent.usage_stats(),
+        "session_persistence": session_persister.stats(),
+        "audio_cache": agent.audio_cache.stats(),
+        "http_pool": http_pool.stats(),
+        "tts_socket_pool": tts_socket_pool.stats(),
+        "stt_streams": streaming_voice_service.stats(),
+        "filler_bank": filler_bank.stats(),
+        "fast_path": fast_path_router.stats(),
+        "tts_cache": tts_cache.stats(),
+        "calendar_service_cache": calendar_service_cache.stats(),
+        "calendar_mirror": calendar_mirror.stats(),
+        "tool_executor": tool_executor.stats()
     }
 
 
@@ -147,6 +174,28 @@ async def websocket_voice_endpoint(
 
 
 
+def _wants_streamed_audio(requested: Optional[bool]) -> bool:
+    enabled = config.CHAT_STREAM_AUDIO if requested is None else requested
+    return enabled and voice_service.enabled and bool(voice_service.elevenlabs_key)
+
+
+def start_streamed_audio(audio_id: str, text: str) -> str:
+    """Start synthesizing text in the background; /audio streams it as it fills"""
+    live = agent.start_live_audio(audio_id)
+    
+    async def synthesize():
+        try:
+            await voice_service.synthesize_speech_streaming(text, live)
+        except Exception as e:
+            logger.error(f"Streamed synthesis failed for {audio_id}: {str(e)}", exc_info=True)
+        finally:
+            await agent.finish_live_audio(audio_id)
+    
+    # Held by the live entry so the task isn't garbage collected mid-synthesis
+    live.task = asyncio.create_task(synthesize())
+    return f"/audio/{audio_id}"
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatMessage, user: User = Depends(get_current_user)):
     """Main chat endpoint for scheduling conversations"""
@@ -166,11 +215,14 @@ async def chat(request: ChatMessage, user: User = Depends(get_current_user)):
         # Generate voice response if enabled
         audio_url = None
         if config.VOICE_ENABLED:
-            audio_data = await voice_service.synthesize_speech(result['reply'])
-            if audio_data:
-                audio_id = f"{session_id}_{result['turn_count']}"
-                agent.store_audio(audio_id, audio_data)
-                audio_url = f"/audio/{audio_id}"
+            audio_id = f"{session_id}_{result['turn_count']}"
+            if _wants_streamed_audio(request.stream_audio):
+                audio_url = start_streamed_audio(audio_id, result['reply'])
+            else:
+                audio_data = await voice_service.synthesize_speech(result['reply'])
+                if audio_data:
+                    agent.store_audio(audio_id, audio_data)
+                    audio_url = f"/audio/{audio_id}"
         
         result['audio_url'] = audio_url
         
@@ -182,10 +234,60 @@ async def chat(request: ChatMessage, user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
     
     
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(message: ChatMessage, request: Request, user: User = Depends(get_current_user)):
+    """
+    Server-Sent Events variant of /chat
+    
+    Forwards the agent's content_chunk, tool_start, tool_end, complete and
+    error events as they happen, so text clients get tokens as early as the
+    voice websocket does. Stops the agent if the client disconnects.
+    """
+    session_id = message.session_id or f"{user.id}_chat_session"
+    logger.info(f"Chat stream request: user={user.email}, session={session_id}")
+    
+    async def events():
+        stream = agent.process_message_streaming(
+            session_id=session_id,
+            user_message=message.message,
+            user=user
+        )
+        reply_parts = []
+        try:
+            async for chunk in stream:
+                if await request.is_disconnected():
+                    logger.info(f"Chat stream client disconnected: session={session_id}")
+                    break
+                
+                chunk_type = chunk.get('type')
+                if chunk_type == 'content_chunk':
+                    reply_parts.append(chunk.get('content', ''))
+                elif chunk_type == 'complete':
+                    chunk = {**chunk, 'reply': "".join(reply_parts)}
+                
+                yield _sse_event(chunk_type, chunk)
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # keep Nginx from buffering the stream
+        }
+    )
+    
+    
 @app.post("/voice/transcribe")
 async def transcribe_voice(
     audio: UploadFile = File(...),
     session_id: Optional[str] = None,
+    stream_audio: Optional[bool] = None,
     user: User = Depends(get_current_user)
 ):
     """Transcribe voice input and process as chat message"""
@@ -218,11 +320,14 @@ async def transcribe_voice(
         # Generate voice response
         audio_url = None
         if config.VOICE_ENABLED:
-            audio_response = await voice_service.synthesize_speech(result['reply'])
-            if audio_response:
-                audio_id = f"{session_id}_{result['turn_count']}"
-                agent.store_audio(audio_id, audio_response)
-                audio_url = f"/audio/{audio_id}"
+            audio_id = f"{session_id}_{result['turn_count']}"
+            if _wants_streamed_audio(stream_audio):
+                audio_url = start_streamed_audio(audio_id, result['reply'])
+            else:
+                audio_response = await voice_service.synthesize_speech(result['reply'])
+                if audio_response:
+                    agent.store_audio(audio_id, audio_response)
+                    audio_url = f"/audio/{audio_id}"
         
         return {
             "transcript": transcript,
@@ -239,15 +344,52 @@ async def transcribe_voice(
     
     
 @app.get("/audio/{audio_id}")
-async def get_audio(audio_id: str):
-    """Stream audio response"""
-    audio_data = agent.get_audio(audio_id)
-    if not audio_data:
+async def get_audio(audio_id: str, request: Request):
+    """Stream audio response (supports single byte-range requests)"""
+    live = agent.get_live_audio(audio_id)
+    if live is not None:
+        # Still being synthesized: size unknown, so no ranges - stream chunked
+        return StreamingResponse(live.stream(), media_type="audio/mpeg",
+                                 headers={"Accept-Ranges": "none"})
+    
+    entry = agent.get_audio(audio_id)
+    if not entry:
         raise HTTPException(status_code=404, detail="Audio not found")
     
+    headers = {"Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+    if range_header:
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+        if not match or (not match.group(1) and not match.group(2)):
+            entry.close()
+            raise HTTPException(status_code=416, detail="Invalid range",
+                                headers={"Content-Range": f"bytes */{entry.size}"})
+        if match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), entry.size - 1) if match.group(2) else entry.size - 1
+        else:
+            # Suffix range: last N bytes
+            start = max(entry.size - int(match.group(2)), 0)
+            end = entry.size - 1
+        if start > end or start >= entry.size:
+            entry.close()
+            raise HTTPException(status_code=416, detail="Range not satisfiable",
+                                headers={"Content-Range": f"bytes */{entry.size}"})
+        
+        headers["Content-Range"] = f"bytes {start}-{end}/{entry.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            entry.iter_range(start, end),
+            status_code=206,
+            media_type="audio/mpeg",
+            headers=headers
+        )
+    
+    headers["Content-Length"] = str(entry.size)
     return StreamingResponse(
-        io.BytesIO(audio_data),
-        media_type="audio/mpeg"
+        entry.iter_range(),
+        media_type="audio/mpeg",
+        headers=headers
     )
 
 @app.get("/context")
@@ -265,6 +407,21 @@ async def get_context(user: User = Depends(get_current_user)):
         "is_main_account": user.is_main_account
     }
 
+# Startup tasks; held here so they aren't garbage collected, and cancelled
+# on shutdown before the tool executor goes away
+background_tasks: List[asyncio.Task] = []
+
+async def calendar_mirror_sync_loop():
+    """Keep the local calendar mirror current in the background"""
+    while True:
+        try:
+            # One call: the service is cached per worker thread and its
+            # httplib2 client must stay on the thread that built it
+            await tool_executor.run(lambda: calendar_mirror.sync(get_main_calendar_service()))
+        except Exception as e:
+            logger.warning(f"Calendar mirror sync failed: {str(e)}")
+        await asyncio.sleep(config.CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -275,8 +432,31 @@ async def startup_event():
     logger.info(f"Voice Enabled: {config.VOICE_ENABLED}")
     logger.info(f"Main Calendar: {config.MAIN_CALENDAR_EMAIL}")
     logger.info(f"Timezone: {config.DEFAULT_TIMEZONE}")
+    
+    # Load discovery documents now so the first tool call doesn't pay for it
+    timings = preload_discovery_documents()
+    logger.info(f"Discovery documents preloaded (ms): {timings}")
+    
+    background_tasks.append(asyncio.create_task(calendar_mirror_sync_loop()))
+    session_persister.start()
+    await http_pool.start()
+    if config.VOICE_ENABLED:
+        await tts_socket_pool.start(config.ELEVENLABS_VOICE_ID, config.ELEVENLABS_STREAM_MODEL_ID)
+        # Fillers are synthesized in the background; until ready, none are played
+        background_tasks.append(asyncio.create_task(filler_bank.warm()))
     logger.info("=" * 80)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await session_persister.stop()
+    await tts_socket_pool.close()
+    await http_pool.close()
+    tool_executor.shutdown()
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
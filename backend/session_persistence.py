@@ -0,0 +1,158 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+
+from config import config
+from database import Session as SessionRecord, SessionLocal
+from utils.logger import setup_logger
+
+logger = setup_logger("session_persistence")
+
+PRUNE_INTERVAL_SECONDS = 600
+
+
+class SessionPersister:
+    """
+    Write-behind persistence of ConversationState to the sessions table
+
+    Turns only mark a session dirty; a background loop serializes dirty
+    sessions and writes them in one batch every SESSION_PERSIST_INTERVAL_SECONDS
+    on a worker thread, so no turn waits on the database. Sessions are read
+    back lazily the first time they are requested after a restart or eviction.
+    Rows not written for SESSION_RETENTION_SECONDS are pruned by the same loop.
+    """
+
+    def __init__(self):
+        self._dirty: Dict[str, Tuple[str, Any]] = {}
+        self._deleted: Set[str] = set()
+        self._clear_all = False
+        self._last_prune: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.writes = 0
+        self.pruned = 0
+        self.loads = 0
+        self.failures = 0
+
+    def mark_dirty(self, state, user_id: str):
+        """Queue a session for the next flush"""
+        self._dirty[state.session_id] = (user_id, state)
+        self._deleted.discard(state.session_id)
+
+    def forget(self, session_id: str):
+        """Drop a session from the store on the next flush"""
+        self._dirty.pop(session_id, None)
+        self._deleted.add(session_id)
+
+    def forget_all(self):
+        """Drop every session from the store on the next flush"""
+        self._dirty.clear()
+        self._deleted.clear()
+        self._clear_all = True
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Blocking read of a persisted state record"""
+        db = SessionLocal()
+        try:
+            row = db.query(SessionRecord).filter(SessionRecord.id == session_id).first()
+            if not row or not row.meta_data:
+                return None
+            self.loads += 1
+            return json.loads(row.meta_data)
+        finally:
+            db.close()
+
+    async def load_async(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.load, session_id)
+
+    def _write(self, records: Dict[str, Tuple[str, str]], deleted: Set[str], clear_all: bool = False,
+               prune_before: Optional[datetime] = None) -> int:
+        """Apply deletes and writes in one transaction; returns the number of rows pruned"""
+        db = SessionLocal()
+        pruned = 0
+        try:
+            if clear_all:
+                db.query(SessionRecord).delete(synchronize_session=False)
+            elif prune_before is not None:
+                pruned = db.query(SessionRecord).filter(
+                    SessionRecord.last_active < prune_before
+                ).delete(synchronize_session=False)
+            if deleted:
+                db.query(SessionRecord).filter(SessionRecord.id.in_(deleted)).delete(synchronize_session=False)
+            now = datetime.utcnow()
+            for session_id, (user_id, payload) in records.items():
+                db.merge(SessionRecord(
+                    id=session_id,
+                    user_id=user_id,
+                    last_active=now,
+                    meta_data=payload
+                ))
+            db.commit()
+            return pruned
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def flush(self):
+        """Serialize and write every dirty session, pruning expired rows now and then"""
+        prune_before = None
+        if self._last_prune is None or time.monotonic() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            prune_before = datetime.utcnow() - timedelta(seconds=config.SESSION_RETENTION_SECONDS)
+        if not self._dirty and not self._deleted and not self._clear_all and prune_before is None:
+            return
+        dirty, self._dirty = self._dirty, {}
+        deleted, self._deleted = self._deleted, set()
+        clear_all, self._clear_all = self._clear_all, False
+
+        # Serialize on the loop so the state isn't mutated mid-dump
+        records = {
+            session_id: (user_id, json.dumps(state.to_record(), separators=(",", ":"), default=str))
+            for session_id, (user_id, state) in dirty.items()
+        }
+        try:
+            pruned = await asyncio.to_thread(self._write, records, deleted, clear_all, prune_before)
+            self.writes += len(records)
+            if prune_before is not None:
+                self._last_prune = time.monotonic()
+                self.pruned += pruned
+                if pruned:
+                    logger.info(f"Pruned {pruned} session(s) idle since before {prune_before:%Y-%m-%d %H:%M}")
+        except Exception as e:
+            self.failures += 1
+            self._clear_all = self._clear_all or clear_all
+            logger.error(f"Failed to persist {len(records)} session(s): {e}", exc_info=True)
+            # Put them back unless a newer turn already re-queued them
+            for session_id, entry in dirty.items():
+                if session_id not in self._deleted:
+                    self._dirty.setdefault(session_id, entry)
+            self._deleted |= deleted - set(self._dirty)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(config.SESSION_PERSIST_INTERVAL_SECONDS)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._dirty),
+            "writes": self.writes,
+            "loads": self.loads,
+            "pruned": self.pruned,
+            "failures": self.failures
+        }
+
+
+session_persister = SessionPersister()
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger("session_store")
+
+
+def estimate_state_size(state) -> int:
+    """Rough in-memory footprint of a ConversationState in bytes"""
+    size = 512
+    for message in state.messages:
+        content = getattr(message, 'content', '')
+        size += len(content) if isinstance(content, str) else len(str(content))
+        size += 256
+    return size
+
+
+class SessionStore:
+    """
+    Bounded store for ConversationState objects
+
+    Sessions are kept in LRU order. A session is evicted when it has been
+    idle longer than ttl_seconds, or when the store exceeds max_sessions or
+    max_bytes (least recently used first). Expired sessions are always at
+    the LRU end, so sweeping is proportional to what actually gets evicted.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: int, max_bytes: int):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        # Metrics
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+        self.evicted_memory = 0
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return a live session and mark it as recently used"""
+        with self._lock:
+            self._evict_expired()
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            self._touch(session_id, state)
+            self._enforce_limits(keep=session_id)
+            return state
+
+    def put(self, session_id: str, state: Any):
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._sessions[session_id] = state
+            self._touch(session_id, state)
+            self._enforce_limits(keep=session_id)
+
+    def pop(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            if session_id not in self._sessions:
+                return None
+            return self._remove(session_id)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._last_access.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            self._evict_expired()
+            return list(self._sessions.values())
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def _touch(self, session_id: str, state: Any):
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+        size = estimate_state_size(state)
+        self._total_bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+
+    def _remove(self, session_id: str) -> Any:
+        state = self._sessions.pop(session_id)
+        self._last_access.pop(session_id, None)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+        return state
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if self._last_access[oldest] > cutoff:
+                break
+            self._remove(oldest)
+            self.evicted_ttl += 1
+            logger.info(f"Evicted idle session: {oldest}")
+
+    def _enforce_limits(self, keep: str):
+        self._evict_expired()
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+            self.evicted_lru += 1
+            logger.info(f"Evicted least recently used session: {oldest}")
+        while self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+            self.evicted_memory += 1
+            logger.info(f"Evicted session over memory budget: {oldest}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": len(self._sessions),
+            "estimated_bytes": self._total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_lru": self.evicted_lru,
+            "evicted_memory": self.evicted_memory
+        }
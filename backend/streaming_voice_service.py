@@ -1,8 +1,13 @@
 import asyncio
 import json
-from typing import AsyncGenerator, Callable
+import time
+from typing import AsyncGenerator, Callable, Dict, Optional
 from utils.logger import setup_logger
 from config import config
+from audio_cache import LiveAudio
+from stt_stream import DeepgramStream
+from tts_socket_pool import OUTPUT_FORMAT, tts_socket_pool
+from tts_cache import tts_cache
 import aiohttp
 import base64
 
@@ -16,6 +21,13 @@ class StreamingVoiceService:
         self.deepgram_ws_url = "wss://api.deepgram.com/v1/listen"
         self.elevenlabs_api_key = config.ELEVENLABS_API_KEY
         self.elevenlabs_voice_id = config.ELEVENLABS_VOICE_ID
+        self.elevenlabs_model_id = config.ELEVENLABS_STREAM_MODEL_ID
+        
+        # STT metrics, summed over finished streams
+        self.stt_streams = 0
+        self.stt_reconnects = 0
+        self.stt_keepalives = 0
+        self.stt_replayed_chunks = 0
         
     async def transcribe_stream(
         self, 
@@ -23,7 +35,7 @@ class StreamingVoiceService:
         on_transcript: Callable,
         on_final: Callable
     ):
-        """Stream audio to Deepgram for real-time transcription with VAD"""
+        """Stream audio to Deepgram for real-time transcription with VAD (see stt_stream.DeepgramStream)"""
         url = (
             f"{self.deepgram_ws_url}"
             f"?model=nova-2"
@@ -39,196 +51,227 @@ class StreamingVoiceService:
             "Content-Type": "audio/webm"
         }
         
+        stream = DeepgramStream(url, headers, on_transcript, on_final)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(url, headers=headers) as ws:
-                    logger.info("Connected to Deepgram STT")
-                    
-                    stream_active = True
-                    chunk_count = 0
-                    
-                    async def send_audio():
-                        """Send audio chunks to Deepgram"""
-                        nonlocal chunk_count
-                        try:
-                            async for chunk in audio_stream:
-                                if not stream_active:
-                                    break
-                                if chunk:
-                                    chunk_count += 1
-                                    if chunk_count <= 5 or chunk_count % 50 == 0:
-                                        logger.info(f"Sending chunk {chunk_count}: {len(chunk)} bytes")
-                                    await ws.send_bytes(chunk)
-                                    await asyncio.sleep(0.01)
-                        except Exception as e:
-                            logger.error(f"Error sending audio: {e}")
-                        finally:
-                            logger.info(f"Audio stream ended. Sent {chunk_count} chunks")
-                            try:
-                                await ws.send_json({"type": "CloseStream"})
-                            except Exception as e:
-                                logger.error(f"Error closing stream: {e}")
-                    
-                    async def receive_transcripts():
-                        """Receive transcripts from Deepgram"""
-                        try:
-                            async for msg in ws:
-                                if msg.type == aiohttp.WSMsgType.TEXT:
-                                    data = json.loads(msg.data)
-                                    
-                                    msg_type = data.get("type")
-                                    
-                                    if msg_type == "Results":
-                                        channel = data.get("channel", {})
-                                        alternatives = channel.get("alternatives", [])
-                                        
-                                        if alternatives:
-                                            transcript = alternatives[0]
-                                            text = transcript.get("transcript", "")
-                                            is_final = data.get("is_final", False)
-                                            
-                                            if text:
-                                                logger.info(f"{'FINAL' if is_final else 'PARTIAL'}: {text}")
-                                                if is_final:
-                                                    await on_final(text)
-                                                else:
-                                                    await on_transcript(text)
-                                    
-                                    elif msg_type == "SpeechStarted":
-                                        logger.info("Speech started")
-                                        
-                        except Exception as e:
-                            logger.error(f"Error receiving transcripts: {e}", exc_info=True)
-                        finally:
-                            stream_active = False
-                    
-                    await asyncio.gather(
-                        send_audio(),
-                        receive_transcripts(),
-                        return_exceptions=True
-                    )
-                    
+            await stream.run(audio_stream)
         except Exception as e:
             logger.error(f"Deepgram streaming error: {e}", exc_info=True)
             raise
+        finally:
+            self.stt_streams += 1
+            self.stt_reconnects += stream.reconnects
+            self.stt_keepalives += stream.keepalives_sent
+            self.stt_replayed_chunks += stream.replayed_chunks
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "stt_streams": self.stt_streams,
+            "stt_reconnects": self.stt_reconnects,
+            "stt_keepalives": self.stt_keepalives,
+            "stt_replayed_chunks": self.stt_replayed_chunks
+        }
     
     async def synthesize_stream_ws(
         self, 
         text_stream: AsyncGenerator[str, None],
-        on_audio_chunk: Callable[[bytes], None]
-    ):
+        on_audio_chunk: Callable[[bytes], None],
+        timings: Optional[Dict[str, float]] = None
+    ) -> bool:
         """
         Stream text to ElevenLabs WebSocket for MINIMUM latency TTS
         Sends text chunks as they arrive and receives audio immediately
+        
+        Uses a pre-warmed socket from tts_socket_pool. If timings is given it
+        is filled with a latency breakdown (checkout, connect on the critical
+        path, first text to first audio). Returns True if ElevenLabs signalled
+        the end of generation, i.e. all audio was received.
         """
-        url = (
-            f"wss://api.elevenlabs.io/v1/text-to-speech/{self.elevenlabs_voice_id}/stream-input"
-            f"?model_id=eleven_turbo_v2_5"
-            f"&output_format=mp3_22050_32"
-            f"&auto_mode=true"  # Reduces latency by disabling buffers
-        )
+        request_start = time.perf_counter()
+        try:
+            sock, warm = await tts_socket_pool.acquire(self.elevenlabs_voice_id, self.elevenlabs_model_id)
+        except Exception as e:
+            logger.error(f"ElevenLabs WebSocket error: {e}", exc_info=True)
+            raise
         
-        headers = {
-            "xi-api-key": self.elevenlabs_api_key
-        }
+        checkout_ms = (time.perf_counter() - request_start) * 1000
+        logger.info(
+            f"ElevenLabs socket checked out in {checkout_ms:.0f}ms "
+            f"({'pre-warmed' if warm else f'cold connect {sock.connect_ms:.0f}ms'})"
+        )
+        if timings is not None:
+            timings["tts_checkout_ms"] = round(checkout_ms, 1)
+            timings["tts_connect_on_critical_path_ms"] = 0 if warm else round(sock.connect_ms, 1)
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(url, headers=headers) as ws:
-                    logger.info("Connected to ElevenLabs TTS WebSocket")
-                    
-                    # Send initial config
-                    config_msg = {
-                        "text": " ",
-                        "voice_settings": {
-                            "stability": 0.3,
-                            "similarity_boost": 0.5,
-                            "speed": 1.0
-                        },
-                        "xi_api_key": self.elevenlabs_api_key
-                    }
-                    await ws.send_json(config_msg)
-                    logger.info("Sent initial config to ElevenLabs")
+            ws = sock.ws
+            first_text_sent = None
+            completed = False
+            
+            text_sending_done = False
+            
+            async def send_text():
+                """Send text chunks as they arrive"""
+                nonlocal text_sending_done, first_text_sent
+                try:
+                    async for text_chunk in text_stream:
+                        if not text_chunk.strip():
+                            continue
+                        
+                        logger.info(f"→ Sending to TTS: {text_chunk[:50]}...")
+                        
+                        if first_text_sent is None:
+                            first_text_sent = time.perf_counter()
+                        
+                        # Send text chunk with trigger. send_json waits for the
+                        # socket to drain when its write buffer is full, which is
+                        # all the pacing ElevenLabs needs
+                        await ws.send_json({
+                            "text": text_chunk,
+                            "try_trigger_generation": True
+                        })
                     
-                    text_sending_done = False
+                    # Send empty string to signal end
+                    logger.info("→ Sending EOS signal")
+                    await ws.send_json({"text": ""})
+                    text_sending_done = True
                     
-                    async def send_text():
-                        """Send text chunks as they arrive"""
-                        nonlocal text_sending_done
-                        try:
-                            async for text_chunk in text_stream:
-                                if not text_chunk.strip():
-                                    continue
+                except Exception as e:
+                    logger.error(f"Error sending text: {e}", exc_info=True)
+                    text_sending_done = True
+            
+            async def receive_audio():
+                """Receive audio chunks as they're generated"""
+                nonlocal completed
+                try:
+                    chunk_count = 0
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            data = json.loads(msg.data)
+                            
+                            # Check for audio data
+                            if "audio" in data and data["audio"]:
+                                # Decode base64 audio
+                                audio_bytes = base64.b64decode(data["audio"])
+                                chunk_count += 1
                                 
-                                logger.info(f"→ Sending to TTS: {text_chunk[:50]}...")
+                                if chunk_count == 1 and timings is not None and first_text_sent is not None:
+                                    timings["tts_first_audio_ms"] = round((time.perf_counter() - first_text_sent) * 1000, 1)
                                 
-                                # Send text chunk with trigger
-                                await ws.send_json({
-                                    "text": text_chunk,
-                                    "try_trigger_generation": True
-                                })
+                                if chunk_count <= 3 or chunk_count % 20 == 0:
+                                    logger.info(f"← Received audio chunk {chunk_count}: {len(audio_bytes)} bytes")
                                 
-                                # Small delay to avoid overwhelming
-                                await asyncio.sleep(0.01)
+                                # Send to frontend immediately
+                                await on_audio_chunk(audio_bytes)
                             
-                            # Send empty string to signal end
-                            logger.info("→ Sending EOS signal")
-                            await ws.send_json({"text": ""})
-                            text_sending_done = True
+                            # Check if final
+                            if data.get("isFinal", False):
+                                logger.info(f"✓ TTS complete - received {chunk_count} chunks")
+                                completed = True
+                                break
                             
-                        except Exception as e:
-                            logger.error(f"Error sending text: {e}", exc_info=True)
-                            text_sending_done = True
-                    
-                    async def receive_audio():
-                        """Receive audio chunks as they're generated"""
-                        try:
-                            chunk_count = 0
-                            async for msg in ws:
-                                if msg.type == aiohttp.WSMsgType.TEXT:
-                                    data = json.loads(msg.data)
-                                    
-                                    # Check for audio data
-                                    if "audio" in data and data["audio"]:
-                                        # Decode base64 audio
-                                        audio_bytes = base64.b64decode(data["audio"])
-                                        chunk_count += 1
-                                        
-                                        if chunk_count <= 3 or chunk_count % 20 == 0:
-                                            logger.info(f"← Received audio chunk {chunk_count}: {len(audio_bytes)} bytes")
-                                        
-                                        # Send to frontend immediately
-                                        await on_audio_chunk(audio_bytes)
-                                    
-                                    # Check if final
-                                    if data.get("isFinal", False):
-                                        logger.info(f"✓ TTS complete - received {chunk_count} chunks")
-                                        break
-                                    
-                                    # Log other message types for debugging
-                                    if "audio" not in data:
-                                        logger.debug(f"Non-audio message: {data.keys()}")
-                                
-                                elif msg.type == aiohttp.WSMsgType.ERROR:
-                                    logger.error(f"WS error: {ws.exception()}")
-                                    break
-                                elif msg.type == aiohttp.WSMsgType.CLOSED:
-                                    logger.info("ElevenLabs WS closed")
-                                    break
-                            
-                        except Exception as e:
-                            logger.error(f"Error receiving audio: {e}", exc_info=True)
-                    
-                    # Run both concurrently
-                    await asyncio.gather(
-                        send_text(),
-                        receive_audio(),
-                        return_exceptions=True
-                    )
+                            # Log other message types for debugging
+                            if "audio" not in data:
+                                logger.debug(f"Non-audio message: {data.keys()}")
+                        
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            logger.error(f"WS error: {ws.exception()}")
+                            break
+                        elif msg.type == aiohttp.WSMsgType.CLOSED:
+                            logger.info("ElevenLabs WS closed")
+                            break
                     
+                except Exception as e:
+                    logger.error(f"Error receiving audio: {e}", exc_info=True)
+            
+            # Run both concurrently
+            await asyncio.gather(
+                send_text(),
+                receive_audio(),
+                return_exceptions=True
+            )
+            return completed
+            
         except Exception as e:
             logger.error(f"ElevenLabs WebSocket error: {e}", exc_info=True)
             raise
+        finally:
+            # Stream-input sockets are single use
+            await sock.ws.close()
+
+    async def synthesize_stream_cached(
+        self,
+        text_stream: AsyncGenerator[str, None],
+        on_audio_chunk: Callable[[bytes], None],
+        timings: Optional[Dict[str, float]] = None
+    ):
+        """
+        synthesize_stream_ws, but every sentence is cached in tts_cache
+        
+        text_stream yields whole sentences. Each uncached sentence is
+        synthesized on its own pooled socket, so its audio can be cached
+        under that sentence; up to TTS_SENTENCE_CONCURRENCY sentences
+        synthesize at once, so the next one is usually ready when the
+        current one ends. Cached sentences play straight from the cache.
+        Audio always plays in sentence order.
+        """
+        voice_id, model_id = self.elevenlabs_voice_id, self.elevenlabs_model_id
+        slots: asyncio.Queue = asyncio.Queue()  # one LiveAudio per sentence, in order; None ends
+        concurrency = asyncio.Semaphore(max(config.TTS_SENTENCE_CONCURRENCY, 1))
+        tasks = []
+        timings_taken = False
+        
+        async def synthesize(text: str, live: LiveAudio, sentence_timings: Optional[Dict[str, float]]):
+            async def single():
+                yield text
+            try:
+                completed = await self.synthesize_stream_ws(single(), live.append, sentence_timings)
+                if completed:
+                    tts_cache.put(text, voice_id, model_id, OUTPUT_FORMAT, live.data)
+            except Exception as e:
+                logger.error(f"TTS failed for sentence '{text[:50]}': {e}")
+            finally:
+                concurrency.release()
+                await live.finish()
+        
+        async def play():
+            while True:
+                live = await slots.get()
+                if live is None:
+                    return
+                async for audio_bytes in live.stream():
+                    await on_audio_chunk(audio_bytes)
+        
+        player = asyncio.create_task(play())
+        try:
+            async for text in text_stream:
+                if not text.strip():
+                    continue
+                
+                live = LiveAudio()
+                cached = tts_cache.get(text, voice_id, model_id, OUTPUT_FORMAT)
+                if cached is not None:
+                    logger.info(f"→ TTS cache hit: {text[:50]}...")
+                    if timings is not None and not timings_taken:
+                        timings["tts_first_from_cache"] = True
+                    timings_taken = True
+                    await live.append(cached)
+                    await live.finish()
+                    await slots.put(live)
+                    continue
+                
+                await concurrency.acquire()
+                await slots.put(live)
+                tasks.append(asyncio.create_task(
+                    synthesize(text, live, timings if not timings_taken else None)
+                ))
+                timings_taken = True
+            
+            await slots.put(None)
+            await player
+        finally:
+            for task in [player, *tasks]:
+                if not task.done():
+                    task.cancel()
 
 # Global instance
 streaming_voice_service = StreamingVoiceService()
\ No newline at end of file
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import AsyncGenerator, Callable, Deque, Dict, Optional, Tuple
+import aiohttp
+
+from config import config
+from http_pool import http_pool
+from utils.logger import setup_logger
+
+logger = setup_logger("stt_stream")
+
+
+class DeepgramStream:
+    """
+    Resilient Deepgram live-transcription stream for one voice connection
+
+    - Sends KeepAlive whenever no audio has gone out for a while, so Deepgram
+      doesn't close the socket while the user is silent or the AI is talking.
+    - If the socket drops, reconnects and replays the webm header plus the
+      last DEEPGRAM_REPLAY_MS of audio, so words spoken during the reconnect
+      aren't lost and the caller never sees the drop.
+    """
+
+    def __init__(self, url: str, headers: Dict[str, str], on_transcript: Callable, on_final: Callable):
+        self.url = url
+        self.headers = headers
+        self.on_transcript = on_transcript
+        self.on_final = on_final
+
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._ready = asyncio.Event()
+        self._closing = False
+        self._last_send = time.monotonic()
+
+        # MediaRecorder only sends the container header in its first chunk;
+        # a new Deepgram socket can't decode anything without it.
+        self._header: Optional[bytes] = None
+        self._replay: Deque[Tuple[float, bytes]] = deque()
+
+        # Metrics
+        self.chunks_sent = 0
+        self.reconnects = 0
+        self.keepalives_sent = 0
+        self.replayed_chunks = 0
+
+    async def _connect(self):
+        session = await http_pool.get_session()
+        self._ws = await session.ws_connect(self.url, headers=self.headers)
+        self._last_send = time.monotonic()
+
+    async def _send(self, chunk: bytes):
+        await self._ws.send_bytes(chunk)
+        self._last_send = time.monotonic()
+        self.chunks_sent += 1
+
+    def _remember(self, chunk: bytes):
+        now = time.monotonic()
+        if self._header is None:
+            self._header = chunk
+            return
+        self._replay.append((now, chunk))
+        cutoff = now - config.DEEPGRAM_REPLAY_MS / 1000
+        while self._replay and self._replay[0][0] < cutoff:
+            self._replay.popleft()
+
+    async def _reconnect(self):
+        """Open a fresh socket and replay buffered audio onto it"""
+        self._ready.clear()
+        delay = config.DEEPGRAM_RECONNECT_BACKOFF_SECONDS
+        for attempt in range(1, config.DEEPGRAM_MAX_RECONNECT_ATTEMPTS + 1):
+            try:
+                await self._connect()
+                if self._header is not None:
+                    await self._send(self._header)
+                for _, chunk in list(self._replay):
+                    await self._send(chunk)
+                    self.replayed_chunks += 1
+                self.reconnects += 1
+                logger.warning(
+                    f"Deepgram reconnected (attempt {attempt}, "
+                    f"replayed {len(self._replay)} chunk(s), total reconnects {self.reconnects})"
+                )
+                self._ready.set()
+                return
+            except Exception as e:
+                logger.error(f"Deepgram reconnect attempt {attempt} failed: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+        raise ConnectionError("Deepgram stream could not be re-established")
+
+    async def _send_audio(self, audio_stream: AsyncGenerator[bytes, None]):
+        try:
+            async for chunk in audio_stream:
+                if not chunk:
+                    continue
+                self._remember(chunk)
+                await self._ready.wait()
+                try:
+                    if self.chunks_sent < 5 or self.chunks_sent % 50 == 0:
+                        logger.info(f"Sending chunk {self.chunks_sent + 1}: {len(chunk)} bytes")
+                    await self._send(chunk)
+                except Exception as e:
+                    # The receiver notices the drop and reconnects; this chunk
+                    # is already in the replay buffer
+                    logger.warning(f"Deepgram send failed, waiting for reconnect: {e}")
+        finally:
+            logger.info(f"Audio stream ended. Sent {self.chunks_sent} chunks")
+            self._closing = True
+            try:
+                if self._ws is not None and not self._ws.closed:
+                    await self._ws.send_json({"type": "CloseStream"})
+            except Exception as e:
+                logger.error(f"Error closing stream: {e}")
+
+    async def _keepalive(self):
+        interval = config.DEEPGRAM_KEEPALIVE_SECONDS
+        while not self._closing:
+            await asyncio.sleep(interval / 2)
+            if not self._ready.is_set() or self._closing:
+                continue
+            if time.monotonic() - self._last_send >= interval:
+                try:
+                    await self._ws.send_json({"type": "KeepAlive"})
+                    self._last_send = time.monotonic()
+                    self.keepalives_sent += 1
+                except Exception as e:
+                    logger.warning(f"Deepgram KeepAlive failed: {e}")
+
+    async def _receive(self):
+        """Dispatch transcripts until the current socket closes"""
+        async for msg in self._ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                data = json.loads(msg.data)
+                msg_type = data.get("type")
+
+                if msg_type == "Results":
+                    alternatives = data.get("channel", {}).get("alternatives", [])
+                    if alternatives:
+                        text = alternatives[0].get("transcript", "")
+                        is_final = data.get("is_final", False)
+                        if text:
+                            logger.info(f"{'FINAL' if is_final else 'PARTIAL'}: {text}")
+                            if is_final:
+                                await self.on_final(text)
+                            else:
+                                await self.on_transcript(text)
+
+                elif msg_type == "SpeechStarted":
+                    logger.info("Speech started")
+
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                logger.error(f"Deepgram WS error: {self._ws.exception()}")
+                break
+
+    async def run(self, audio_stream: AsyncGenerator[bytes, None]):
+        """Transcribe audio_stream until it ends, surviving socket drops"""
+        await self._connect()
+        self._ready.set()
+        logger.info("Connected to Deepgram STT")
+
+        sender = asyncio.create_task(self._send_audio(audio_stream))
+        keepalive = asyncio.create_task(self._keepalive())
+        try:
+            while True:
+                try:
+                    await self._receive()
+                except Exception as e:
+                    logger.error(f"Error receiving transcripts: {e}", exc_info=True)
+                if self._closing or sender.done():
+                    break
+                logger.warning(f"Deepgram socket dropped (close code {self._ws.close_code}), reconnecting")
+                await self._reconnect()
+        finally:
+            keepalive.cancel()
+            if not sender.done():
+                sender.cancel()
+            if self._ws is not None and not self._ws.closed:
+                await self._ws.close()
+            logger.info(
+                f"Deepgram stream finished: {self.chunks_sent} chunks, "
+                f"{self.reconnects} reconnect(s), {self.keepalives_sent} keepalive(s)"
+            )
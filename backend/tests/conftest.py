@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Backend modules import each other flat ("from config import config") and
+# read their settings at import time, so both have to be in place first.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp = tempfile.mkdtemp(prefix="scheduler-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("LLM_PROVIDER", "openai")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("DEFAULT_TIMEZONE", "Asia/Kolkata")
+os.environ.setdefault("AUDIO_CACHE_DIR", f"{_tmp}/audio_cache")
+os.environ.setdefault("TTS_CACHE_DIR", f"{_tmp}/tts_cache")
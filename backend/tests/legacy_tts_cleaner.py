@@ -0,0 +1,34 @@
+"""
+clean_response_for_tts as it was before the precompiled rewrite (user-016)
+
+Kept verbatim as the reference the golden corpus was generated from, for
+the differential test and the throughput benchmark.
+"""
+import re
+
+
+def clean_response_for_tts(text: str) -> str:
+    """Clean LLM response for voice synthesis"""
+    if not text:
+        return ""
+    
+    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
+    text = re.sub(r'\*([^*]+)\*', r'\1', text)
+    text = re.sub(r'__([^_]+)__', r'\1', text)
+    text = re.sub(r'_([^_]+)_', r'\1', text)
+    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^\s*[-*•]\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^\s*\d+[\.)]\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    text = re.sub(r'`([^`]+)`', r'\1', text)
+    text = re.sub(r'^\s*>\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\b(\d{1,2}):00\s*(AM|PM|am|pm)\b', r'\1 \2', text)
+    text = re.sub(r'\n\s*\n', '\n', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[→←↑↓➜➝✓✗✘✔︎×]', '', text)
+    text = re.sub(r'\(\s*\)', '', text)
+    text = re.sub(r'\.{2,}', '.', text)
+    text = re.sub(r',{2,}', ',', text)
+    text = re.sub(r'([.!?])\s*([A-Z])', r'\1 \2', text)
+    
+    return text.strip()
@@ -0,0 +1,128 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, ToolMessage
+
+from agent import SmartSchedulerAgent
+from config import config
+from database import User
+
+
+class ScriptedLLM:
+    """Stands in for the tool-bound LLM: the first call asks for a tool, later calls reply"""
+
+    def __init__(self, tool_name="calendar_today_summary"):
+        self.tool_name = tool_name
+        self.calls = 0
+
+    async def astream(self, messages):
+        self.calls += 1
+        if not isinstance(messages[-1], ToolMessage):
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": self.tool_name, "args": "{}", "id": f"call_{uuid.uuid4().hex[:8]}", "index": 0}
+            ])
+            return
+        for piece in ["You have ", "nothing ", "today."]:
+            yield AIMessageChunk(content=piece)
+
+
+class FakeTool:
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+
+    def invoke(self, args):
+        time.sleep(self.delay)
+        return {"date": "2025-10-06", "message": "No events scheduled"}
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(config, "FAST_PATH_ENABLED", False)
+    agent = SmartSchedulerAgent()
+    agent.llm_with_tools = ScriptedLLM()
+    agent.tool_map["calendar_today_summary"] = FakeTool("calendar_today_summary")
+    return agent
+
+
+@pytest.fixture
+def user():
+    return User(id="user-1", email="user@example.com", name="User", google_id="g-1", is_main_account=False)
+
+
+def assert_valid_history(messages):
+    """Every AIMessage with tool_calls is followed by exactly its ToolMessages, and no ToolMessage is orphaned"""
+    assert isinstance(messages[0], SystemMessage)
+    i = 1
+    while i < len(messages):
+        message = messages[i]
+        assert not isinstance(message, ToolMessage), f"orphaned ToolMessage at {i}"
+        if isinstance(message, AIMessage) and message.tool_calls:
+            ids = [tc["id"] for tc in message.tool_calls]
+            results = messages[i + 1:i + 1 + len(ids)]
+            assert [getattr(m, "tool_call_id", None) for m in results] == ids, f"tool call at {i} has no results"
+            i += len(ids)
+        i += 1
+
+
+async def run_until(agent, user, session_id, stop_after):
+    """Consume the stream and close it (like /chat/stream on disconnect) right after the first stop_after event"""
+    stream = agent.process_message_streaming(session_id, "hi, anything going on?", user)
+    seen = []
+    try:
+        async for event in stream:
+            seen.append(event["type"])
+            if event["type"] == stop_after:
+                break
+    finally:
+        await stream.aclose()
+    return seen
+
+
+@pytest.mark.parametrize("stop_after", ["tool_start", "tool_end", "content_chunk"])
+def test_history_is_valid_when_the_stream_is_closed_mid_turn(agent, user, stop_after):
+    session_id = f"s-{stop_after}-{uuid.uuid4().hex[:6]}"
+
+    async def scenario():
+        seen = await run_until(agent, user, session_id, stop_after)
+        assert "complete" not in seen
+        assert_valid_history(agent.sessions.get(session_id).messages)
+
+        # The next turn on the same session runs normally
+        seen = await run_until(agent, user, session_id, "complete")
+        assert seen[-1] == "complete"
+        assert_valid_history(agent.sessions.get(session_id).messages)
+
+    asyncio.run(scenario())
+
+
+def test_history_is_valid_when_cancelled_during_tool_execution(agent, user):
+    agent.tool_map["calendar_today_summary"] = FakeTool("calendar_today_summary", delay=0.3)
+    session_id = f"s-cancel-{uuid.uuid4().hex[:6]}"
+
+    async def scenario():
+        task = asyncio.create_task(run_until(agent, user, session_id, "complete"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        messages = agent.sessions.get(session_id).messages
+        assert_valid_history(messages)
+        assert isinstance(messages[-1], ToolMessage)
+        assert "Interrupted" in messages[-1].content
+
+    asyncio.run(scenario())
+
+
+def test_full_turn_stores_tool_call_results_and_reply(agent, user):
+    session_id = f"s-full-{uuid.uuid4().hex[:6]}"
+    seen = asyncio.run(run_until(agent, user, session_id, "complete"))
+    assert seen == ["tool_start", "tool_end", "content_chunk", "content_chunk", "content_chunk", "complete"]
+
+    messages = agent.sessions.get(session_id).messages
+    assert_valid_history(messages)
+    assert [type(m) for m in messages[1:]] == [HumanMessage, AIMessage, ToolMessage, AIMessage]
+    assert messages[-1].content == "You have nothing today."
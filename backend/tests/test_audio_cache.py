@@ -0,0 +1,108 @@
+import asyncio
+
+from audio_cache import AudioCache
+
+
+def make_cache(tmp_path, memory=10, disk=1000, ttl=3600):
+    return AudioCache(max_memory_bytes=memory, max_disk_bytes=disk, ttl_seconds=ttl, directory=str(tmp_path))
+
+
+def read(entry, start=0, end=None):
+    return b"".join(entry.iter_range(start, end))
+
+
+def test_cold_entries_spill_to_disk_and_read_back_by_range(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("a", b"0123456789")
+    cache.put("b", b"abcdefghij")
+
+    entry = cache.open("a")
+    assert entry.tier == "disk"
+    assert read(entry, 2, 5) == b"2345"
+    assert read(cache.open("b")) == b"abcdefghij"
+
+
+def test_disk_entry_stays_readable_after_eviction_unlinks_it(tmp_path):
+    cache = make_cache(tmp_path, memory=10, disk=10)
+    cache.put("a", b"A" * 10)
+    cache.put("b", b"B" * 10)  # spills "a"
+
+    entry = cache.open("a")
+    assert entry.tier == "disk"
+    chunks = entry.iter_range()
+
+    cache.put("c", b"C" * 10)  # spills "b", evicting "a" from disk
+    assert cache.open("a") is None
+    assert len(list(tmp_path.glob("*.mp3"))) == 1
+
+    assert b"".join(chunks) == b"A" * 10
+
+
+def test_empty_clip_on_disk_reads_as_empty(tmp_path):
+    cache = make_cache(tmp_path, memory=0)
+    cache.put("empty", b"")
+    cache.put("next", b"x")
+
+    entry = cache.open("empty")
+    assert entry.tier == "disk"
+    assert entry.size == 0
+    assert read(entry) == b""
+
+
+def test_spill_from_event_loop_writes_on_a_thread(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        cache.put("a", b"0123456789")
+        cache.put("b", b"abcdefghij")
+
+        # Write still in flight: served from memory
+        assert cache.stats()["pending_spills"] == 1
+        assert read(cache.open("a")) == b"0123456789"
+
+        for _ in range(100):
+            if not cache.stats()["pending_spills"]:
+                break
+            await asyncio.sleep(0.01)
+        entry = cache.open("a")
+        assert entry.tier == "disk"
+        assert read(entry) == b"0123456789"
+
+    asyncio.run(scenario())
+
+
+def test_entry_discarded_mid_spill_leaves_no_file(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        cache.put("a", b"0123456789")
+        cache.put("b", b"abcdefghij")
+        cache.discard("a")
+
+        await asyncio.sleep(0.2)  # let the in-flight write land
+        assert cache.open("a") is None
+        assert list(tmp_path.glob("*.mp3")) == []
+
+    asyncio.run(scenario())
+
+
+def test_live_audio_streams_while_written(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path, memory=1000)
+        live = cache.start_live("clip")
+        received = []
+
+        async def reader():
+            async for chunk in cache.open_live("clip").stream():
+                received.append(chunk)
+
+        task = asyncio.create_task(reader())
+        await live.append(b"one")
+        await asyncio.sleep(0)
+        await live.append(b"two")
+        await cache.finish_live("clip")
+        await task
+
+        assert b"".join(received) == b"onetwo"
+        assert cache.open_live("clip") is None
+        assert read(cache.open("clip")) == b"onetwo"
+
+    asyncio.run(scenario())
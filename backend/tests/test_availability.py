@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import pytz
+
+from availability import AvailabilityEngine
+from config import config
+from utils.intervals import BusyIntervalIndex
+
+UTC = pytz.utc
+
+
+class FakeRequest:
+    def __init__(self, service, body):
+        self.service = service
+        self.body = body
+
+    def execute(self):
+        return self.service.respond(self.body)
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                response, exception = request.execute(), None
+            except Exception as e:
+                response, exception = None, e
+            self.callback(request_id, response, exception)
+
+
+class FakeService:
+    """freebusy() stand-in: busy maps calendar -> busy list, failing calendars fail their whole part"""
+
+    def __init__(self, busy, failing=(), errors=(), missing=()):
+        self.busy = busy
+        self.failing = set(failing)
+        self.errors = set(errors)
+        self.missing = set(missing)
+        self.calls = 0
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        return FakeRequest(self, body)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def respond(self, body):
+        self.calls += 1
+        ids = [item["id"] for item in body["items"]]
+        if self.failing & set(ids):
+            raise RuntimeError("backend error")
+        calendars = {}
+        for cal in ids:
+            if cal in self.missing:
+                continue
+            if cal in self.errors:
+                calendars[cal] = {"errors": [{"reason": "notFound"}]}
+            else:
+                calendars[cal] = {"busy": self.busy.get(cal, [])}
+        return {"calendars": calendars}
+
+
+def window():
+    return UTC.localize(datetime(2025, 10, 6, 9)), UTC.localize(datetime(2025, 10, 6, 17))
+
+
+def test_failed_batch_part_marks_its_calendars_unavailable(monkeypatch):
+    monkeypatch.setattr(config, "FREEBUSY_BATCH_SIZE", 2)
+    calendars = ["a@x.com", "b@x.com", "c@x.com", "d@x.com", "e@x.com"]
+    service = FakeService(
+        {"a@x.com": [{"start": "2025-10-06T10:00:00Z", "end": "2025-10-06T11:00:00Z"}]},
+        failing={"c@x.com"},
+    )
+
+    busy, unavailable = AvailabilityEngine().query_busy(service, calendars, *window())
+
+    assert service.calls == 3
+    assert sorted(unavailable) == ["c@x.com", "d@x.com"]
+    assert set(busy) == {"a@x.com", "b@x.com", "e@x.com"}
+    assert len(busy["a@x.com"]) == 1
+
+
+def test_calendar_missing_from_response_or_with_errors_is_unavailable():
+    service = FakeService({}, errors={"b@x.com"}, missing={"c@x.com"})
+    busy, unavailable = AvailabilityEngine().query_busy(service, ["a@x.com", "b@x.com", "c@x.com"], *window())
+    assert set(busy) == {"a@x.com"}
+    assert sorted(unavailable) == ["b@x.com", "c@x.com"]
+
+
+def test_find_slots_never_claims_everyone_free_with_unreadable_calendars(monkeypatch):
+    monkeypatch.setattr(config, "FREEBUSY_BATCH_SIZE", 1)
+    service = FakeService({}, failing={"b@x.com"})
+    result = AvailabilityEngine().find_slots(
+        service, BusyIntervalIndex(), ["a@x.com", "b@x.com"], [window()], 30
+    )
+    assert result["unavailable_calendars"] == ["b@x.com"]
+    assert result["slots"]
+    assert not any(slot["everyone_free"] for slot in result["slots"])
+
+
+def test_find_slots_ranks_common_free_time_first():
+    start, end = window()
+    service = FakeService({
+        "a@x.com": [{"start": "2025-10-06T09:00:00Z", "end": "2025-10-06T12:00:00Z"}],
+        "b@x.com": [{"start": "2025-10-06T13:00:00Z", "end": "2025-10-06T17:00:00Z"}],
+    })
+    main = BusyIntervalIndex.from_datetimes([(UTC.localize(datetime(2025, 10, 6, 12)), UTC.localize(datetime(2025, 10, 6, 12, 30)))])
+    result = AvailabilityEngine().find_slots(service, main, ["a@x.com", "b@x.com"], [(start, end)], 30, max_slots=3)
+
+    first = result["slots"][0]
+    assert first["everyone_free"] is True
+    assert first["start_iso"] == "2025-10-06T12:30:00+00:00"
+    assert all(not s["everyone_free"] for s in result["slots"][1:])
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytz
+
+from calendar_mirror import CalendarMirror
+from database import CalendarEvent, SessionLocal
+
+
+def event(event_id, start, end, **extra):
+    return {
+        "id": event_id,
+        "summary": event_id,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+        **extra,
+    }
+
+
+def test_busy_intervals_skip_transparent_events():
+    mirror = CalendarMirror(calendar_id="test-transparency")
+    mirror.apply(event("busy", "2025-10-06T09:00:00Z", "2025-10-06T10:00:00Z"))
+    mirror.apply(event("free", "2025-10-06T11:00:00Z", "2025-10-06T12:00:00Z", transparency="transparent"))
+    mirror.apply(event("opaque", "2025-10-06T13:00:00Z", "2025-10-06T14:00:00Z", transparency="opaque"))
+
+    starts = sorted(start for start, _ in mirror.busy_intervals())
+    assert starts == [
+        pytz.utc.localize(datetime(2025, 10, 6, 9)),
+        pytz.utc.localize(datetime(2025, 10, 6, 13)),
+    ]
+
+
+def test_transparency_change_is_picked_up_on_upsert():
+    mirror = CalendarMirror(calendar_id="test-transparency-update")
+    mirror.apply(event("e1", "2025-10-06T09:00:00Z", "2025-10-06T10:00:00Z"))
+    assert len(mirror.busy_intervals()) == 1
+
+    mirror.apply(event("e1", "2025-10-06T09:00:00Z", "2025-10-06T10:00:00Z", transparency="transparent"))
+    assert mirror.busy_intervals() == []
+
+    db = SessionLocal()
+    try:
+        assert db.query(CalendarEvent).filter(CalendarEvent.id == "e1").one().transparent is True
+    finally:
+        db.close()
+
+
+def test_busy_intervals_skip_events_declined_by_self():
+    mirror = CalendarMirror(calendar_id="test-declined")
+    me = {"email": "me@example.com", "self": True}
+    mirror.apply(event("accepted", "2025-10-06T09:00:00Z", "2025-10-06T10:00:00Z",
+                       attendees=[{**me, "responseStatus": "accepted"}]))
+    mirror.apply(event("declined", "2025-10-06T11:00:00Z", "2025-10-06T12:00:00Z",
+                       attendees=[{**me, "responseStatus": "declined"}, {"email": "b@example.com"}]))
+    # Someone else declining doesn't free the owner's time
+    mirror.apply(event("other-declined", "2025-10-06T13:00:00Z", "2025-10-06T14:00:00Z",
+                       attendees=[me, {"email": "b@example.com", "responseStatus": "declined"}]))
+
+    starts = sorted(start for start, _ in mirror.busy_intervals())
+    assert starts == [
+        pytz.utc.localize(datetime(2025, 10, 6, 9)),
+        pytz.utc.localize(datetime(2025, 10, 6, 13)),
+    ]
+
+    # Accepting again later makes it busy on the next upsert
+    mirror.apply(event("declined", "2025-10-06T11:00:00Z", "2025-10-06T12:00:00Z",
+                       attendees=[{**me, "responseStatus": "accepted"}]))
+    assert len(mirror.busy_intervals()) == 3
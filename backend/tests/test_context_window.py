@@ -0,0 +1,103 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from context_window import CHARS_PER_TOKEN, MESSAGE_OVERHEAD_TOKENS, ContextWindow, estimate_tokens
+
+
+def make_window(token_budget=10_000, max_messages=100, tool_result_max_chars=1_000, summary_max_chars=2_000):
+    return ContextWindow(token_budget, max_messages, tool_result_max_chars, summary_max_chars)
+
+
+def add(window, messages, message):
+    messages.append(message)
+    window.append(messages)
+
+
+def add_turn(window, messages, n, tool_result="x" * 40):
+    add(window, messages, HumanMessage(content=f"[Context] Today is Monday\n\nquestion {n}"))
+    call = {"name": "calendar_today_summary", "args": {}, "id": f"call_{n}"}
+    add(window, messages, AIMessage(content="", tool_calls=[call]))
+    add(window, messages, ToolMessage(content=tool_result, tool_call_id=f"call_{n}"))
+    add(window, messages, AIMessage(content=f"answer {n}"))
+
+
+def test_estimate_tokens():
+    assert estimate_tokens(HumanMessage(content="x" * 40)) == 40 // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+    with_call = AIMessage(content="", tool_calls=[{"name": "t", "args": {}, "id": "1"}])
+    assert estimate_tokens(with_call) > MESSAGE_OVERHEAD_TOKENS
+
+
+def test_everything_fits_under_budget():
+    window, messages = make_window(), []
+    add(window, messages, SystemMessage(content="system"))
+    for n in range(3):
+        add_turn(window, messages, n)
+    assert window.messages_for_llm(messages) == messages
+    assert window.stats()["windowed_messages"] == 12
+    assert window.stats()["summarized_lines"] == 0
+
+
+def test_oldest_turns_are_evicted_whole_and_summarized():
+    window, messages = make_window(max_messages=9), []
+    add(window, messages, SystemMessage(content="system"))
+    for n in range(4):
+        add_turn(window, messages, n)
+
+    sent = window.messages_for_llm(messages)
+    # Two whole turns fit in 9 messages; the system prompt is always first
+    assert len(sent) == 1 + 8
+    assert isinstance(sent[1], HumanMessage) and sent[1].content.endswith("question 2")
+    assert "EARLIER IN THIS CONVERSATION" in sent[0].content
+    assert "- User: question 0 (tools: calendar_today_summary) | Assistant: answer 0" in sent[0].content
+    # The stored history is untouched
+    assert messages[0].content == "system"
+
+
+def test_token_budget_keeps_the_newest_turn_even_if_it_is_too_big():
+    window, messages = make_window(token_budget=50, tool_result_max_chars=10_000), []
+    add(window, messages, SystemMessage(content="system"))
+    add_turn(window, messages, 0)
+    add_turn(window, messages, 1, tool_result="y" * 2_000)
+    sent = window.messages_for_llm(messages)
+    assert [m.content for m in sent if isinstance(m, ToolMessage)] == ["y" * 2_000]
+
+
+def test_finished_turns_have_tool_results_truncated():
+    window, messages = make_window(tool_result_max_chars=100), []
+    add(window, messages, SystemMessage(content="system"))
+    add_turn(window, messages, 0, tool_result="z" * 500)
+    assert len(messages[3].content) == 500  # current turn keeps its full result
+
+    add_turn(window, messages, 1)
+    assert messages[3].content == "z" * 100 + "... [truncated 400 chars]"
+    assert window.token_counts[3] == estimate_tokens(messages[3])
+    assert window.tokens == sum(estimate_tokens(m) for m in messages[1:])
+
+
+def test_running_total_matches_a_recount():
+    window, messages = make_window(token_budget=300, tool_result_max_chars=120), []
+    add(window, messages, SystemMessage(content="system"))
+    for n in range(12):
+        add_turn(window, messages, n, tool_result="r" * (50 * n))
+        assert window.tokens == sum(estimate_tokens(m) for m in messages[window.start:])
+        assert isinstance(messages[window.start], HumanMessage)
+
+
+def test_summary_is_capped():
+    window, messages = make_window(max_messages=4, summary_max_chars=200), []
+    add(window, messages, SystemMessage(content="system"))
+    for n in range(20):
+        add_turn(window, messages, n)
+    assert sum(len(line) + 1 for line in window.summary) <= 200
+    assert window.summary[-1].startswith("- User: question 18")
+
+
+def test_rebuild_matches_incremental_state():
+    incremental, messages = make_window(max_messages=9), []
+    add(incremental, messages, SystemMessage(content="system"))
+    for n in range(5):
+        add_turn(incremental, messages, n)
+
+    rebuilt = make_window(max_messages=9)
+    rebuilt.rebuild(messages, start=incremental.start, summary=incremental.summary)
+    assert rebuilt.messages_for_llm(messages) == incremental.messages_for_llm(messages)
+    assert rebuilt.stats() == incremental.stats()
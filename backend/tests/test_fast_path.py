@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agent import SmartSchedulerAgent
+from config import config
+from database import User
+from fast_path import FastPathIntent, fast_path_router
+
+
+@pytest.mark.parametrize("query, name, args", [
+    ("What's on my calendar today?", "today", {}),
+    ("what do I have today", "today", {}),
+    ("Any meetings today?", "today", {}),
+    ("What's my next meeting?", "upcoming", {"n": 1}),
+    ("list my next 3 meetings", "upcoming", {"n": 3}),
+    ("show me my next three events", "upcoming", {"n": 3}),
+    ("what are my upcoming meetings", "upcoming", {"n": 5}),
+])
+def test_classifies_plain_calendar_reads(query, name, args):
+    intent = fast_path_router.classify(query)
+    assert intent is not None
+    assert (intent.name, intent.args) == (name, args)
+
+
+@pytest.mark.parametrize("query, days", [
+    ("What's on my calendar tomorrow?", 1),
+    ("what do I have the day after tomorrow", 2),
+])
+def test_classifies_relative_days(query, days):
+    intent = fast_path_router.classify(query)
+    expected = datetime.now(pytz.timezone(config.DEFAULT_TIMEZONE)) + timedelta(days=days)
+    assert intent.name == "date"
+    assert intent.args == {"date": expected.strftime("%Y-%m-%d")}
+
+
+def test_classifies_weekdays():
+    intent = fast_path_router.classify("What's on my schedule on Friday?")
+    assert intent.name == "date"
+    assert intent.day.strftime("%A") == "Friday"
+
+
+@pytest.mark.parametrize("query", [
+    # Clock times
+    "Do I have a meeting at 3 PM tomorrow?",
+    "do i have anything at 14:30 today",
+    "any meetings around 9 tomorrow",
+    "What's on my calendar at 10am on Friday?",
+    "do I have a meeting at 3 p.m. today",
+    "what do I have at noon today",
+    "any meetings tonight",
+    # Specific titled events
+    "Do I have the design review meeting today?",
+    "what's on for the standup tomorrow",
+    "any 1:1 today",
+    'do I have "Quarterly planning" tomorrow',
+    "Do I have Project Phoenix today?",
+    "Is the Acme sync on my calendar today?",
+    "any calls tomorrow",
+    # Ranges, several days and months
+    "Show me my schedule for the next 3 days",
+    "What is on my calendar for the next two days?",
+    "What meetings do I have on Friday and Saturday?",
+    "what meetings do I have tomorrow and the day after?",
+    "any meetings monday through wednesday",
+    "do I have anything today or tomorrow",
+    "show me my next meeting in december",
+    "what's on my calendar on Oct 17",
+    "what's next on my calendar",
+    # Bookings, people, windows and ranges (unchanged)
+    "book a meeting tomorrow",
+    "what meetings do I have with Priya today",
+    "am I free tomorrow afternoon",
+    "what's on my calendar this week",
+    "what was my last meeting",
+    "schedule a call for friday",
+])
+def test_rejects_anything_beyond_a_plain_listing(query):
+    assert fast_path_router.classify(query) is None
+
+
+def test_rejects_long_queries():
+    assert fast_path_router.classify("what is on my calendar " + "really " * 12 + "today") is None
+
+
+def test_renders_a_day():
+    today = datetime.now(pytz.timezone(config.DEFAULT_TIMEZONE))
+    intent = FastPathIntent("today", "calendar_today_summary", {}, today)
+    result = {"events": [
+        {"title": "Standup", "start": "09:00 AM", "end": "09:15 AM"},
+        {"title": "Design review", "start": "01:30 PM", "end": "02:00 PM"},
+    ]}
+    assert fast_path_router.render(intent, result) == (
+        "You have two meetings today. First is Standup from 9 AM to 9:15 AM, "
+        "and then Design review from 1:30 PM to 2 PM."
+    )
+    assert fast_path_router.render(intent, {"events": []}) == "You have nothing on the calendar today."
+
+
+def test_renders_upcoming_and_caps_spoken_events():
+    intent = FastPathIntent("upcoming", "calendar_list_upcoming", {"n": 7})
+    events = [{"title": f"M{i}", "start": "Friday, October 17 at 01:00 PM"} for i in range(7)]
+    reply = fast_path_router.render(intent, {"events": events})
+    assert reply.startswith("Here are your next seven meetings. First is M0 on Friday, October 17 at 1 PM")
+    assert "M5" not in reply
+    assert reply.endswith("There are two more after that.")
+
+    single = fast_path_router.render(intent, {"events": events[:1]})
+    assert single == "Your next meeting is M0 on Friday, October 17 at 1 PM."
+
+
+def test_render_falls_back_on_errors():
+    intent = FastPathIntent("upcoming", "calendar_list_upcoming", {"n": 1})
+    assert fast_path_router.render(intent, {"error": "Calendar unavailable"}) is None
+    assert fast_path_router.render(intent, "not a dict") is None
+
+
+class TodayTool:
+    name = "calendar_today_summary"
+
+    def invoke(self, args):
+        return {"events": [{"title": "Standup", "start": "09:00 AM", "end": "09:15 AM"}]}
+
+
+def test_fast_path_stores_the_user_message_before_the_answer(monkeypatch):
+    monkeypatch.setattr(config, "FAST_PATH_ENABLED", True)
+    agent = SmartSchedulerAgent()
+    agent.tool_map["calendar_today_summary"] = TodayTool()
+    user = User(id="user-1", email="user@example.com", name="User", google_id="g-1", is_main_account=False)
+    session_id = f"s-fp-{uuid.uuid4().hex[:6]}"
+
+    async def run():
+        return [event async for event in agent.process_message_streaming(session_id, "What's on my calendar today?", user)]
+
+    events = asyncio.run(run())
+    assert events[-1]["fast_path"] == "today"
+
+    messages = agent.sessions.get(session_id).messages
+    assert [type(m) for m in messages[1:]] == [HumanMessage, AIMessage, ToolMessage, AIMessage]
+    assert "What's on my calendar today?" in messages[1].content
+    assert messages[2].tool_calls[0]["id"] == messages[3].tool_call_id
+    assert messages[-1].content == "You have one meeting today: Standup from 9 AM to 9:15 AM."
@@ -0,0 +1,25 @@
+import asyncio
+
+from config import config
+from filler_phrases import FILLER_PHRASES, FillerBank
+from streaming_voice_service import streaming_voice_service
+
+
+def test_warm_drops_phrases_whose_stream_did_not_complete(monkeypatch):
+    dropped = FILLER_PHRASES["read"][0]
+
+    async def fake_synthesize(text_stream, on_audio_chunk, timings=None):
+        phrase = "".join([text async for text in text_stream])
+        await on_audio_chunk(phrase.encode())
+        return phrase != dropped  # this one's socket closed before isFinal
+
+    monkeypatch.setattr(config, "VOICE_FILLERS_ENABLED", True)
+    monkeypatch.setattr(config, "ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setattr(streaming_voice_service, "synthesize_stream_ws", fake_synthesize)
+
+    bank = FillerBank()
+    asyncio.run(bank.warm())
+
+    assert bank.stats()["phrases"]["read"] == len(FILLER_PHRASES["read"]) - 1
+    picked = {bank.pick(["calendar_list_upcoming"]) for _ in range(len(FILLER_PHRASES["read"]))}
+    assert dropped.encode() not in picked
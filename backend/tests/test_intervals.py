@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+from utils.intervals import BusyIntervalIndex, daily_windows, merge_intervals, sweep_line
+
+UTC = pytz.utc
+
+
+def at(hour, minute=0, day=6):
+    return UTC.localize(datetime(2025, 10, day, hour, minute))
+
+
+def test_merge_intervals_sorts_merges_and_drops_empty():
+    assert merge_intervals([(5, 7), (1, 3), (2, 4), (4, 5), (9, 9), (10, 8)]) == [(1, 7)]
+    assert merge_intervals([(1, 2), (3, 4)]) == [(1, 2), (3, 4)]
+    assert merge_intervals([]) == []
+
+
+def test_busy_between_only_returns_overlapping():
+    index = BusyIntervalIndex.from_datetimes([
+        (at(9), at(10)), (at(11), at(12)), (at(14), at(15)),
+    ])
+    found = index.busy_between(at(10), at(14))
+    assert found == [(at(11).timestamp(), at(12).timestamp())]
+
+
+def test_gaps_respect_min_minutes_and_edges():
+    index = BusyIntervalIndex.from_datetimes([
+        (at(9, 30), at(10)), (at(10, 15), at(11)), (at(11), at(12)),
+    ])
+    gaps = index.gaps(at(9), at(13), min_minutes=30)
+    assert gaps == [(at(9), at(9, 30)), (at(12), at(13))]
+
+    gaps = index.gaps(at(9), at(13), min_minutes=15)
+    assert (at(10), at(10, 15)) in gaps
+
+
+def test_gaps_with_no_busy_time_is_whole_window():
+    assert BusyIntervalIndex().gaps(at(9), at(17), 60) == [(at(9), at(17))]
+
+
+def test_from_freebusy_parses_google_format():
+    index = BusyIntervalIndex.from_freebusy([
+        {"start": "2025-10-06T09:00:00Z", "end": "2025-10-06T10:00:00Z"},
+    ])
+    assert len(index) == 1
+    assert index.gaps(at(8), at(11), 60) == [(at(8), at(9)), (at(10), at(11))]
+
+
+def test_sweep_line_labels_segments_with_busy_keys():
+    busy = {
+        "a": [(0, 10)],
+        "b": [(5, 15)],
+    }
+    assert sweep_line(busy, 0, 20) == [
+        (0, 5, frozenset({"a"})),
+        (5, 10, frozenset({"a", "b"})),
+        (10, 15, frozenset({"b"})),
+        (15, 20, frozenset()),
+    ]
+
+
+def test_sweep_line_back_to_back_meetings_do_not_overlap():
+    segments = sweep_line({"a": [(0, 5), (5, 10)]}, 0, 10)
+    assert segments == [(0, 10, frozenset({"a"}))]
+
+
+def test_daily_windows_are_localized_per_day():
+    tz = pytz.timezone("Asia/Kolkata")
+    first = tz.localize(datetime(2025, 10, 6, 15))
+    windows = daily_windows(first, first + timedelta(days=2), 9, 17)
+    assert len(windows) == 3
+    assert windows[0] == (tz.localize(datetime(2025, 10, 6, 9)), tz.localize(datetime(2025, 10, 6, 17)))
+    assert windows[-1][0].day == 8
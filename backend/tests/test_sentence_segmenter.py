@@ -0,0 +1,80 @@
+import pytest
+
+from utils.sentence_segmenter import SentenceSegmenter
+
+
+def segment(text, step=None, first_chunk_min_chars=0):
+    """Feed text in step-sized pieces (None = all at once) and collect every sentence"""
+    segmenter = SentenceSegmenter(first_chunk_min_chars=first_chunk_min_chars)
+    step = step or len(text) or 1
+    sentences = []
+    for i in range(0, len(text), step):
+        sentences.extend(segmenter.feed(text[i:i + step]))
+    rest = segmenter.flush()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+CASES = [
+    ("Hello there. How are you? Great!", ["Hello there.", "How are you?", "Great!"]),
+    ("Meet Dr. Smith at 3 p.m. tomorrow. Bring notes.", ["Meet Dr. Smith at 3 p.m. tomorrow.", "Bring notes."]),
+    ("It ends at 3 p.m. Then we leave.", ["It ends at 3 p.m.", "Then we leave."]),
+    ("The budget is 2.5 million. Approved.", ["The budget is 2.5 million.", "Approved."]),
+    ("We start at 1:30 PM. See you.", ["We start at 1:30 PM.", "See you."]),
+    ("Email bob.smith@example.com today. Thanks.", ["Email bob.smith@example.com today.", "Thanks."]),
+    ("Talk to J. Smith first. Then me.", ["Talk to J. Smith first.", "Then me."]),
+    ("1. Standup at 9\n2. Review at 10", ["1. Standup at 9", "2. Review at 10"]),
+    ("No. I'll check tomorrow.", ["No.", "I'll check tomorrow."]),
+    ("Room No. 5 is booked. Sorry.", ["Room No. 5 is booked.", "Sorry."]),
+    ("Wait... what? Ok.", ["Wait...", "what?", "Ok."]),
+    ('He said "done." Then left.', ['He said "done."', "Then left."]),
+    ("Short. Yes. No.", ["Short.", "Yes.", "No."]),
+    ("no terminator at all", ["no terminator at all"]),
+]
+
+
+@pytest.mark.parametrize("text,expected", CASES)
+@pytest.mark.parametrize("step", [None, 1, 3])
+def test_segments_match_regardless_of_chunking(text, expected, step):
+    assert segment(text, step) == expected
+
+
+def test_sentences_are_emitted_as_soon_as_they_are_known():
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("You have two meetings") == []
+    assert segmenter.feed(". First") == ["You have two meetings."]
+    assert segmenter.feed(" is standup.") == []
+    assert segmenter.flush() == "First is standup."
+
+
+def test_no_waits_only_for_the_next_word():
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("No. ") == []
+    assert segmenter.feed("I'll") == ["No."]
+
+
+def test_first_chunk_flushes_at_a_clause_break():
+    text = "Okay, I checked your calendar for tomorrow, and you have two meetings. First is standup."
+    assert segment(text, 2, first_chunk_min_chars=20) == [
+        "Okay, I checked your calendar for tomorrow,",
+        "and you have two meetings.",
+        "First is standup.",
+    ]
+
+
+def test_first_chunk_flush_applies_to_the_first_sentence_only():
+    text = "Sure thing. Then, later, we can talk, maybe."
+    assert segment(text, 1, first_chunk_min_chars=5) == ["Sure thing.", "Then, later, we can talk, maybe."]
+
+
+def test_newline_always_ends_a_sentence():
+    assert segment("Line one\nLine two") == ["Line one", "Line two"]
+
+
+def test_flush_resets_state():
+    segmenter = SentenceSegmenter()
+    segmenter.feed("Partial")
+    assert segmenter.flush() == "Partial"
+    assert segmenter.flush() is None
+    assert segmenter.feed("Next one. ") == ["Next one."]
@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from langchain_core.messages import HumanMessage
+
+from agent import ConversationState, SmartSchedulerAgent
+from config import config
+from database import Session as SessionRecord, SessionLocal
+from session_persistence import SessionPersister, session_persister
+
+
+def persisted_ids():
+    db = SessionLocal()
+    try:
+        return {row.id for row in db.query(SessionRecord).all()}
+    finally:
+        db.close()
+
+
+def test_clear_all_sessions_also_clears_persisted_sessions():
+    agent = SmartSchedulerAgent()
+    session_id = f"s-clear-{uuid.uuid4().hex[:6]}"
+
+    async def scenario():
+        state = await agent.get_or_load_session(session_id)
+        state.add_message(HumanMessage(content="remember me"))
+        session_persister.mark_dirty(state, "user-1")
+        await session_persister.flush()
+        assert session_id in persisted_ids()
+
+        agent.clear_all_sessions()
+        await session_persister.flush()
+        assert session_id not in persisted_ids()
+
+        # The next message starts a fresh conversation instead of reloading the old one
+        state = await agent.get_or_load_session(session_id)
+        assert not any(isinstance(m, HumanMessage) for m in state.messages)
+
+    asyncio.run(scenario())
+
+
+def test_flush_prunes_sessions_idle_past_retention():
+    persister = SessionPersister()
+    old_id, recent_id = f"s-old-{uuid.uuid4().hex[:6]}", f"s-recent-{uuid.uuid4().hex[:6]}"
+
+    async def scenario():
+        for session_id in (old_id, recent_id):
+            persister.mark_dirty(ConversationState(session_id=session_id), "user-1")
+        await persister.flush()
+
+        db = SessionLocal()
+        try:
+            stale = datetime.utcnow() - timedelta(seconds=config.SESSION_RETENTION_SECONDS + 60)
+            db.query(SessionRecord).filter(SessionRecord.id == old_id).update({"last_active": stale})
+            db.commit()
+        finally:
+            db.close()
+
+        persister._last_prune = None  # due for a prune
+        await persister.flush()
+
+    asyncio.run(scenario())
+    ids = persisted_ids()
+    assert old_id not in ids
+    assert recent_id in ids
+    assert persister.stats()["pruned"] == 1
@@ -0,0 +1,74 @@
+import json
+
+from config import config
+from tool_encoding import MAX_EVENTS, MAX_SLOTS, encode_tool_result
+
+UPCOMING = {
+    "events": [
+        {"title": "Standup", "start": "Monday, October 06 at 09:00 AM", "end": "09:15 AM",
+         "attendees": ["a@example.com", "b@example.com"]},
+        {"title": "Design review", "start": "Monday, October 06 at 01:30 PM", "end": "02:00 PM",
+         "attendees": ["a@example.com", "c@example.com"]},
+        {"title": "1:1", "start": "Tuesday, October 07 at 10:00 AM", "end": "10:30 AM", "attendees": []},
+    ],
+    "count": 3,
+}
+
+
+def test_events_are_grouped_by_day_with_shared_attendee_aliases():
+    assert encode_tool_result("calendar_list_upcoming", UPCOMING) == "\n".join([
+        "count: 3",
+        "people: p1=a@example.com",
+        "Monday, October 06:",
+        "- 09:00 AM-09:15 AM Standup [p1, b@example.com]",
+        "- 01:30 PM-02:00 PM Design review [p1, c@example.com]",
+        "Tuesday, October 07:",
+        "- 10:00 AM-10:30 AM 1:1",
+    ])
+
+
+def test_same_day_events_have_no_day_header():
+    result = {"date": "2025-10-06", "events": [{"title": "Standup", "start": "09:00 AM", "end": "09:15 AM"}]}
+    assert encode_tool_result("calendar_today_summary", result) == "date: 2025-10-06\n- 09:00 AM-09:15 AM Standup"
+
+
+def test_long_lists_are_truncated_with_counts():
+    events = [{"title": f"E{i}", "start": "09:00 AM", "end": "09:30 AM",
+               "attendees": [f"u{j}@example.com" for j in range(8)]} for i in range(MAX_EVENTS + 4)]
+    encoded = encode_tool_result("calendar_list_events_by_date", {"events": events})
+    assert f"E{MAX_EVENTS - 1}" in encoded
+    assert f"E{MAX_EVENTS}" not in encoded
+    assert encoded.endswith("+4 more events")
+    assert "+3 more]" in encoded
+
+
+def test_slots_keep_iso_times_for_booking():
+    slots = [{"start": f"{h:02d}:00 PM", "end": f"{h:02d}:30 PM",
+              "start_iso": f"2025-10-06T{12 + h}:00:00+05:30", "end_iso": f"2025-10-06T{12 + h}:30:00+05:30"}
+             for h in range(1, MAX_SLOTS + 3)]
+    encoded = encode_tool_result("calendar_freebusy", {"date": "2025-10-06", "slots": slots})
+    lines = encoded.splitlines()
+    assert lines[:3] == [
+        "date: 2025-10-06",
+        "slots (start | start_iso..end_iso):",
+        "- 01:00 PM-01:30 PM | 2025-10-06T13:00:00+05:30..2025-10-06T13:30:00+05:30",
+    ]
+    assert lines[-1] == "+2 more slots"
+
+
+def test_generic_results_and_errors():
+    assert encode_tool_result("calendar_create_event", {"status": "created", "link": "", "id": "e1"}) == \
+        "status: created\nid: e1"
+    assert encode_tool_result("some_new_tool", {"error": "boom"}) == "error: boom"
+
+
+def test_json_fallbacks(monkeypatch):
+    assert encode_tool_result("calendar_list_upcoming", ["not", "a", "dict"]) == json.dumps(["not", "a", "dict"])
+    # An encoder that raises falls back to JSON rather than failing the turn
+    broken = {"events": [{"start": None}]}
+    assert encode_tool_result("calendar_list_upcoming", broken) == json.dumps(broken)
+
+    monkeypatch.setattr(config, "TOOL_RESULT_JSON_TOOLS", ["calendar_freebusy"])
+    assert encode_tool_result("calendar_freebusy", {"slots": []}) == '{"slots": []}'
+    monkeypatch.setattr(config, "TOOL_RESULT_ENCODING", "json")
+    assert encode_tool_result("calendar_list_upcoming", UPCOMING) == json.dumps(UPCOMING)
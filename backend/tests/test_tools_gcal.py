@@ -0,0 +1,67 @@
+import tools_gcal
+from calendar_mirror import calendar_mirror
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeEvents:
+    """events() resource: a live copy that changed since the mirror last synced"""
+
+    def __init__(self, live):
+        self.live = live
+        self.patches = []
+
+    def get(self, calendarId, eventId):
+        assert eventId == self.live["id"]
+        return FakeRequest(dict(self.live))
+
+    def patch(self, calendarId, eventId, body, sendUpdates=None):
+        self.patches.append((eventId, body))
+        return FakeRequest({**self.live, **body})
+
+    def update(self, **kwargs):
+        raise AssertionError("a full update would overwrite changes made since the last sync")
+
+
+class FakeService:
+    def __init__(self, live):
+        self._events = FakeEvents(live)
+
+    def events(self):
+        return self._events
+
+
+def test_update_attendees_patches_only_attendees_of_the_live_event(monkeypatch):
+    stale = {
+        "id": "e1", "summary": "Design review",
+        "start": {"dateTime": "2025-10-06T09:00:00+05:30"}, "end": {"dateTime": "2025-10-06T10:00:00+05:30"},
+        "attendees": [{"email": "a@example.com"}],
+    }
+    # Renamed, moved and given another guest in Google after the last sync
+    live = {
+        **stale, "summary": "Design review (moved)",
+        "start": {"dateTime": "2025-10-06T15:00:00+05:30"}, "end": {"dateTime": "2025-10-06T16:00:00+05:30"},
+        "attendees": [{"email": "a@example.com"}, {"email": "b@example.com"}],
+    }
+    service = FakeService(live)
+    monkeypatch.setattr(tools_gcal, "get_main_calendar_service", lambda: service)
+    monkeypatch.setattr(calendar_mirror, "ensure_fresh", lambda service: None)
+    monkeypatch.setattr(calendar_mirror, "between", lambda start, end, query=None: [stale])
+    monkeypatch.setattr(calendar_mirror, "apply", lambda event: None)
+
+    result = tools_gcal.calendar_update_event_attendees.invoke(
+        {"event_title": "Design review", "attendees": ["b@example.com", "c@example.com"]}
+    )
+
+    assert service.events().patches == [("e1", {"attendees": [
+        {"email": "a@example.com"}, {"email": "b@example.com"},
+        {"email": "c@example.com", "responseStatus": "needsAction"},
+    ]})]
+    assert result["added_count"] == 1
+    assert result["title"] == "Design review (moved)"
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import streaming_voice_service as svs
+from audio_cache import AudioCache
+from tts_cache import TTSCache
+
+
+def make_tts_cache(directory, disk=10_000):
+    return TTSCache(max_memory_bytes=1_000, max_disk_bytes=disk, ttl_seconds=3600,
+                    directory=str(directory), max_text_chars=300)
+
+
+def test_persistent_cache_survives_a_restart(tmp_path):
+    cache = make_tts_cache(tmp_path)
+    cache.put("You have no events today.", "voice", "model", "mp3", b"audio-bytes")
+
+    restarted = make_tts_cache(tmp_path)
+    assert restarted.get("You have  no events today.", "voice", "model", "mp3") == b"audio-bytes"
+    assert restarted.get("You have no events today.", "other-voice", "model", "mp3") is None
+
+
+def test_reindex_enforces_disk_budget_oldest_first(tmp_path):
+    store = AudioCache(max_memory_bytes=1_000, max_disk_bytes=1_000, ttl_seconds=3600,
+                       directory=str(tmp_path), persistent=True)
+    for i, key in enumerate(["aaa", "bbb", "ccc"]):
+        store.put(key, bytes(10))
+        os.utime(tmp_path / f"{key}.mp3", (time.time() - 100 + i, time.time() - 100 + i))
+
+    restarted = AudioCache(max_memory_bytes=1_000, max_disk_bytes=20, ttl_seconds=3600,
+                           directory=str(tmp_path), persistent=True)
+    assert restarted.open("aaa") is None
+    assert restarted.open("bbb") is not None
+    assert restarted.open("ccc") is not None
+    assert restarted.disk_bytes == 20
+
+
+def test_reindex_drops_expired_files(tmp_path):
+    store = AudioCache(max_memory_bytes=1_000, max_disk_bytes=1_000, ttl_seconds=60,
+                       directory=str(tmp_path), persistent=True)
+    store.put("old", b"x")
+    os.utime(tmp_path / "old.mp3", (time.time() - 120, time.time() - 120))
+
+    restarted = AudioCache(max_memory_bytes=1_000, max_disk_bytes=1_000, ttl_seconds=60,
+                           directory=str(tmp_path), persistent=True)
+    assert restarted.open("old") is None
+    assert not (tmp_path / "old.mp3").exists()
+
+
+def test_non_persistent_cache_still_purges_on_startup(tmp_path):
+    store = AudioCache(max_memory_bytes=0, max_disk_bytes=1_000, ttl_seconds=60, directory=str(tmp_path))
+    store.put("a", b"x")
+    store.put("b", b"y")
+    assert list(tmp_path.glob("*.mp3"))
+
+    AudioCache(max_memory_bytes=0, max_disk_bytes=1_000, ttl_seconds=60, directory=str(tmp_path))
+    assert list(tmp_path.glob("*.mp3")) == []
+
+
+@pytest.fixture
+def streaming(monkeypatch, tmp_path):
+    """StreamingVoiceService with a fake per-socket synthesizer and a private TTS cache"""
+    cache = make_tts_cache(tmp_path)
+    monkeypatch.setattr(svs, "tts_cache", cache)
+    service = svs.StreamingVoiceService()
+    sockets = []
+
+    async def fake_synthesize_stream_ws(text_stream, on_audio_chunk, timings=None):
+        texts = [t async for t in text_stream]
+        sockets.append(texts)
+        for text in texts:
+            # Later sentences finish faster, so ordering has to be enforced by the player
+            await asyncio.sleep(0.02 / len(sockets))
+            await on_audio_chunk(f"<{text}|".encode())
+            await on_audio_chunk(b">")
+        return True
+
+    monkeypatch.setattr(service, "synthesize_stream_ws", fake_synthesize_stream_ws)
+    return service, cache, sockets
+
+
+def test_multi_sentence_reply_caches_every_sentence(streaming):
+    service, cache, sockets = streaming
+    sentences = ["First sentence.", "Second one.", "Third."]
+
+    async def run():
+        played = []
+
+        async def text_stream():
+            for s in sentences:
+                yield s
+
+        async def on_audio(chunk):
+            played.append(chunk)
+
+        await service.synthesize_stream_cached(text_stream(), on_audio)
+        return b"".join(played)
+
+    first = asyncio.run(run())
+    assert first == b"<First sentence.|><Second one.|><Third.|>"
+    assert sockets == [[s] for s in sentences]
+    for s in sentences:
+        assert cache.get(s, service.elevenlabs_voice_id, service.elevenlabs_model_id, svs.OUTPUT_FORMAT) is not None
+
+    sockets.clear()
+    assert asyncio.run(run()) == first
+    assert sockets == []
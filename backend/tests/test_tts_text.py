@@ -0,0 +1,62 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from legacy_tts_cleaner import clean_response_for_tts as legacy_clean
+from utils.sentence_segmenter import SentenceSegmenter
+from utils.tts_text import TTSTextStream, clean_response_for_tts
+
+GOLDEN = json.loads((Path(__file__).parent / "data" / "tts_golden.json").read_text(encoding="utf-8"))
+
+# Characters every cleaning pass reacts to, plus ordinary text
+ALPHABET = list("*_#-•.)]([`>:0123456789 \n\t,!?→✓×AaPpMm") + ["AM", "PM", ":00", "**", "__", "](", "..", ",,"]
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=range(len(GOLDEN)))
+def test_golden_corpus(case):
+    assert clean_response_for_tts(case["input"]) == case["expected"]
+
+
+def test_golden_corpus_was_generated_by_the_legacy_cleaner():
+    for case in GOLDEN:
+        assert legacy_clean(case["input"]) == case["expected"]
+
+
+def test_matches_legacy_cleaner_on_random_markdown():
+    rng = random.Random(16)
+    for _ in range(20000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40)))
+        assert clean_response_for_tts(text) == legacy_clean(text), repr(text)
+
+
+def test_stream_yields_cleaned_sentences():
+    stream = TTSTextStream()
+    out = []
+    for token in ["**Standup** at ", "9:00 AM", ". Then ", "*review*", " at 10."]:
+        out.extend(stream.feed(token))
+    rest = stream.flush()
+    if rest:
+        out.append(rest)
+    assert out == ["Standup at 9 AM.", "Then review at 10."]
+
+
+@pytest.mark.parametrize("case", GOLDEN[:30], ids=range(30))
+def test_stream_equals_cleaning_each_segmented_sentence(case):
+    text = case["input"]
+    segmenter = SentenceSegmenter()
+    expected = [clean_response_for_tts(s) for s in segmenter.feed(text)]
+    rest = segmenter.flush()
+    if rest:
+        expected.append(clean_response_for_tts(rest))
+    expected = [s for s in expected if s]
+
+    stream = TTSTextStream()
+    out = []
+    for i in range(0, len(text), 3):
+        out.extend(stream.feed(text[i:i + 3]))
+    rest = stream.flush()
+    if rest:
+        out.append(rest)
+    assert out == expected
@@ -0,0 +1,116 @@
+import json
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger("tool_encoding")
+
+MAX_EVENTS = 15
+MAX_SLOTS = 10
+MAX_ATTENDEES = 5
+
+
+def _value(value: Any, limit: int = MAX_ATTENDEES) -> str:
+    if isinstance(value, list):
+        shown = ", ".join(str(v) for v in value[:limit])
+        return shown + (f" +{len(value) - limit} more" if len(value) > limit else "")
+    return str(value)
+
+
+def _header(result: Dict[str, Any], skip: tuple) -> List[str]:
+    """Scalar and list fields as 'key: value' lines"""
+    return [
+        f"{key}: {_value(value)}" for key, value in result.items()
+        if key not in skip and value not in (None, "", [], {})
+    ]
+
+
+def encode_generic(result: Dict[str, Any]) -> str:
+    """Any flat result (errors, create/update confirmations) as key: value lines"""
+    return "\n".join(_header(result, ()))
+
+
+def encode_events(result: Dict[str, Any]) -> str:
+    """
+    Event lists grouped by day, one line per event
+
+    Attendees that appear on more than one event are listed once under
+    "people" and referenced by a short alias.
+    """
+    events = result.get("events") or []
+    lines = _header(result, ("events",))
+    if not events:
+        return "\n".join(lines)
+
+    counts = Counter(email for e in events for email in e.get("attendees", []))
+    aliases = {email: f"p{i}" for i, email in enumerate(sorted(e for e, c in counts.items() if c > 1), 1)}
+    if aliases:
+        lines.append("people: " + ", ".join(f"{alias}={email}" for email, alias in aliases.items()))
+
+    day = None
+    for event in events[:MAX_EVENTS]:
+        start = event.get("start", "")
+        event_day, _, time = start.rpartition(" at ")
+        if event_day and event_day != day:
+            day = event_day
+            lines.append(f"{day}:")
+        line = f"- {time or start}-{event.get('end', '')} {event.get('title', 'Untitled')}"
+        attendees = [aliases.get(a, a) for a in event.get("attendees", [])]
+        if attendees:
+            line += f" [{_value(attendees)}]"
+        lines.append(line)
+    if len(events) > MAX_EVENTS:
+        lines.append(f"+{len(events) - MAX_EVENTS} more events")
+    return "\n".join(lines)
+
+
+def encode_slots(result: Dict[str, Any]) -> str:
+    """Free slots as 'display time | start_iso..end_iso' lines (ISO kept for booking)"""
+    slots = result.get("slots") or []
+    lines = _header(result, ("slots",))
+    if slots:
+        lines.append("slots (start | start_iso..end_iso):")
+    for slot in slots[:MAX_SLOTS]:
+        line = f"- {slot.get('start')}-{slot.get('end')} | {slot.get('start_iso')}..{slot.get('end_iso')}"
+        if slot.get("busy_attendees"):
+            line += f" busy: {_value(slot['busy_attendees'])}"
+        lines.append(line)
+    if len(slots) > MAX_SLOTS:
+        lines.append(f"+{len(slots) - MAX_SLOTS} more slots")
+    return "\n".join(lines)
+
+
+ENCODERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "calendar_list_upcoming": encode_events,
+    "calendar_list_events_by_date": encode_events,
+    "calendar_find_event_by_title": encode_events,
+    "calendar_today_summary": encode_events,
+    "calendar_freebusy": encode_slots,
+    "calendar_create_event": encode_generic,
+    "calendar_update_event_attendees": encode_generic,
+}
+
+
+def encode_tool_result(tool_name: str, result: Any) -> str:
+    """
+    Tool result as ToolMessage content
+
+    Compact line-based text by default (short keys, events grouped by day,
+    long lists truncated with counts); plain JSON when TOOL_RESULT_ENCODING
+    is "json" or the tool is listed in TOOL_RESULT_JSON_TOOLS.
+    """
+    if (
+        config.TOOL_RESULT_ENCODING == "json"
+        or tool_name in config.TOOL_RESULT_JSON_TOOLS
+        or not isinstance(result, dict)
+    ):
+        return json.dumps(result, default=str)
+
+    encoder = ENCODERS.get(tool_name, encode_generic)
+    try:
+        return encoder(result)
+    except Exception as e:
+        logger.warning(f"Compact encoding failed for {tool_name}, falling back to JSON: {e}")
+        return json.dumps(result, default=str)
@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger("tool_executor")
+
+
+class ToolExecutor:
+    """
+    Bounded thread pool for blocking tool calls
+
+    Calendar tools use googleapiclient and SQLAlchemy, both blocking. Running
+    them here keeps the event loop (and every voice websocket on it) free.
+    At most TOOL_EXECUTOR_MAX_WORKERS calls run at once; the rest queue.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool with the caller's contextvars"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_ms += (started - submitted) * 1000
+            ok = False
+            try:
+                result = context.run(func, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.total_run_ms += (time.perf_counter() - started) * 1000
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        return await loop.run_in_executor(self._pool, call)
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait_ms / finished, 2) if finished else 0.0,
+            "avg_run_ms": round(self.total_run_ms / finished, 2) if finished else 0.0
+        }
+
+    def shutdown(self):
+        logger.info("Shutting down tool executor")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+tool_executor = ToolExecutor(config.TOOL_EXECUTOR_MAX_WORKERS)
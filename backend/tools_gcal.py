@@ -1,43 +1,88 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from langchain_core.tools import tool
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request as GoogleAuthRequest
+from contextvars import ContextVar
+import threading
+import time
 import pytz
 
 from config import config
 from database import User, get_db
 from utils.logger import setup_logger
+from utils.discovery import build_service
+from calendar_mirror import calendar_mirror
+from utils.intervals import BusyIntervalIndex, daily_windows
+from availability import availability_engine
 
 logger = setup_logger("tools_gcal")
 
-# Track current user making the request (for attribution)
-_user_context = None
+# Track current user making the request (for attribution).
+# A ContextVar so concurrent requests don't overwrite each other; the tool
+# executor copies the caller's context into the worker thread.
+_user_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("user_context", default=None)
 
 def set_user_context(user: User):
     """Set the current user making requests for attribution"""
-    global _user_context
-    _user_context = {
+    _user_context.set({
         'user_name': user.name,
         'user_email': user.email,
         'user_id': user.id
-    }
+    })
     logger.info(f"User context set: {user.email}")
 
-def get_main_calendar_service():
+class CalendarServiceCache:
     """
-    ALWAYS get the main/host calendar service
-    regardless of which user is logged in
+    Process-wide cache of the main calendar service
+
+    Builds the Google Calendar client once per main account and reuses it
+    (and its HTTP transport) across tool calls. The main account row is only
+    re-read every CALENDAR_SERVICE_RECHECK_SECONDS so token changes in the
+    users table are still picked up.
+
+    httplib2 transports aren't thread-safe, so each tool worker thread gets
+    its own service built on the shared credentials.
     """
-    db = next(get_db())
-    try:
-        main_user = db.query(User).filter(User.is_main_account == True).first()
-        if not main_user:
-            raise RuntimeError("Main calendar account not found in database")
-        
-        logger.info(f"Using main calendar: {main_user.email}")
-        
-        credentials = Credentials(
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = 0
+        self._credentials: Optional[Credentials] = None
+        self._account_key: Optional[tuple] = None
+        self._last_checked = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.thread_builds = 0
+
+    def _load_main_user(self) -> User:
+        db = next(get_db())
+        try:
+            main_user = db.query(User).filter(User.is_main_account == True).first()
+            if not main_user:
+                raise RuntimeError("Main calendar account not found in database")
+            db.expunge(main_user)
+            return main_user
+        finally:
+            db.close()
+
+    def _persist_refreshed_token(self, user_id: str):
+        """Write a refreshed access token back to the users table"""
+        db = next(get_db())
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if user:
+                user.access_token = self._credentials.token
+                user.token_expiry = self._credentials.expiry
+                db.commit()
+        finally:
+            db.close()
+
+    def _build(self, main_user: User):
+        logger.info(f"Building calendar service for main account: {main_user.email}")
+        self._credentials = Credentials(
             token=main_user.access_token,
             refresh_token=main_user.refresh_token,
             token_uri="https://oauth2.googleapis.com/token",
@@ -46,11 +91,74 @@ def get_main_calendar_service():
             scopes=[
                 'https://www.googleapis.com/auth/calendar.events',
                 'https://www.googleapis.com/auth/calendar.readonly'
-            ]
+            ],
+            expiry=main_user.token_expiry
         )
-        return build('calendar', 'v3', credentials=credentials)
-    finally:
-        db.close()
+        self._generation += 1
+        self._account_key = (main_user.id, main_user.access_token, main_user.refresh_token)
+
+    def get(self):
+        """Return the cached service, rebuilding or refreshing it when needed"""
+        with self._lock:
+            now = time.monotonic()
+            if self._credentials is None or now - self._last_checked >= config.CALENDAR_SERVICE_RECHECK_SECONDS:
+                main_user = self._load_main_user()
+                self._last_checked = now
+                account_key = (main_user.id, main_user.access_token, main_user.refresh_token)
+                if self._credentials is None or account_key != self._account_key:
+                    self.misses += 1
+                    self._build(main_user)
+                else:
+                    self.hits += 1
+            else:
+                self.hits += 1
+
+            # Refresh in place so the built service keeps its transport
+            if self._credentials.expired and self._credentials.refresh_token:
+                logger.info("Main calendar token expired, refreshing")
+                self._credentials.refresh(GoogleAuthRequest())
+                self.refreshes += 1
+                user_id = self._account_key[0]
+                self._persist_refreshed_token(user_id)
+                self._account_key = (user_id, self._credentials.token, self._credentials.refresh_token)
+
+            credentials, generation = self._credentials, self._generation
+
+        local = self._local
+        if getattr(local, 'generation', None) != generation:
+            local.service = build_service('calendar', 'v3', credentials)
+            local.generation = generation
+            self.thread_builds += 1
+        return local.service
+
+    def invalidate(self):
+        """Drop the cached service so the next call rebuilds it"""
+        with self._lock:
+            self._credentials = None
+            self._account_key = None
+            self._last_checked = 0.0
+        logger.info("Calendar service cache invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "thread_builds": self.thread_builds,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+calendar_service_cache = CalendarServiceCache()
+
+def get_main_calendar_service():
+    """
+    ALWAYS get the main/host calendar service
+    regardless of which user is logged in
+    """
+    return calendar_service_cache.get()
 
 
 # ---------------- TOOLS ---------------- #
@@ -65,15 +173,8 @@ def calendar_list_upcoming(n: int = 5) -> Dict[str, Any]:
 
         logger.info(f"Fetching {n} upcoming events from main calendar")
 
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now.isoformat(),
-            maxResults=n,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        calendar_mirror.ensure_fresh(service)
+        events = calendar_mirror.upcoming(now, n)
         if not events:
             return {"message": f"No upcoming events"}
 
@@ -112,15 +213,8 @@ def calendar_list_events_by_date(date: str) -> Dict[str, Any]:
 
         logger.info(f"Fetching events for {date} from main calendar")
 
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=start_dt.isoformat(),
-            timeMax=end_dt.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        calendar_mirror.ensure_fresh(service)
+        events = calendar_mirror.between(start_dt, end_dt)
         if not events:
             return {"date": date, "events": [], "message": f"No events scheduled"}
 
@@ -152,16 +246,8 @@ def calendar_find_event_by_title(query: str) -> Dict[str, Any]:
         tz = pytz.timezone(config.DEFAULT_TIMEZONE)
         now = datetime.now(tz)
 
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now.isoformat(),
-            timeMax=(now + timedelta(days=30)).isoformat(),
-            q=query,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        calendar_mirror.ensure_fresh(service)
+        events = calendar_mirror.between(now, now + timedelta(days=30), query=query)
         if not events:
             return {"message": f"No events found matching '{query}'"}
 
@@ -196,15 +282,8 @@ def calendar_today_summary() -> Dict[str, Any]:
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         today_end = now.replace(hour=23, minute=59, second=59, microsecond=0)
 
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=today_start.isoformat(),
-            timeMax=today_end.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        calendar_mirror.ensure_fresh(service)
+        events = calendar_mirror.between(today_start, today_end)
         if not events:
             return {"date": now.strftime("%Y-%m-%d"), "message": "No events scheduled"}
 
@@ -228,72 +307,96 @@ def calendar_today_summary() -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+class BusyIndexCache:
+    """Main calendar BusyIntervalIndex, rebuilt only when the mirror changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[BusyIntervalIndex] = None
+        self._version = -1
+
+    def get(self) -> BusyIntervalIndex:
+        with self._lock:
+            if self._index is None or self._version != calendar_mirror.version:
+                version = calendar_mirror.version
+                self._index = BusyIntervalIndex.from_datetimes(calendar_mirror.busy_intervals())
+                self._version = version
+                logger.info(f"Busy interval index rebuilt: {len(self._index)} intervals")
+            return self._index
+
+
+busy_index_cache = BusyIndexCache()
+
+def _working_hours(time_pref: Optional[str]) -> tuple:
+    """Map a time preference to (start_hour, end_hour) of the search window"""
+    if time_pref:
+        tl = time_pref.lower()
+        if 'morning' in tl:
+            return 9, 12
+        elif 'afternoon' in tl:
+            return 12, 17
+        elif 'evening' in tl or 'after' in tl:
+            return 17, 21
+    return 9, 17
+
+
 @tool
 def calendar_freebusy(
     duration_min: int,
     date: str,
-    time_pref: Optional[str] = None
+    time_pref: Optional[str] = None,
+    end_date: Optional[str] = None,
+    attendees: Optional[List[str]] = None
 ) -> Dict[str, Any]:
-    """Find available slots on a given day (expects YYYY-MM-DD)"""
+    """Find available slots on a given day, or across date..end_date inclusive (expects YYYY-MM-DD).
+    If attendees (emails) are given, only times when they are free too are returned first."""
     try:
         service = get_main_calendar_service()
         tz = pytz.timezone(config.DEFAULT_TIMEZONE)
 
-        search_date = datetime.strptime(date, "%Y-%m-%d")
-        search_date = tz.localize(search_date)
-
-        # Default window
-        search_start = search_date.replace(hour=9, minute=0)
-        search_end = search_date.replace(hour=17, minute=0)
-
-        if time_pref:
-            tl = time_pref.lower()
-            if 'morning' in tl:
-                search_start, search_end = search_date.replace(hour=9), search_date.replace(hour=12)
-            elif 'afternoon' in tl:
-                search_start, search_end = search_date.replace(hour=12), search_date.replace(hour=17)
-            elif 'evening' in tl or 'after' in tl:
-                search_start = search_date.replace(hour=17)
-                search_end = search_date.replace(hour=21)
-
-        body = {
-            "timeMin": search_start.isoformat(),
-            "timeMax": search_end.isoformat(),
-            "items": [{"id": "primary"}]
-        }
-
-        freebusy = service.freebusy().query(body=body).execute()
-        busy_times = freebusy['calendars']['primary'].get('busy', [])
-
+        first_day = tz.localize(datetime.strptime(date, "%Y-%m-%d"))
+        last_day = tz.localize(datetime.strptime(end_date, "%Y-%m-%d")) if end_date else first_day
+        if last_day < first_day:
+            return {"error": "end_date must not be before date"}
+        if (last_day - first_day).days >= config.FREEBUSY_MAX_RANGE_DAYS:
+            return {"error": f"Date range is limited to {config.FREEBUSY_MAX_RANGE_DAYS} days"}
+
+        start_hour, end_hour = _working_hours(time_pref)
+        windows = daily_windows(first_day, last_day, start_hour, end_hour)
+
+        calendar_mirror.ensure_fresh(service)
+        main_index = busy_index_cache.get()
+
+        others = sorted({
+            a.strip().lower() for a in (attendees or [])
+            if a.strip() and a.strip().lower() != (config.MAIN_CALENDAR_EMAIL or "").lower()
+        })
+        if others:
+            result = availability_engine.find_slots(
+                service, main_index, others, windows, duration_min
+            )
+            result.update({"date": date, "attendees_checked": others})
+            if end_date:
+                result["end_date"] = end_date
+            return result
+
+        gaps = main_index.gaps_in_windows(windows, duration_min)
+
+        multi_day = last_day != first_day
         free_slots = []
-        current = search_start
-
-        for busy in busy_times:
-            busy_start = datetime.fromisoformat(busy['start'].replace("Z", "+00:00"))
-            busy_end = datetime.fromisoformat(busy['end'].replace("Z", "+00:00"))
-
-            if current < busy_start:
-                gap = (busy_start - current).total_seconds() / 60
-                if gap >= duration_min:
-                    free_slots.append({
-                        "start": current.strftime("%I:%M %p"),
-                        "end": (current + timedelta(minutes=duration_min)).strftime("%I:%M %p"),
-                        "start_iso": current.isoformat(),
-                        "end_iso": (current + timedelta(minutes=duration_min)).isoformat()
-                    })
-            current = max(current, busy_end)
-
-        if current < search_end:
-            gap = (search_end - current).total_seconds() / 60
-            if gap >= duration_min:
-                free_slots.append({
-                    "start": current.strftime("%I:%M %p"),
-                    "end": (current + timedelta(minutes=duration_min)).strftime("%I:%M %p"),
-                    "start_iso": current.isoformat(),
-                    "end_iso": (current + timedelta(minutes=duration_min)).isoformat()
-                })
-
-        return {"date": date, "slots": free_slots[:5], "count": len(free_slots)}
+        for gap_start, _ in gaps:
+            slot_end = gap_start + timedelta(minutes=duration_min)
+            free_slots.append({
+                "start": gap_start.strftime("%A, %B %d at %I:%M %p" if multi_day else "%I:%M %p"),
+                "end": slot_end.strftime("%I:%M %p"),
+                "start_iso": gap_start.isoformat(),
+                "end_iso": slot_end.isoformat()
+            })
+
+        result = {"date": date, "slots": free_slots[:5], "count": len(free_slots)}
+        if multi_day:
+            result["end_date"] = end_date
+        return result
 
     except Exception as e:
         logger.error(f"Error finding free slots: {str(e)}", exc_info=True)
@@ -313,8 +416,9 @@ def calendar_create_event(
     try:
         service = get_main_calendar_service()
 
-        requesting_user = _user_context.get('user_name', 'Unknown') if _user_context else 'Unknown'
-        requesting_email = _user_context.get('user_email', '') if _user_context else ''
+        user_context = _user_context.get()
+        requesting_user = user_context.get('user_name', 'Unknown') if user_context else 'Unknown'
+        requesting_email = user_context.get('user_email', '') if user_context else ''
 
         full_description = f"Scheduled by: {requesting_user} ({requesting_email})"
         if description:
@@ -335,6 +439,7 @@ def calendar_create_event(
             body=event,
             sendUpdates='all'
         ).execute()
+        calendar_mirror.apply(created)
 
         start_dt = datetime.fromisoformat(start_iso.replace("Z", "+00:00"))
         end_dt = datetime.fromisoformat(end_iso.replace("Z", "+00:00"))
@@ -362,21 +467,16 @@ def calendar_update_event_attendees(event_title: str, attendees: List[str]) -> D
         tz = pytz.timezone(config.DEFAULT_TIMEZONE)
         now = datetime.now(tz)
 
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now.isoformat(),
-            timeMax=(now + timedelta(days=30)).isoformat(),
-            q=event_title,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
+        calendar_mirror.ensure_fresh(service)
+        events = calendar_mirror.between(now, now + timedelta(days=30), query=event_title)
         if not events:
             return {"error": f"No event found with title '{event_title}'"}
 
-        event = events[0]
-        event_id = event['id']
+        # The mirror only resolves the title to an id; the attendee list comes
+        # from Google and only that field is patched, so changes made since
+        # the last sync aren't overwritten with the mirror's copy
+        event_id = events[0]['id']
+        event = service.events().get(calendarId='primary', eventId=event_id).execute()
 
         current_attendees = event.get('attendees', [])
         current_emails = {a['email'] for a in current_attendees}
@@ -390,13 +490,13 @@ def calendar_update_event_attendees(event_title: str, attendees: List[str]) -> D
         if new_count == 0:
             return {"success": True, "message": "All specified attendees already invited"}
 
-        event['attendees'] = current_attendees
-        updated = service.events().update(
+        updated = service.events().patch(
             calendarId='primary',
             eventId=event_id,
-            body=event,
+            body={'attendees': current_attendees},
             sendUpdates='all'
         ).execute()
+        calendar_mirror.apply(updated)
 
         start = updated['start'].get('dateTime', updated['start'].get('date'))
         start_dt = datetime.fromisoformat(start.replace("Z", "+00:00"))
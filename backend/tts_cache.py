@@ -0,0 +1,79 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from audio_cache import AudioCache
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger("tts_cache")
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized speech
+
+    Keyed by a hash of the whitespace-normalized text plus everything that
+    changes the audio (voice, model, output format), so a repeated reply like
+    "You have no events scheduled today." is synthesized once. Storage is a
+    persistent AudioCache: LRU in memory, written through to disk and
+    re-indexed on startup, so the cache survives restarts.
+    """
+
+    def __init__(self, max_memory_bytes: int, max_disk_bytes: int, ttl_seconds: int,
+                 directory: str, max_text_chars: int):
+        self.max_text_chars = max_text_chars
+        self._store = AudioCache(
+            max_memory_bytes=max_memory_bytes,
+            max_disk_bytes=max_disk_bytes,
+            ttl_seconds=ttl_seconds,
+            directory=directory,
+            persistent=True
+        )
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def key(self, text: str, voice_id: str, model_id: str, output_format: str) -> str:
+        material = "\x1f".join((self.normalize(text), voice_id, model_id, output_format))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, voice_id: str, model_id: str, output_format: str) -> Optional[bytes]:
+        if len(text) > self.max_text_chars:
+            return None
+        entry = self._store.open(self.key(text, voice_id, model_id, output_format))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return b"".join(entry.iter_range())
+
+    def put(self, text: str, voice_id: str, model_id: str, output_format: str, audio: bytes):
+        if not audio or len(text) > self.max_text_chars:
+            return
+        self._store.put(self.key(text, voice_id, model_id, output_format), audio)
+        self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "store": self._store.stats()
+        }
+
+
+tts_cache = TTSCache(
+    max_memory_bytes=config.TTS_CACHE_MEMORY_BYTES,
+    max_disk_bytes=config.TTS_CACHE_DISK_BYTES,
+    ttl_seconds=config.TTS_CACHE_TTL_SECONDS,
+    directory=config.TTS_CACHE_DIR,
+    max_text_chars=config.TTS_CACHE_MAX_TEXT_CHARS
+)
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+import aiohttp
+
+from config import config
+from http_pool import http_pool
+from utils.logger import setup_logger
+
+logger = setup_logger("tts_socket_pool")
+
+PoolKey = Tuple[str, str]  # (voice_id, model_id)
+
+OUTPUT_FORMAT = "mp3_22050_32"
+
+
+class PooledSocket:
+    """An ElevenLabs stream-input websocket that has already sent its config"""
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse, key: PoolKey, connect_ms: float):
+        self.ws = ws
+        self.key = key
+        self.connect_ms = connect_ms
+        self.created_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    def is_healthy(self) -> bool:
+        return (
+            not self.ws.closed
+            and self.ws.exception() is None
+            and self.age < config.ELEVENLABS_POOL_MAX_IDLE_SECONDS
+        )
+
+
+class TTSSocketPool:
+    """
+    Pre-connected, pre-configured ElevenLabs TTS websockets
+
+    Stream-input sockets are single use (the server closes them after EOS),
+    so the pool keeps ELEVENLABS_POOL_SIZE idle sockets per voice/model ready
+    and refills in the background whenever one is checked out. Idle sockets
+    are recycled before ElevenLabs' inactivity timeout closes them.
+    """
+
+    def __init__(self):
+        self._idle: Dict[PoolKey, Deque[PooledSocket]] = {}
+        self._filling: Set[PoolKey] = set()
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.checkouts_warm = 0
+        self.checkouts_cold = 0
+        self.recycled = 0
+        self.connect_failures = 0
+
+    def _url(self, key: PoolKey) -> str:
+        voice_id, model_id = key
+        return (
+            f"wss://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream-input"
+            f"?model_id={model_id}"
+            f"&output_format={OUTPUT_FORMAT}"
+            f"&auto_mode=true"  # Reduces latency by disabling buffers
+            f"&inactivity_timeout={config.ELEVENLABS_INACTIVITY_TIMEOUT_SECONDS}"
+        )
+
+    async def _open(self, key: PoolKey) -> PooledSocket:
+        """Connect and send the initial config message"""
+        start = time.perf_counter()
+        session = await http_pool.get_session()
+        ws = await session.ws_connect(
+            self._url(key),
+            headers={"xi-api-key": config.ELEVENLABS_API_KEY}
+        )
+        await ws.send_json({
+            "text": " ",
+            "voice_settings": {
+                "stability": 0.3,
+                "similarity_boost": 0.5,
+                "speed": 1.0
+            },
+            "xi_api_key": config.ELEVENLABS_API_KEY
+        })
+        connect_ms = (time.perf_counter() - start) * 1000
+        return PooledSocket(ws, key, connect_ms)
+
+    async def _fill(self, key: PoolKey):
+        idle = self._idle.setdefault(key, deque())
+        try:
+            while len(idle) < config.ELEVENLABS_POOL_SIZE:
+                try:
+                    sock = await self._open(key)
+                except Exception as e:
+                    self.connect_failures += 1
+                    logger.warning(f"Failed to pre-warm ElevenLabs socket: {e}")
+                    return
+                idle.append(sock)
+                logger.info(f"Pre-warmed ElevenLabs socket in {sock.connect_ms:.0f}ms ({len(idle)} idle)")
+        finally:
+            self._filling.discard(key)
+
+    def _schedule_fill(self, key: PoolKey):
+        if key in self._filling or config.ELEVENLABS_POOL_SIZE <= 0:
+            return
+        self._filling.add(key)
+        asyncio.create_task(self._fill(key))
+
+    async def acquire(self, voice_id: str, model_id: str) -> Tuple[PooledSocket, bool]:
+        """
+        Check out a socket for one generation
+
+        Returns (socket, warm) where warm is False if we had to connect on
+        the critical path. The caller owns the socket and must close it.
+        """
+        key = (voice_id, model_id)
+        idle = self._idle.setdefault(key, deque())
+        while idle:
+            sock = idle.popleft()
+            if sock.is_healthy():
+                self.checkouts_warm += 1
+                self._schedule_fill(key)
+                return sock, True
+            self.recycled += 1
+            await sock.ws.close()
+
+        self.checkouts_cold += 1
+        sock = await self._open(key)
+        self._schedule_fill(key)
+        return sock, False
+
+    async def _maintain(self):
+        """Drop sockets that are about to hit the inactivity timeout and top up"""
+        while True:
+            await asyncio.sleep(config.ELEVENLABS_POOL_CHECK_INTERVAL_SECONDS)
+            for key, idle in list(self._idle.items()):
+                for sock in [s for s in idle if not s.is_healthy()]:
+                    idle.remove(sock)
+                    self.recycled += 1
+                    await sock.ws.close()
+                self._schedule_fill(key)
+
+    async def start(self, voice_id: str, model_id: str):
+        """Pre-warm the default voice and start the maintenance loop"""
+        if not config.ELEVENLABS_API_KEY or config.ELEVENLABS_POOL_SIZE <= 0:
+            return
+        self._schedule_fill((voice_id, model_id))
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+        for idle in self._idle.values():
+            while idle:
+                await idle.popleft().ws.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "idle": {f"{v}/{m}": len(q) for (v, m), q in self._idle.items()},
+            "checkouts_warm": self.checkouts_warm,
+            "checkouts_cold": self.checkouts_cold,
+            "recycled": self.recycled,
+            "connect_failures": self.connect_failures
+        }
+
+
+tts_socket_pool = TTSSocketPool()
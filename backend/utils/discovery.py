@@ -0,0 +1,50 @@
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger("discovery")
+
+# Raw discovery JSON per (service, version), loaded once per process
+_documents: Dict[Tuple[str, str], str] = {}
+
+def load_discovery_document(service: str, version: str) -> str:
+    """
+    Load a Google API discovery document without touching the network
+
+    Looks in DISCOVERY_DOCS_DIR first ({service}.{version}.json), then falls
+    back to the static documents bundled with google-api-python-client.
+    """
+    key = (service, version)
+    if key in _documents:
+        return _documents[key]
+
+    local_path = Path(config.DISCOVERY_DOCS_DIR) / f"{service}.{version}.json"
+    if local_path.exists():
+        document = local_path.read_text()
+        logger.info(f"Loaded discovery document from {local_path}")
+    else:
+        document = get_static_doc(service, version)
+        if document is None:
+            raise RuntimeError(f"No bundled discovery document for {service} {version}")
+        logger.info(f"Loaded bundled discovery document for {service} {version}")
+
+    _documents[key] = document
+    return document
+
+def build_service(service: str, version: str, credentials):
+    """Build a Google API client from the bundled discovery document"""
+    document = load_discovery_document(service, version)
+    return build_from_document(document, credentials=credentials)
+
+def preload_discovery_documents() -> Dict[str, float]:
+    """Load every discovery document the backend uses and report timings (ms)"""
+    timings = {}
+    for service, version in [("calendar", "v3"), ("oauth2", "v2")]:
+        start = time.perf_counter()
+        load_discovery_document(service, version)
+        timings[f"{service}.{version}"] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
@@ -0,0 +1,163 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Tuple
+import pytz
+
+Interval = Tuple[float, float]
+
+
+def _ts(dt: datetime) -> float:
+    """Aware datetime -> epoch seconds"""
+    return dt.timestamp()
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping/touching intervals"""
+    merged: List[List[float]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+
+def sweep_line(
+    busy_by_key: Dict[Hashable, Iterable[Interval]],
+    start: float,
+    end: float
+) -> List[Tuple[float, float, FrozenSet]]:
+    """
+    Split [start, end) into segments labelled with the keys busy in each
+
+    One sorted pass over all interval endpoints, so the cost is
+    O(m log m) in the total number of intervals regardless of how many
+    calendars contribute them. Adjacent segments with the same busy set
+    are merged.
+    """
+    points = []
+    for key, intervals in busy_by_key.items():
+        for s, e in intervals:
+            s, e = max(s, start), min(e, end)
+            if s < e:
+                points.append((s, 1, key))
+                points.append((e, -1, key))
+    # Ends sort before starts at the same instant so back-to-back meetings don't overlap
+    points.sort(key=lambda p: (p[0], p[1]))
+
+    active: Dict[Hashable, int] = {}
+    segments: List[Tuple[float, float, FrozenSet]] = []
+    cursor = start
+    for t, delta, key in points:
+        if t > cursor:
+            busy = frozenset(k for k, c in active.items() if c > 0)
+            if segments and segments[-1][1] == cursor and segments[-1][2] == busy:
+                segments[-1] = (segments[-1][0], t, busy)
+            else:
+                segments.append((cursor, t, busy))
+            cursor = t
+        active[key] = active.get(key, 0) + delta
+    if cursor < end:
+        busy = frozenset(k for k, c in active.items() if c > 0)
+        if segments and segments[-1][2] == busy:
+            segments[-1] = (segments[-1][0], end, busy)
+        else:
+            segments.append((cursor, end, busy))
+    return segments
+
+
+class BusyIntervalIndex:
+    """
+    Sorted, merged busy intervals for one or more calendars
+
+    Intervals are stored as two parallel arrays of epoch seconds so a gap
+    query over [A, B) is a bisect plus a walk over the k intervals that
+    actually fall inside the window: O(log n + k).
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        merged = merge_intervals(intervals)
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+
+    @classmethod
+    def from_datetimes(cls, intervals: Iterable[Tuple[datetime, datetime]]) -> "BusyIntervalIndex":
+        return cls((_ts(s), _ts(e)) for s, e in intervals)
+
+    @classmethod
+    def from_freebusy(cls, busy: Iterable[dict]) -> "BusyIntervalIndex":
+        """Build from a freebusy().query 'busy' list"""
+        return cls.from_datetimes(
+            (
+                datetime.fromisoformat(b['start'].replace("Z", "+00:00")),
+                datetime.fromisoformat(b['end'].replace("Z", "+00:00")),
+            )
+            for b in busy
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def busy_between(self, start: datetime, end: datetime) -> List[Interval]:
+        """Busy intervals overlapping [start, end)"""
+        a, b = _ts(start), _ts(end)
+        i = bisect_right(self.ends, a)
+        result = []
+        while i < len(self.starts) and self.starts[i] < b:
+            result.append((self.starts[i], self.ends[i]))
+            i += 1
+        return result
+
+    def gaps(self, start: datetime, end: datetime, min_minutes: int = 0) -> List[Tuple[datetime, datetime]]:
+        """All free gaps of at least min_minutes inside [start, end)"""
+        tz = start.tzinfo or pytz.utc
+        min_seconds = min_minutes * 60
+        a, b = _ts(start), _ts(end)
+        free = []
+        cursor = a
+        for busy_start, busy_end in self.busy_between(start, end):
+            if busy_start - cursor >= min_seconds and busy_start > cursor:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if b - cursor >= min_seconds and b > cursor:
+            free.append((cursor, b))
+        return [
+            (datetime.fromtimestamp(s, tz), datetime.fromtimestamp(e, tz))
+            for s, e in free
+        ]
+
+    def gaps_in_windows(
+        self,
+        windows: Iterable[Tuple[datetime, datetime]],
+        min_minutes: int
+    ) -> List[Tuple[datetime, datetime]]:
+        """Free gaps across several windows (e.g. working hours of each day)"""
+        result = []
+        for start, end in windows:
+            result.extend(self.gaps(start, end, min_minutes))
+        return result
+
+
+def daily_windows(
+    first_day: datetime,
+    last_day: datetime,
+    start_hour: int,
+    end_hour: int
+) -> List[Tuple[datetime, datetime]]:
+    """One (start, end) window per day, first_day/last_day inclusive and tz-localized"""
+    tz = first_day.tzinfo
+    windows = []
+    day = first_day.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    last = last_day.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    while day <= last:
+        start = day.replace(hour=start_hour)
+        end = day.replace(hour=end_hour) if end_hour < 24 else day + timedelta(days=1)
+        if hasattr(tz, 'localize'):
+            windows.append((tz.localize(start), tz.localize(end)))
+        else:
+            windows.append((start.replace(tzinfo=tz), end.replace(tzinfo=tz)))
+        day += timedelta(days=1)
+    return windows
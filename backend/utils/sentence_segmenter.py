@@ -0,0 +1,146 @@
+from typing import List, Optional
+
+TERMINATORS = ".!?"
+CLOSERS = "\"')]”’"
+CLAUSE_BREAKS = ",;:—"
+
+# Never end a sentence: always followed by more of the same sentence
+TITLE_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "e.g", "i.e"
+})
+
+# Abbreviations only when a number follows ("No. 5", but "No. I'll check.")
+NUMBER_ABBREVIATIONS = frozenset({"no", "nos"})
+
+# End a sentence only if the next word is capitalised ("at 3 p.m. Then ...")
+CONTEXT_ABBREVIATIONS = frozenset({
+    "a.m", "p.m", "am", "pm", "etc", "approx", "min", "mins", "hr", "hrs",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "mon", "tue", "tues", "wed", "thu", "thur", "thurs", "fri", "sat", "sun"
+})
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitter for streamed LLM output
+
+    feed() takes each new token and returns the sentences it completed. Only
+    characters that haven't been scanned yet are looked at (plus a one-word
+    lookahead after a possible abbreviation), so the total work is linear in
+    the length of the response. Decimals ("2.5"), times ("1:30 PM"), emails
+    and URLs never contain a terminator followed by whitespace, so they are
+    never split; abbreviations, initials and list numbers are handled
+    explicitly. Newlines always end a sentence.
+
+    If first_chunk_min_chars is set, the first sentence is also cut at the
+    first clause break (",", ";", ":") once it is at least that long, so
+    TTS can start on the opening clause.
+    """
+
+    def __init__(self, first_chunk_min_chars: int = 0):
+        self.first_chunk_min_chars = first_chunk_min_chars
+        self._buf = ""
+        self._pos = 0
+        self._emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; return the sentences it completed"""
+        self._buf += text
+        buf = self._buf
+        n = len(buf)
+        out: List[str] = []
+        start = 0
+        i = self._pos
+
+        while i < n:
+            ch = buf[i]
+
+            if ch == "\n":
+                start = self._emit(out, buf, start, i + 1)
+                i += 1
+                continue
+
+            if ch in TERMINATORS:
+                j = i + 1
+                while j < n and (buf[j] in TERMINATORS or buf[j] in CLOSERS):
+                    j += 1
+                if j >= n:
+                    break  # need to see what follows the terminator
+                if not buf[j].isspace():
+                    i = j  # "2.5", "a@b.com", "..." mid-word
+                    continue
+                boundary = self._is_boundary(buf, start, i, j)
+                if boundary is None:
+                    break  # need the next word to decide
+                if boundary:
+                    start = self._emit(out, buf, start, j)
+                i = j
+                continue
+
+            if (
+                ch in CLAUSE_BREAKS
+                and self._emitted == 0
+                and self.first_chunk_min_chars > 0
+                and i + 1 - start >= self.first_chunk_min_chars
+            ):
+                if i + 1 >= n:
+                    break
+                if buf[i + 1].isspace():
+                    start = self._emit(out, buf, start, i + 1)
+
+            i += 1
+
+        self._buf = buf[start:]
+        self._pos = i - start
+        return out
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left at the end of the stream"""
+        rest = self._buf.strip()
+        self._buf = ""
+        self._pos = 0
+        if rest:
+            self._emitted += 1
+            return rest
+        return None
+
+    def _emit(self, out: List[str], buf: str, start: int, end: int) -> int:
+        sentence = buf[start:end].strip()
+        if sentence:
+            out.append(sentence)
+            self._emitted += 1
+        return end
+
+    @staticmethod
+    def _is_boundary(buf: str, start: int, i: int, j: int) -> Optional[bool]:
+        """
+        Whether the terminator run buf[i:j] (followed by whitespace) ends a
+        sentence; None if the next word is needed and hasn't arrived yet
+        """
+        if buf[i] != "." or "!" in buf[i:j] or "?" in buf[i:j] or buf[j] == "\n":
+            return True
+
+        k = i
+        while k > start and not buf[k - 1].isspace():
+            k -= 1
+        word = buf[k:i].lstrip("\"'([“‘")
+        lower = word.lower()
+
+        if lower in TITLE_ABBREVIATIONS:
+            return False
+        if len(word) == 1 and word.isalpha() and word.isupper():
+            return False  # initial: "J. Smith"
+        if word.isdigit() and not buf[start:k].strip():
+            return False  # list number: "1. Standup at 9"
+
+        if lower in CONTEXT_ABBREVIATIONS or lower in NUMBER_ABBREVIATIONS:
+            m = j
+            while m < len(buf) and buf[m].isspace():
+                m += 1
+            if m >= len(buf):
+                return None
+            if lower in NUMBER_ABBREVIATIONS:
+                return not buf[m].isdigit()
+            return buf[m].isupper()
+
+        return True
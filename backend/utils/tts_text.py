@@ -0,0 +1,83 @@
+import re
+from typing import List, Optional
+
+from .sentence_segmenter import SentenceSegmenter
+
+# Patterns are compiled once; each pass is skipped when its trigger
+# characters aren't in the text, since it could not match anyway
+_BOLD_STARS = re.compile(r'\*\*([^*]+)\*\*')
+_ITALIC_STARS = re.compile(r'\*([^*]+)\*')
+_BOLD_UNDERSCORES = re.compile(r'__([^_]+)__')
+_ITALIC_UNDERSCORES = re.compile(r'_([^_]+)_')
+_HEADING = re.compile(r'^#+\s+', re.MULTILINE)
+_BULLET = re.compile(r'^\s*[-*•]\s+', re.MULTILINE)
+_NUMBERED = re.compile(r'^\s*\d+[\.)]\s+', re.MULTILINE)
+_LINK = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_CODE = re.compile(r'`([^`]+)`')
+_QUOTE = re.compile(r'^\s*>\s+', re.MULTILINE)
+_ON_THE_HOUR = re.compile(r'\b(\d{1,2}):00\s*(AM|PM|am|pm)\b')
+_WHITESPACE = re.compile(r'\s+')
+_SYMBOLS = re.compile(r'[→←↑↓➜➝✓✗✘✔︎×]')
+_SYMBOL_CHARS = frozenset('→←↑↓➜➝✓✗✘✔︎×')
+_EMPTY_PARENS = re.compile(r'\(\s*\)')
+_REPEATED_PUNCT = re.compile(r'([.,])\1+')
+_SENTENCE_GAP = re.compile(r'([.!?])\s*([A-Z])')
+
+
+def clean_response_for_tts(text: str) -> str:
+    """Clean LLM response for voice synthesis"""
+    if not text:
+        return ""
+
+    if "*" in text:
+        text = _BOLD_STARS.sub(r'\1', text)
+        text = _ITALIC_STARS.sub(r'\1', text)
+    if "_" in text:
+        text = _BOLD_UNDERSCORES.sub(r'\1', text)
+        text = _ITALIC_UNDERSCORES.sub(r'\1', text)
+    if "#" in text:
+        text = _HEADING.sub('', text)
+    if "-" in text or "*" in text or "•" in text:
+        text = _BULLET.sub('', text)
+    if "." in text or ")" in text:
+        text = _NUMBERED.sub('', text)
+    if "](" in text:
+        text = _LINK.sub(r'\1', text)
+    if "`" in text:
+        text = _CODE.sub(r'\1', text)
+    if ">" in text:
+        text = _QUOTE.sub('', text)
+    if ":00" in text:
+        text = _ON_THE_HOUR.sub(r'\1 \2', text)
+    # Collapsing blank lines to "\n" first is redundant: every whitespace
+    # run becomes a single space here anyway
+    text = _WHITESPACE.sub(' ', text)
+    if not _SYMBOL_CHARS.isdisjoint(text):
+        text = _SYMBOLS.sub('', text)
+    if "(" in text:
+        text = _EMPTY_PARENS.sub('', text)
+    if ".." in text or ",," in text:
+        text = _REPEATED_PUNCT.sub(r'\1', text)
+    text = _SENTENCE_GAP.sub(r'\1 \2', text)
+
+    return text.strip()
+
+
+class TTSTextStream:
+    """
+    Incremental clean_response_for_tts over a token stream
+
+    feed() returns cleaned, speakable sentences as soon as the segmenter
+    completes them; each is exactly clean_response_for_tts(sentence).
+    """
+
+    def __init__(self, first_chunk_min_chars: int = 0):
+        self._segmenter = SentenceSegmenter(first_chunk_min_chars=first_chunk_min_chars)
+
+    def feed(self, token: str) -> List[str]:
+        cleaned = (clean_response_for_tts(s) for s in self._segmenter.feed(token))
+        return [c for c in cleaned if c]
+
+    def flush(self) -> Optional[str]:
+        rest = self._segmenter.flush()
+        return clean_response_for_tts(rest) if rest else None
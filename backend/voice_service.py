@@ -1,12 +1,18 @@
 import asyncio
 import base64
 from typing import Optional
-import aiohttp
 from config import config
+from http_pool import http_pool
+from tts_cache import tts_cache
+from audio_cache import LiveAudio
+from utils.tts_text import TTSTextStream
 from utils.logger import setup_logger
 
 logger = setup_logger("voice")
 
+REST_TTS_MODEL_ID = "eleven_monolingual_v1"
+REST_TTS_OUTPUT_FORMAT = "mp3_44100_128"  # ElevenLabs default for the REST endpoint
+
 class VoiceService:
     """Handle STT (Speech-to-Text) and TTS (Text-to-Speech)"""
     
@@ -43,17 +49,18 @@ class VoiceService:
                 "language": "en"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, params=params, data=audio_data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        transcript = result['results']['channels'][0]['alternatives'][0]['transcript']
-                        logger.info(f"Transcribed: '{transcript[:50]}...'")
-                        return transcript
-                    else:
-                        error = await response.text()
-                        logger.error(f"Deepgram error: {error}")
-                        return None
+            session = await http_pool.get_session()
+            async with session.post(url, headers=headers, params=params, data=audio_data,
+                                    timeout=http_pool.request_timeout) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    transcript = result['results']['channels'][0]['alternatives'][0]['transcript']
+                    logger.info(f"Transcribed: '{transcript[:50]}...'")
+                    return transcript
+                else:
+                    error = await response.text()
+                    logger.error(f"Deepgram error: {error}")
+                    return None
         
         except Exception as e:
             logger.error(f"Transcription error: {str(e)}", exc_info=True)
@@ -74,6 +81,11 @@ class VoiceService:
             logger.warning("Voice service disabled or ElevenLabs key missing")
             return None
         
+        cached = tts_cache.get(text, voice_id, REST_TTS_MODEL_ID, REST_TTS_OUTPUT_FORMAT)
+        if cached is not None:
+            logger.info(f"TTS cache hit for text: '{text[:50]}...'")
+            return cached
+        
         try:
             url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
             headers = {
@@ -84,26 +96,61 @@ class VoiceService:
             
             data = {
                 "text": text,
-                "model_id": "eleven_monolingual_v1",
+                "model_id": REST_TTS_MODEL_ID,
                 "voice_settings": {
                     "stability": 0.5,
                     "similarity_boost": 0.5
                 }
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        audio_data = await response.read()
-                        logger.info(f"Synthesized speech for text: '{text[:50]}...'")
-                        return audio_data
-                    else:
-                        error = await response.text()
-                        logger.error(f"ElevenLabs error: {error}")
-                        return None
+            session = await http_pool.get_session()
+            async with session.post(url, headers=headers, json=data,
+                                    timeout=http_pool.request_timeout) as response:
+                if response.status == 200:
+                    audio_data = await response.read()
+                    logger.info(f"Synthesized speech for text: '{text[:50]}...'")
+                    tts_cache.put(text, voice_id, REST_TTS_MODEL_ID, REST_TTS_OUTPUT_FORMAT, audio_data)
+                    return audio_data
+                else:
+                    error = await response.text()
+                    logger.error(f"ElevenLabs error: {error}")
+                    return None
         
         except Exception as e:
             logger.error(f"TTS error: {str(e)}", exc_info=True)
             return None
 
+    async def synthesize_speech_streaming(self, text: str, live: LiveAudio,
+                                          voice_id: str = "21m00Tcm4TlvDq8ikWAM"):
+        """
+        Synthesize text sentence by sentence into a LiveAudio
+        
+        Up to CHAT_AUDIO_SYNTHESIS_CONCURRENCY sentences are synthesized
+        ahead, but audio is appended strictly in order, so listeners can
+        start after the first sentence. Each sentence goes through
+        synthesize_speech and therefore the TTS cache.
+        """
+        tts_text = TTSTextStream()
+        sentences = tts_text.feed(text)
+        rest = tts_text.flush()
+        if rest:
+            sentences.append(rest)
+        
+        semaphore = asyncio.Semaphore(config.CHAT_AUDIO_SYNTHESIS_CONCURRENCY)
+        
+        async def synthesize(sentence: str) -> Optional[bytes]:
+            async with semaphore:
+                return await self.synthesize_speech(sentence, voice_id)
+        
+        tasks = [asyncio.create_task(synthesize(sentence)) for sentence in sentences]
+        try:
+            for task in tasks:
+                audio = await task
+                if audio:
+                    await live.append(audio)
+        finally:
+            for task in tasks:
+                task.cancel()
+        logger.info(f"Streamed speech for {len(sentences)} sentence(s)")
+
 voice_service = VoiceService()
\ No newline at end of file
@@ -6,38 +6,13 @@ from fastapi import WebSocket, WebSocketDisconnect
 from utils.logger import setup_logger
 from streaming_voice_service import streaming_voice_service
 from database import User
+from config import config
+from filler_phrases import filler_bank
+from utils.tts_text import TTSTextStream, clean_response_for_tts
 import time
-import re
 
 logger = setup_logger("ws_voice_handler")
 
-def clean_response_for_tts(text: str) -> str:
-    """Clean LLM response for voice synthesis"""
-    if not text:
-        return ""
-    
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'\*([^*]+)\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*[-*•]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*\d+[\.)]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    text = re.sub(r'^\s*>\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\b(\d{1,2}):00\s*(AM|PM|am|pm)\b', r'\1 \2', text)
-    text = re.sub(r'\n\s*\n', '\n', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[→←↑↓➜➝✓✗✘✔︎×]', '', text)
-    text = re.sub(r'\(\s*\)', '', text)
-    text = re.sub(r'\.{2,}', '.', text)
-    text = re.sub(r',{2,}', ',', text)
-    text = re.sub(r'([.!?])\s*([A-Z])', r'\1 \2', text)
-    
-    return text.strip()
-
-
 class VoiceStreamHandler:
     """Ultra-low latency voice handler with true streaming"""
     
@@ -57,8 +32,9 @@ class VoiceStreamHandler:
         self.last_activity = time.time()
         self.silence_warnings = 0
         
-        # Audio management
-        self.audio_queue = asyncio.Queue()
+        # Audio management. Bounded so a stalled STT socket pushes back on
+        # the browser instead of buffering audio without limit
+        self.audio_queue = asyncio.Queue(maxsize=config.VOICE_AUDIO_QUEUE_MAX_CHUNKS)
         self.interrupt_flag = False
         self.tts_task = None
         
@@ -127,7 +103,10 @@ class VoiceStreamHandler:
         except Exception as e:
             logger.error(f"Audio receiver error: {e}", exc_info=True)
         finally:
-            await self.audio_queue.put(None)
+            # Never block on a full queue here: the processor may already be gone
+            if self.audio_queue.full():
+                self.audio_queue.get_nowait()
+            self.audio_queue.put_nowait(None)
     
     async def audio_processor(self):
         """Process audio with Deepgram STT"""
@@ -238,6 +217,7 @@ class VoiceStreamHandler:
         self.is_processing = True
         query_start_time = time.time()
         first_audio_sent = None
+        tts_timings = {}
         
         try:
             await self.send_message({"type": "thinking"})
@@ -251,7 +231,7 @@ class VoiceStreamHandler:
             self.interrupt_flag = False
             
             # Create text stream for TTS
-            text_queue = asyncio.Queue()
+            text_queue = asyncio.Queue(maxsize=config.VOICE_TEXT_QUEUE_MAX_CHUNKS)
             tts_complete = asyncio.Event()
             
             async def text_generator():
@@ -267,13 +247,59 @@ class VoiceStreamHandler:
                 except Exception as e:
                     logger.error(f"Text generator error: {e}")
             
+            async def enqueue_text(text):
+                """Queue text for TTS, giving up once TTS has stopped consuming"""
+                while not tts_complete.is_set():
+                    try:
+                        await asyncio.wait_for(text_queue.put(text), timeout=0.5)
+                        return
+                    except asyncio.TimeoutError:
+                        continue
+            
+            audio_chunk_count = 0
+            
+            async def send_audio(audio_bytes: bytes, source: str = "tts"):
+                """Send one playable audio chunk (TTS or filler) to the frontend"""
+                nonlocal first_audio_sent, audio_chunk_count
+                
+                if self.interrupt_flag or not self.is_connected:
+                    return
+                
+                try:
+                    # Track first audio chunk latency
+                    if first_audio_sent is None:
+                        first_audio_sent = time.time()
+                        ttfa = (first_audio_sent - query_start_time) * 1000
+                        logger.info(f"⚡ TTFA (Time To First Audio): {ttfa:.0f}ms ({source})")
+                        
+                        # Send latency metric to frontend
+                        tts_timings["first_audio_source"] = source
+                        logger.info(f"TTS latency breakdown: {tts_timings}")
+                        await self.send_message({
+                            "type": "latency_metric",
+                            "ttfa_ms": int(ttfa),
+                            "breakdown": tts_timings
+                        })
+                    
+                    audio_chunk_count += 1
+                    await self.websocket.send_bytes(audio_bytes)
+                    
+                except Exception as e:
+                    logger.error(f"Send audio error: {e}")
+            
             async def stream_llm_to_tts():
                 """Stream LLM tokens to TTS as they arrive"""
                 try:
-                    full_text = ""
-                    sentence_buffer = ""
+                    response_parts = []
+                    tts_text = TTSTextStream(first_chunk_min_chars=config.TTS_FIRST_CHUNK_MIN_CHARS)
                     sentences_sent = 0
                     
+                    async def send_sentence(cleaned: str, label: str = "sentence"):
+                        nonlocal sentences_sent
+                        sentences_sent += 1
+                        logger.info(f"→ Streaming {label} {sentences_sent} to TTS: {cleaned[:50]}...")
+                        await enqueue_text(cleaned)
+                    
                     async for chunk_data in self.agent.process_message_streaming(
                         session_id=self.session_id,
                         user_message=query,
@@ -287,34 +313,26 @@ class VoiceStreamHandler:
                         
                         if chunk_type == 'content_chunk':
                             content = chunk_data.get('content', '')
-                            full_text += content
-                            sentence_buffer += content
+                            response_parts.append(content)
                             
                             # Send complete sentences to TTS immediately
-                            if any(punct in sentence_buffer for punct in ['. ', '! ', '? ', '.\n', '!\n', '?\n']):
-                                import re
-                                sentences = re.split(r'([.!?]+\s*)', sentence_buffer)
-                                
-                                for i in range(0, len(sentences) - 1, 2):
-                                    if i + 1 < len(sentences):
-                                        complete_sentence = sentences[i] + sentences[i + 1]
-                                        cleaned = clean_response_for_tts(complete_sentence.strip())
-                                        
-                                        if cleaned and len(cleaned) > 10:
-                                            sentences_sent += 1
-                                            logger.info(f"→ Streaming sentence {sentences_sent} to TTS: {cleaned[:50]}...")
-                                            await text_queue.put(cleaned)
-                                
-                                sentence_buffer = sentences[-1] if len(sentences) % 2 == 1 else ""
+                            for sentence in tts_text.feed(content):
+                                await send_sentence(sentence)
+                        
+                        elif chunk_type == 'tool_start':
+                            # Cover the tool phase with a pre-synthesized filler,
+                            # unless the LLM has already started talking
+                            if not any(part.strip() for part in response_parts):
+                                filler = filler_bank.pick(chunk_data.get('tools', []))
+                                if filler:
+                                    logger.info(f"→ Playing filler while tools run: {chunk_data.get('tools')}")
+                                    await send_audio(filler, "filler")
                         
                         elif chunk_type == 'complete':
                             # Send remaining text
-                            if sentence_buffer.strip():
-                                cleaned = clean_response_for_tts(sentence_buffer.strip())
-                                if cleaned:
-                                    sentences_sent += 1
-                                    logger.info(f"→ Streaming final sentence {sentences_sent} to TTS: {cleaned[:50]}...")
-                                    await text_queue.put(cleaned)
+                            remainder = tts_text.flush()
+                            if remainder:
+                                await send_sentence(remainder, "final sentence")
                             
                             logger.info(f"✓ LLM complete - sent {sentences_sent} sentences to TTS")
                         
@@ -323,12 +341,12 @@ class VoiceStreamHandler:
                             return
                     
                     # Signal end of text stream
-                    await text_queue.put(None)
+                    await enqueue_text(None)
                     logger.info("→ Sent EOS to TTS queue")
                     
                     # Send full text for display
                     if not self.interrupt_flag:
-                        cleaned_full = clean_response_for_tts(full_text)
+                        cleaned_full = clean_response_for_tts("".join(response_parts))
                         await self.send_message({
                             "type": "response_text",
                             "text": cleaned_full
@@ -336,51 +354,23 @@ class VoiceStreamHandler:
                     
                 except Exception as e:
                     logger.error(f"LLM streaming error: {e}", exc_info=True)
-                    await text_queue.put(None)
+                    await enqueue_text(None)
             
             async def stream_tts_to_frontend():
                 """Stream TTS audio directly to frontend as it's generated"""
-                nonlocal first_audio_sent
                 try:
-                    audio_chunk_count = 0
-                    
-                    async def on_audio_chunk(audio_bytes: bytes):
-                        """Callback for each audio chunk from ElevenLabs"""
-                        nonlocal first_audio_sent, audio_chunk_count
-                        
-                        if self.interrupt_flag or not self.is_connected:
-                            return
-                        
-                        try:
-                            # Track first audio chunk latency
-                            if first_audio_sent is None:
-                                first_audio_sent = time.time()
-                                ttfa = (first_audio_sent - query_start_time) * 1000
-                                logger.info(f"⚡ TTFA (Time To First Audio): {ttfa:.0f}ms")
-                                
-                                # Send latency metric to frontend
-                                await self.send_message({
-                                    "type": "latency_metric",
-                                    "ttfa_ms": int(ttfa)
-                                })
-                            
-                            audio_chunk_count += 1
-                            await self.websocket.send_bytes(audio_bytes)
-                            
-                        except Exception as e:
-                            logger.error(f"Send audio error: {e}")
-                    
                     # Start ElevenLabs WebSocket TTS
-                    await streaming_voice_service.synthesize_stream_ws(
+                    await streaming_voice_service.synthesize_stream_cached(
                         text_stream=text_generator(),
-                        on_audio_chunk=on_audio_chunk
+                        on_audio_chunk=send_audio,
+                        timings=tts_timings
                     )
                     
                     logger.info(f"✓ TTS streaming complete - sent {audio_chunk_count} audio chunks")
-                    tts_complete.set()
                     
                 except Exception as e:
                     logger.error(f"TTS streaming error: {e}", exc_info=True)
+                finally:
                     tts_complete.set()
             
             # Run LLM and TTS concurrently for TRUE streaming
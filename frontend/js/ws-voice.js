@@ -172,6 +172,9 @@ class WebSocketVoiceManager {
             case 'latency_metric':
                 const ttfa = message.ttfa_ms;
                 console.log(`⚡ TTFA (Time To First Audio): ${ttfa}ms`);
+                if (message.breakdown) {
+                    console.log('TTS latency breakdown:', message.breakdown);
+                }
                 
                 // Display on UI
                 this.showLatencyMetric(ttfa);